@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+import argparse, sys, subprocess
+from lib.result_cache import add_cache_arguments, get_cache, run_cached
+
+# Files written by makeblastdb for protein databases, depending on its version
+BLAST_DB_EXTENSIONS = ('.pdb', '.phr', '.pin', '.pjs', '.pot', '.psq', '.ptf', '.pto')
+
+
+def concatenate_fasta_files(fasta_files, output_filename):
+    """Write the records of all FASTA files to one FASTA file"""
+    with open(output_filename, 'wb') as out:
+        for fasta_file in fasta_files:
+            with open(fasta_file, 'rb') as fasta:
+                content = fasta.read()
+            out.write(content)
+            if content and not content.endswith(b'\n'):
+                out.write(b'\n')
+
+
+def get_makeblastdb_version():
+    return subprocess.run(['makeblastdb', '-version'], check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout.strip()
+
+
+def build_blast_db(fasta_file):
+    """Build a protein BLAST database named after the FASTA file"""
+    subprocess.run(['makeblastdb', '-in', fasta_file, '-dbtype', 'prot', '-out', fasta_file], check=True)
+
+
+def get_arguments():
+    parser = argparse.ArgumentParser(description='Build one protein BLAST database of the PBP alleles of all types.')
+    parser.add_argument('--fasta', '-f', dest='fasta', required=True, nargs='+',
+                        help='PBP allele FASTA files.', type = str)
+    parser.add_argument('--output', '-o', dest='output', required=True,
+                        help='Output FASTA file, also used as the name of the BLAST database.', type = str)
+    add_cache_arguments(parser)
+    return parser
+
+
+def main():
+    args = get_arguments().parse_args()
+
+    # Combine the allele databases of all PBP types
+    concatenate_fasta_files(args.fasta, args.output)
+
+    # Build the BLAST database, or restore it from the cache if it was built from the same alleles
+    output_files = [args.output + extension for extension in BLAST_DB_EXTENSIONS]
+    params = {'makeblastdb': get_makeblastdb_version(), 'db_version': args.db_version}
+    run_cached(get_cache(args), 'build_pbp_blast_db', [args.output], params, output_files,
+               lambda: build_blast_db(args.output))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 from __future__ import print_function
 import argparse
+import os
 import sys
 from lib.file_utils import FileUtils
 import pandas as pd
@@ -58,6 +59,213 @@ def rename_columns(df, header_dict: dict, id_df: pd.DataFrame):
     return df
 
 
+def read_first_row(file):
+    """Read the first row of a tab-delimited results file as a dictionary of its non-empty values"""
+    try:
+        with open(file, 'r') as f:
+            headers = f.readline().rstrip('\n').split('\t')
+            values = f.readline().rstrip('\n').split('\t')
+    except IOError:
+        return {}
+
+    return {header: value for header, value in zip(headers, values) if value}
+
+
+def combine_rows(rows):
+    """Combine result rows where the first non-empty value of each column is kept"""
+    combined_row = {}
+    for row in rows:
+        for header, value in row.items():
+            combined_row.setdefault(header, value)
+
+    return combined_row
+
+
+def read_manifest(manifest_file):
+    """Read a tab-delimited manifest of sample ID, serotyper, resistance incidence, resistance variants, MLST and surface incidence result files"""
+    samples = []
+    with open(manifest_file, 'r') as manifest:
+        for line in manifest:
+            fields = line.rstrip('\n').split('\t')
+            if not fields[0]:
+                continue
+            if len(fields) != 6:
+                raise ValueError('Manifest line needs a sample ID and five result files: {}'.format(line.rstrip('\n')))
+            samples.append((fields[0], fields[1:]))
+
+    return samples
+
+
+def get_cohort_header(header_dict: dict):
+    """Get the header line of the cohort report"""
+    return '\t'.join(header_dict["id"] + list(header_dict["combine_all"].values())) + '\n'
+
+
+def create_cohort_row(id, files: list, header_dict: dict, version_row: dict):
+    """Combine the result files of one sample into a report line"""
+    combined_row = combine_rows([read_first_row(file) for file in files] + [version_row])
+
+    return '\t'.join([id] + [combined_row.get(header, '') for header in header_dict["combine_all"]]) + '\n'
+
+
+def write_cohort_report(samples, header_dict: dict, version_file, output_filename):
+    """Stream the combined results of every sample into one report, one row per sample"""
+    version_row = read_first_row(version_file)
+    try:
+        with open(output_filename, 'w') as out:
+            out.write(get_cohort_header(header_dict))
+            for id, files in samples:
+                out.write(create_cohort_row(id, files, header_dict, version_row))
+    except IOError:
+        print('Cannot open filename starting "{}"'.format(output_filename))
+        raise
+
+
+def build_report_index(report_filename):
+    """Index the byte offset and length of each report row by sample ID, skipping the blank lines of replaced rows"""
+    index = {}
+    with open(report_filename, 'rb') as report:
+        offset = len(report.readline())
+        for line in report:
+            if line.strip():
+                index[line.split(b'\t', 1)[0].rstrip(b'\n').decode()] = (offset, len(line))
+            offset += len(line)
+
+    return index
+
+
+def read_report_index(report_filename):
+    """Read the report index, rebuilding it if it is missing or older than the report.
+    Later entries of a sample ID replace earlier ones, so the index can be appended to."""
+    index_filename = report_filename + '.idx'
+    if not os.path.exists(index_filename) or os.path.getmtime(index_filename) < os.path.getmtime(report_filename):
+        index = build_report_index(report_filename)
+        write_report_index(index, index_filename, 'w')
+        return index
+
+    index = {}
+    with open(index_filename, 'r') as f:
+        for line in f:
+            id, offset, length = line.rstrip('\n').split('\t')
+            index[id] = (int(offset), int(length))
+
+    return index
+
+
+def write_report_index(index: dict, index_filename, mode):
+    """Write (or append) report index entries of sample ID, byte offset and length"""
+    with open(index_filename, mode) as out:
+        for id, (offset, length) in index.items():
+            out.write(f'{id}\t{offset}\t{length}\n')
+
+
+def update_cohort_report(samples, header_dict: dict, version_file, report_filename):
+    """Merge the rows of new samples into an existing report by sample ID
+
+    Rows of samples already in the report are replaced if they changed and new samples are appended.
+    A changed row of the same length is overwritten in place, otherwise it is blanked (readers skip blank lines)
+    and the new row is appended. Only changed and new rows are written, so updates cost O(new samples)."""
+    if not os.path.exists(report_filename):
+        write_cohort_report(samples, header_dict, version_file, report_filename)
+        read_report_index(report_filename)
+        return
+
+    header = get_cohort_header(header_dict).encode()
+    with open(report_filename, 'rb') as report:
+        if report.readline() != header:
+            raise ValueError('Columns of {} do not match the headers'.format(report_filename))
+
+    index = read_report_index(report_filename)
+    version_row = read_first_row(version_file)
+    rows = {id: create_cohort_row(id, files, header_dict, version_row).encode() for id, files in samples}
+
+    changed_rows = {}
+    new_rows = {}
+    with open(report_filename, 'rb') as report:
+        for id, row in rows.items():
+            if id in index:
+                offset, length = index[id]
+                report.seek(offset)
+                if report.read(length) != row:
+                    changed_rows[id] = row
+            else:
+                new_rows[id] = row
+
+    if not changed_rows and not new_rows:
+        return
+
+    appended_rows = {}
+    new_index = {}
+    with open(report_filename, 'r+b') as report:
+        for id, row in changed_rows.items():
+            offset, length = index[id]
+            report.seek(offset)
+            if len(row) == length:
+                report.write(row)
+            else:
+                report.write(b'\n' * length)
+                appended_rows[id] = row
+        appended_rows.update(new_rows)
+
+        offset = report.seek(0, os.SEEK_END)
+        for id, row in appended_rows.items():
+            report.write(row)
+            new_index[id] = (offset, len(row))
+            offset += len(row)
+
+    # Append the moved and new rows to the index, which also keeps it newer than the report
+    index_filename = report_filename + '.idx'
+    write_report_index(new_index, index_filename, 'a')
+    os.utime(index_filename)
+
+
+def get_column_dtypes(header_dict: dict, columns: list):
+    """Get column data types from the headers: serotype and incidence columns are categorical, all others strings"""
+    categorical = set(header_dict["sero_res"]) | set(header_dict["surface_inc"])
+    categorical |= {header_dict["combine_all"][column] for column in categorical if column in header_dict["combine_all"]}
+
+    return {column: 'category' if column in categorical else 'string' for column in columns}
+
+
+def read_table(file, header_dict: dict):
+    """Read a tab-delimited results table with the column data types from the headers"""
+    df = pd.read_csv(file, sep="\t", dtype=str, keep_default_na=False, na_values=[''])
+
+    return df.astype(get_column_dtypes(header_dict, df.columns.to_list()))
+
+
+def get_id_df(id, header_dict: dict):
+    return pd.DataFrame(id, columns=header_dict["id"], index = [0])
+
+
+def write_sero_res_results(id_df: pd.DataFrame, header_dict: dict, sero, inc, alleles, variants, output):
+    """Write the serotyping and resistance typing results of a sample with its ID"""
+    # Merge serotyping and resistance typing results (including ID)
+    df_sero_res = create_df(header_dict["sero_res"], id_df, [sero, inc])
+    FileUtils.write_pandas_output(df_sero_res, output + "_sero_res_incidence.txt")
+
+    # Add ID to alleles from resistance typing results
+    df_res_alleles = create_df(header_dict["res_alleles"], id_df, [alleles])
+    FileUtils.write_pandas_output(df_res_alleles, output + "_id_alleles_variants.txt")
+
+    # Add ID to variants from resistance typing results
+    df_gbs_res_variants = create_df(header_dict["gbs_res_variants"], id_df, [variants])
+    FileUtils.write_pandas_output(df_gbs_res_variants, output + "_id_variants.txt")
+
+
+def write_surface_typer_results(id_df: pd.DataFrame, header_dict: dict, surface_inc, surface_variants, output):
+    """Write the surface typing results of a sample with its ID"""
+    # Add ID to surface typing incidence results
+    if surface_inc:
+        df_surface_inc = create_df(header_dict["surface_inc"], id_df, [surface_inc])
+        FileUtils.write_pandas_output(df_surface_inc, output + "_surface_protein_incidence.txt")
+
+    # Add ID to surface typing variants results
+    if surface_variants:
+        df_surface_variants = create_df(header_dict["surface_variants"], id_df, [surface_variants])
+        FileUtils.write_pandas_output(df_surface_variants, output + "_surface_protein_variants.txt")
+
+
 def get_arguments():
     """Parse allowed argument combinations"""
     parser = argparse.ArgumentParser(description='Combine sample results for a specified pipeline.')
@@ -145,6 +353,38 @@ def get_arguments():
                         help='Output prefix.')
     subparser_combine_all.set_defaults(which='combine_all')
 
+    subparser_combine_cohort = subparsers.add_parser(
+        'combine_cohort',
+        help='',
+        description='Combine all results of a cohort into one report.'
+    )
+
+    subparser_combine_cohort.add_argument('--headers', '-t', dest='headers', required=True,
+                        help='JSON file of expected headers.')
+    subparser_combine_cohort.add_argument('--manifest', '-f', dest='manifest', required=True,
+                        help='Tab-delimited file of sample ID, serotyper, resistance incidence, resistance variants, MLST allelic frequency and surface incidence results files, one sample per line.')
+    subparser_combine_cohort.add_argument('--version', '-n', dest='version', required=True,
+                        help='Input file with version of pipeline.')
+    subparser_combine_cohort.add_argument('--output', '-o', dest='output', required=True,
+                        help='Output report filename.')
+    subparser_combine_cohort.add_argument('--update', '-u', dest='update', action='store_true', default=False,
+                        help='Merge the samples into an existing output report by sample ID, replacing changed rows and appending new ones.')
+    subparser_combine_cohort.set_defaults(which='combine_cohort')
+
+    subparser_parquet = subparsers.add_parser(
+        'parquet',
+        help='',
+        description='Convert a tab-delimited results table to a columnar Parquet file.'
+    )
+
+    subparser_parquet.add_argument('--headers', '-t', dest='headers', required=True,
+                        help='JSON file of expected headers.')
+    subparser_parquet.add_argument('--input', '-i', dest='input', required=True,
+                        help='Input tab-delimited results table.')
+    subparser_parquet.add_argument('--output', '-o', dest='output', required=True,
+                        help='Output Parquet filename.')
+    subparser_parquet.set_defaults(which='parquet')
+
     return parser
 
 
@@ -153,31 +393,27 @@ def main():
     args = parser.parse_args()
 
     header_dict = read_header_json(args.headers)
-    id_df = pd.DataFrame(args.id, columns=header_dict["id"], index = [0])
 
-    if args.which == "sero_res":
-        # Merge serotyping and resistance typing results (including ID)
-        df_sero_res = create_df(header_dict["sero_res"], id_df, [args.sero, args.inc])
-        FileUtils.write_pandas_output(df_sero_res, args.output + "_sero_res_incidence.txt")
+    if args.which == "combine_cohort":
+        # Combine ID, serotyping and resistance typing incidence, resistance typing variants, MLST type and allelic frequency, surface protein incidence of all samples
+        if args.update:
+            update_cohort_report(read_manifest(args.manifest), header_dict, args.version, args.output)
+        else:
+            write_cohort_report(read_manifest(args.manifest), header_dict, args.version, args.output)
+        return
 
-        # Add ID to alleles from resistance typing results
-        df_res_alleles = create_df(header_dict["res_alleles"], id_df, [args.alleles])
-        FileUtils.write_pandas_output(df_res_alleles, args.output + "_id_alleles_variants.txt")
+    if args.which == "parquet":
+        # Convert a final results table to Parquet so that columns can be loaded on their own
+        FileUtils.write_parquet_output(read_table(args.input, header_dict), args.output)
+        return
 
-        # Add ID to variants from resistance typing results
-        df_gbs_res_variants = create_df(header_dict["gbs_res_variants"], id_df, [args.variants])
-        FileUtils.write_pandas_output(df_gbs_res_variants, args.output + "_id_variants.txt")
+    id_df = get_id_df(args.id, header_dict)
+
+    if args.which == "sero_res":
+        write_sero_res_results(id_df, header_dict, args.sero, args.inc, args.alleles, args.variants, args.output)
 
     elif args.which == "surface_typer":
-        # Add ID to surface typing incidence results
-        if args.surface_inc:
-            df_surface_inc = create_df(header_dict["surface_inc"], id_df, [args.surface_inc])
-            FileUtils.write_pandas_output(df_surface_inc, args.output + "_surface_protein_incidence.txt")
-
-        # Add ID to surface typing variants results
-        if args.surface_variants:
-            df_surface_variants = create_df(header_dict["surface_variants"], id_df, [args.surface_variants])
-            FileUtils.write_pandas_output(df_surface_variants, args.output + "_surface_protein_variants.txt")
+        write_surface_typer_results(id_df, header_dict, args.surface_inc, args.surface_variants, args.output)
 
     elif args.which == "pbp_typer":
         # Add ID to PBP typer existing allele results
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import argparse, sys
+from lib.result_cache import add_cache_arguments, get_cache, run_cached
 
 
 def get_mismatch_and_depth(file):
@@ -46,17 +47,27 @@ def get_arguments():
                         help='Minimum read depth threshold.', type = int)
     parser.add_argument('--output_prefix', '-o', dest='output', required=True,
                         help='Output file of alleles.', type = str)
+    add_cache_arguments(parser)
     return parser
 
 
 def main():
     args = get_arguments().parse_args()
 
+    output_files = ["{}_new_mlst_alleles.txt".format(args.output), "{}_existing_mlst_alleles.txt".format(args.output)]
+    params = {'min_depth': args.min_depth, 'output': args.output, 'db_version': args.db_version}
+    run_cached(get_cache(args), 'get_alleles_from_srst2_mlst', [args.mlst], params, output_files,
+               lambda: process_mlst_results(args.mlst, args.min_depth, args.output))
+
+
+def process_mlst_results(mlst_file, min_depth, output_prefix):
+    """Write the new or existing MLST alleles of the SRST2 MLST results"""
+
     # Get contents of mlst results file
-    mismatch_depth = get_mismatch_and_depth(args.mlst)
+    mismatch_depth = get_mismatch_and_depth(mlst_file)
 
     # Get alleles from mismatch
-    get_new_and_existing_alleles(mismatch_depth, args.min_depth, args.output)
+    get_new_and_existing_alleles(mismatch_depth, min_depth, output_prefix)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 from collections import defaultdict
 import argparse, sys
+from lib.file_io import read_seq_records
 from lib.seq_data import SeqData, BlastData
 
 IDENTITY_THRESHOLD = 50
@@ -15,50 +16,72 @@ def write_content(content, output_file):
 
 def get_imperfect_allele(best_blast_hits, query_seq_data):
     seq_lengths = query_seq_data.calculate_seq_length()
-    return ['>' + hit + '\n' + query_seq_data.get_data()[hit] + '\n' for hit in best_blast_hits if (100 > float(best_blast_hits[hit][1]) >= IDENTITY_THRESHOLD) and (seq_lengths[hit]/int(best_blast_hits[hit][2]) >= FRAGMENT_LENGTH_THRESHOLD)]
+    return ['>' + query + '\n' + query_seq_data.get_data()[query] + '\n' for query, hit in best_blast_hits.items() if (100 > hit.pident >= IDENTITY_THRESHOLD) and (seq_lengths[query]/hit.length >= FRAGMENT_LENGTH_THRESHOLD)]
 
 
 def get_identical_allele(best_blast_hits):
-    return ['Contig\tPBP_allele\n' + hit + '\t' + best_blast_hits[hit][0] + '\n' for hit in best_blast_hits if float(best_blast_hits[hit][1]) == 100]
+    return ['Contig\tPBP_allele\n' + query + '\t' + hit.sseqid + '\n' for query, hit in best_blast_hits.items() if hit.pident == 100]
 
 
-def get_arguments():
-    parser = argparse.ArgumentParser(description='Output the start and end positions of b-lactam genes from contigs in a BED file.')
-    parser.add_argument('--blast_out_file', '-b', dest='blast_out', required=True,
-                        help='Input BLAST results file.', type = str)
-    parser.add_argument('--query_fasta', '-f', dest='fasta_qu', required=True,
-                        help='Fasta file query.', type = str)
-    parser.add_argument('--output_prefix', '-o', dest='output', required=True,
-                        help='Output prefix.', type = str)
-    return parser
+def get_allele_ids(allele_fasta):
+    """Get the sequence IDs of the alleles of a PBP allele FASTA file, as BLAST reports them"""
+    return {name.split()[0] if name else name for name, _ in read_seq_records(allele_fasta)}
 
 
-def main():
-    args = get_arguments().parse_args()
-
-    # Load blast data
-    blast_data = BlastData(args.blast_out)
-
-    # Get blast best hit
-    best_blast_hits = blast_data.get_best_hit()
-
-    # Load sequence data
-    seq_data = SeqData(args.fasta_qu)
+def write_pbp_alleles(best_blast_hits, query_seq_data, output_prefix):
+    """Write the identical alleles, or else the imperfect alleles, of the queries of one PBP type"""
+    query_hits = {query: hit for query, hit in best_blast_hits.items() if query in query_seq_data.get_data()}
 
     # Get identical allele
-    identical_allele = get_identical_allele(best_blast_hits)
+    identical_allele = get_identical_allele(query_hits)
 
     # Get imperfect allele
-    imperfect_allele = get_imperfect_allele(best_blast_hits, seq_data)
+    imperfect_allele = get_imperfect_allele(query_hits, query_seq_data)
 
     # Write data
     if identical_allele:
-        write_content(identical_allele, args.output + '_existing_allele.txt')
+        write_content(identical_allele, output_prefix + '_existing_allele.txt')
     elif imperfect_allele:
-        write_content(imperfect_allele, args.output + '_new_allele.faa')
+        write_content(imperfect_allele, output_prefix + '_new_allele.faa')
     else:
         print('Error: No hits found.')
 
 
+def get_arguments():
+    parser = argparse.ArgumentParser(description='Output the start and end positions of b-lactam genes from contigs in a BED file.')
+    parser.add_argument('--blast_out_file', '-b', dest='blast_out', required=False,
+                        help='Input BLAST results file.', type = str)
+    parser.add_argument('--allele_fasta', '-a', dest='allele_fasta', required=True, nargs='+',
+                        help='PBP allele FASTA file of each PBP type, in the order of the query files. Only hits to the alleles of the same type are kept, and without BLAST results the queries are matched against them in process.', type = str)
+    parser.add_argument('--query_fasta', '-f', dest='fasta_qu', required=True, nargs='+',
+                        help='Fasta file query of each PBP type.', type = str)
+    parser.add_argument('--output_prefix', '-o', dest='output', required=True, nargs='+',
+                        help='Output prefix of each PBP type, in the order of the query files.', type = str)
+    return parser
+
+
+def main():
+    parser = get_arguments()
+    args = parser.parse_args()
+    if len(args.fasta_qu) != len(args.output):
+        parser.error('Give one output prefix for each query FASTA file.')
+    if len(args.fasta_qu) != len(args.allele_fasta):
+        parser.error('Give one allele FASTA file for each query FASTA file.')
+
+    if not args.blast_out:
+        # Match queries against the alleles in process (imported here as it loads Biopython)
+        from lib.pbp_matcher import PbpAlleleMatcher
+
+    # Write the alleles of each PBP type
+    for query_fasta, allele_fasta, output_prefix in zip(args.fasta_qu, args.allele_fasta, args.output):
+        seq_data = SeqData(query_fasta)
+        if args.blast_out:
+            # Get blast best hit of the queries among the alleles of this PBP type, as all types are blasted at once
+            best_hits = BlastData(args.blast_out).get_best_hit(get_allele_ids(allele_fasta))
+        else:
+            best_hits = PbpAlleleMatcher.from_fasta_files([allele_fasta]).get_best_hits(seq_data.get_data())
+        write_pbp_alleles(best_hits, seq_data, output_prefix)
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -2,6 +2,9 @@
 from collections import defaultdict
 import argparse, sys
 from lib.seq_data import SeqData, BlastData
+from lib.fasta_reader import FastaReader
+from lib.file_io import write_seq_dict
+from lib.six_frame_translation import reverse_complement, six_frame_translate_records
 
 
 class FragmentData():
@@ -9,36 +12,53 @@ class FragmentData():
         self._fragment_positions = {}
 
     def get_start_end_positions(self, best_hits, seq_lengths, alignment_length_threshold, identity_threshold):
-        for allele, stat in best_hits.items():
-            if float(best_hits[allele][1]) >= identity_threshold * 100 and float(best_hits[allele][2]) >= alignment_length_threshold * seq_lengths[allele]:
-                self.calculate_start_end_positions(allele, best_hits[allele], seq_lengths[allele])
-
-    def calculate_start_end_positions(self, allele, stats, seq_length):
-        if int(stats[8]) > int(stats[7]):
-            frag_start = int(stats[7]) - int(stats[5])
-            frag_end = (seq_length - int(stats[6])) + int(stats[8])
-            self._fragment_positions[allele] = (stats[0], str(frag_start), str(frag_end), 'forward', '1', '+')
-        elif int(stats[8]) < int(stats[7]):
-            frag_start = int(stats[7]) + int(stats[5]) - 1
-            frag_end = int(stats[8]) - (seq_length - int(stats[6])) - 1
-            self._fragment_positions[allele] = (stats[0], str(frag_end), str(frag_start), 'reverse', '1', '-')
+        for allele, hit in best_hits.items():
+            if hit.pident >= identity_threshold * 100 and hit.length >= alignment_length_threshold * seq_lengths[allele]:
+                self.calculate_start_end_positions(allele, hit, seq_lengths[allele])
+
+    def calculate_start_end_positions(self, allele, hit, seq_length):
+        if hit.send > hit.sstart:
+            frag_start = hit.sstart - hit.qstart
+            frag_end = (seq_length - hit.qend) + hit.send
+            self._fragment_positions[allele] = (hit.sseqid, str(frag_start), str(frag_end), 'forward', '1', '+')
+        elif hit.send < hit.sstart:
+            frag_start = hit.sstart + hit.qstart - 1
+            frag_end = hit.send - (seq_length - hit.qend) - 1
+            self._fragment_positions[allele] = (hit.sseqid, str(frag_end), str(frag_start), 'reverse', '1', '-')
 
     def get_data(self):
         return self._fragment_positions
 
-    def write_start_end_positions(self, output_prefix):
-        if self._fragment_positions.items():
-            for allele, frag_stats in self._fragment_positions.items():
-                output_filename = output_prefix + allele + '.bed'
-                try:
-                    with open(output_filename, 'w') as out:
-                        out.write('\t'.join(frag_stats) + '\n')
-                except IOError:
-                    print('Cannot open {}.'.format(output_filename))
+    def get_contig_fragments(self, contigs_file):
+        """Extract the contig sequence of each fragment, with its name as by bedtools getfasta -s and its strand"""
+        fragments = {}
+        with FastaReader(contigs_file) as contigs:
+            for allele, (contig, start, end, _, _, strand) in self._fragment_positions.items():
+                start, end = int(start), int(end)
+                if contig not in contigs or start < 0 or end > contigs.get_length(contig):
+                    print('Fragment {}:{}-{} of {} is beyond the length of the contig. Skipping.'.format(contig, start, end, allele))
+                    continue
+                fragments[allele] = ('{}:{}-{}({})'.format(contig, start, end, strand), strand, contigs.get_sequence(contig, start, end))
+
+        return fragments
+
+    def get_fragment_sequences(self, contigs_file):
+        """Extract the strand-aware sequence of each fragment from the contigs, named as by bedtools getfasta -s"""
+        return {allele: (header, reverse_complement(seq) if strand == '-' else seq)
+                for allele, (header, strand, seq) in self.get_contig_fragments(contigs_file).items()}
+
+    def write_translated_fragments(self, contigs_file, output_prefix):
+        """Write the amino acid translation of each fragment to its own FAA file"""
+        fragments = self.get_contig_fragments(contigs_file)
+        translations = dict(six_frame_translate_records((allele, seq) for allele, (_, _, seq) in fragments.items()))
+        for allele, (header, strand, _) in fragments.items():
+            # Frame 4 is the first frame of the reverse complement
+            frame = 4 if strand == '-' else 1
+            write_seq_dict({header: translations[allele][frame - 1]}, output_prefix + allele + '.faa')
 
 
 def get_arguments():
-    parser = argparse.ArgumentParser(description='Output the start and end positions of b-lactam genes from contigs in a BED file.')
+    parser = argparse.ArgumentParser(description='Output the translated b-lactam genes from contigs in FAA files.')
     parser.add_argument('--blast_out_file', '-b', dest='blast_out', required=True,
                         help='Input BLAST results file.', type = str)
     parser.add_argument('--query_fasta', '-f', dest='fasta_qu', required=True,
@@ -48,7 +68,9 @@ def get_arguments():
     parser.add_argument('--frac_identity_threshold', '-fi', dest='frac_ident', required=False,
                         help='Fraction of identity threshold.', type = float, default=0.5)
     parser.add_argument('--output_prefix', '-o', dest='output', required=True,
-                        help='Output BED file.', type = str)
+                        help='Output prefix of the FAA files.', type = str)
+    parser.add_argument('--contigs', '-c', dest='contigs', required=True,
+                        help='FASTA file of contigs.', type = str)
     return parser
 
 
@@ -81,8 +103,8 @@ def main():
     fragment_data = FragmentData()
     fragment_data.get_start_end_positions(best_blast_hits, seq_lengths, args.frac_align, args.frac_ident)
 
-    # Write fragments
-    fragment_data.write_start_end_positions(args.output)
+    # Write translated fragments
+    fragment_data.write_translated_fragments(args.contigs, args.output)
 
 
 if __name__ == "__main__":
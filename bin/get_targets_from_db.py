@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 import argparse, sys, re
+from contextlib import ExitStack
+from lib.fasta_index import get_fasta_index, write_target_records
 
 
 def get_targets(targets_file):
@@ -35,9 +37,21 @@ def write_fasta_file(fasta_file, target, output_prefix):
 
 
 def write_target_fasta_files(targets, fasta_file, output_prefix):
-    """Write a FASTA file for each target from targets list"""
-    for target in targets:
-        write_fasta_file(fasta_file, target, output_prefix)
+    """Write a FASTA file for each target from targets list in a single pass of the FASTA file"""
+    with ExitStack() as stack:
+        # Open one output per target, keyed by the header it matches
+        target_outputs = {}
+        for target in targets:
+            if target not in target_outputs:
+                target_outputs[target] = stack.enter_context(open(output_prefix + target + '_ref.fna', 'w'))
+
+        with open(fasta_file, 'r') as fasta:
+            out = None
+            for line in fasta:
+                if line[0] == '>':
+                    out = target_outputs.get(line[1:].rstrip('\n'))
+                if out is not None:
+                    out.write(line)
 
 
 def get_arguments():
@@ -48,6 +62,8 @@ def get_arguments():
                         help='Input target text file.')
     parser.add_argument('--output_prefix', '-o', dest='output', required=True,
                         help='Output prefix.')
+    parser.add_argument('--fasta_index', '-i', dest='fasta_index', required=False, default=None,
+                        help='FASTA index (.fai) of the input FASTA file. Default: the .fai file next to the FASTA file, if it exists.')
     return parser
 
 
@@ -57,8 +73,12 @@ def main():
     # Get list of target names from target text file
     targets = get_targets(args.target)
 
-    # Write FASTA file for each target specified 
-    write_target_fasta_files(targets, args.fasta, args.output)
+    # Write FASTA file for each target specified, looking records up in the FASTA index if there is one
+    fasta_index = get_fasta_index(args.fasta, args.fasta_index)
+    if fasta_index is not None:
+        write_target_records(targets, args.fasta, fasta_index, args.output)
+    else:
+        write_target_fasta_files(targets, args.fasta, args.output)
 
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import argparse, sys, re
+from contextlib import ExitStack
 
 
 def get_targets(targets_file):
@@ -13,7 +14,7 @@ def get_targets(targets_file):
 
 def in_line(line, target):
     """Return True if headers and mappings of target sequence is in main SAM file, otherwise False"""
-    if (bool(re.search('^@HD|^\@SQ.*' + target + '|^@PG', line))==True):
+    if (bool(re.search(r'^@HD|^@SQ.*' + target + '|^@PG', line))==True):
         return True
     elif (line.split('\t')[2] == target):
         return True
@@ -30,16 +31,89 @@ def write_sam_file(sam_file, target, id, output_prefix):
                     out.write(line)
 
 
+def get_header_sequence_name(line):
+    """Return the reference sequence name (SN tag) of a SAM @SQ header line"""
+    for field in line.rstrip('\n').split('\t')[1:]:
+        if field.startswith('SN:'):
+            return field[3:]
+    return None
+
+
 def write_target_sam_files(targets, sam_file, id, output_prefix):
-    """Write a SAM file for each ID and target from targets list"""
-    for target in targets:
-        write_sam_file(sam_file, target, id, output_prefix)
+    """Write a SAM file for each ID and target from targets list in a single pass of the SAM file"""
+    with ExitStack() as stack:
+        # Open one output per target, keyed by the reference name its alignments map to
+        target_outputs = {}
+        for target in targets:
+            if target not in target_outputs:
+                target_outputs[target] = stack.enter_context(open(output_prefix + target + '_' + id + '_seq.sam', 'w'))
+        all_outputs = list(target_outputs.values())
+
+        with open(sam_file, 'r') as sam:
+            for line in sam:
+                if line[0] == '@':
+                    record_type = line[:3]
+                    if record_type == '@HD' or record_type == '@PG':
+                        for out in all_outputs:
+                            out.write(line)
+                    elif record_type == '@SQ':
+                        out = target_outputs.get(get_header_sequence_name(line))
+                        if out is not None:
+                            out.write(line)
+                else:
+                    # Route alignment by its RNAME column
+                    out = target_outputs.get(line.split('\t', 3)[2])
+                    if out is not None:
+                        out.write(line)
+
+
+def get_target_alignment_line(read, target_tid):
+    """Return the SAM line of an alignment, with mate references to sequences other than the target cleared"""
+    fields = read.to_string().split('\t')
+    if fields[6] != '=' and read.next_reference_id != target_tid:
+        fields[6] = '*'
+    return '\t'.join(fields)
+
+
+def write_bam_file(bam, target, id, output_prefix):
+    """Write an indexed BAM file for the ID and target from a region query of the indexed BAM file"""
+    import pysam
+
+    output_filename = output_prefix + target + '_' + id + '_seq.bam'
+    header = bam.header.to_dict()
+    target_header = {key: value for key, value in header.items() if key in ('HD', 'PG')}
+    target_header['SQ'] = [sq for sq in header.get('SQ', []) if sq['SN'] == target]
+
+    with pysam.AlignmentFile(output_filename, 'wb', header=target_header) as out:
+        target_tid = bam.get_tid(target)
+        if target_tid >= 0:
+            for read in bam.fetch(target):
+                out.write(pysam.AlignedSegment.fromstring(get_target_alignment_line(read, target_tid), out.header))
+
+    pysam.index(output_filename, output_prefix + target + '_' + id + '_seq.bai')
+
+
+def write_target_bam_files(targets, bam_file, id, output_prefix):
+    """Write an indexed BAM file for each ID and target from targets list"""
+    import pysam
+
+    with pysam.AlignmentFile(bam_file, 'rb') as bam:
+        has_index = bam.has_index()
+    if not has_index:
+        pysam.index(bam_file)
+
+    with pysam.AlignmentFile(bam_file, 'rb') as bam:
+        for target in dict.fromkeys(targets):
+            write_bam_file(bam, target, id, output_prefix)
 
 
 def get_arguments():
     parser = argparse.ArgumentParser(description='Get targets from sam file.')
-    parser.add_argument('--sam_file', '-s', dest='sam', required=True,
+    input_group = parser.add_mutually_exclusive_group(required=True)
+    input_group.add_argument('--sam_file', '-s', dest='sam',
                         help='Input sam file.')
+    input_group.add_argument('--bam_file', '-b', dest='bam',
+                        help='Input coordinate-sorted bam file. Writes an indexed bam file for each target.')
     parser.add_argument('--target_file', '-t', dest='target', required=True,
                         help='Input target text file.')
     parser.add_argument('--id', '-i', dest='id', required=True,
@@ -55,8 +129,12 @@ def main():
     # Get list of target names from target text file
     targets = get_targets(args.target)
 
-    # Write SAM file for each ID and target specified
-    write_target_sam_files(targets, args.sam, args.id, args.output)
+    if args.bam is not None:
+        # Write indexed BAM file for each ID and target specified
+        write_target_bam_files(targets, args.bam, args.id, args.output)
+    else:
+        # Write SAM file for each ID and target specified
+        write_target_sam_files(targets, args.sam, args.id, args.output)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+import argparse, sys, os, glob, hashlib, json
+from lib.fasta_index import build_fasta_index, write_fasta_index
+
+FASTA_EXTENSIONS = ('.fasta', '.fa', '.fna', '.faa')
+BUNDLE_FILE = 'bundle.json'
+
+
+def get_fasta_files(db_dir):
+    """Get every FASTA file of the database version"""
+    return sorted(filename for filename in glob.glob(os.path.join(db_dir, '**', '*'), recursive=True)
+                  if filename.endswith(FASTA_EXTENSIONS))
+
+
+def get_checksum(filename):
+    """Get the sha256 checksum of a file"""
+    hasher = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def index_fasta_files(fasta_files):
+    """Write a .fai index next to each FASTA file"""
+    index_files = []
+    for fasta_file in fasta_files:
+        index_file = fasta_file + '.fai'
+        write_fasta_index(build_fasta_index(fasta_file), index_file)
+        index_files.append(index_file)
+    return index_files
+
+
+def prepare_db(db_dir):
+    """Build the FASTA indexes of a database version and describe them in a bundle file"""
+    fasta_files = get_fasta_files(db_dir)
+    index_files = index_fasta_files(fasta_files)
+
+    bundle = {
+        'version': os.path.basename(os.path.normpath(db_dir)),
+        'fasta': {os.path.relpath(fasta_file, db_dir): get_checksum(fasta_file) for fasta_file in fasta_files},
+        'fasta_index': [os.path.relpath(index_file, db_dir) for index_file in index_files],
+    }
+    with open(os.path.join(db_dir, BUNDLE_FILE), 'w') as out:
+        json.dump(bundle, out, indent=4)
+        out.write('\n')
+    return bundle
+
+
+def get_arguments():
+    parser = argparse.ArgumentParser(description='Prepare a database version for the pipeline.')
+    parser.add_argument('--db_dir', '-d', dest='db_dir', required=True,
+                        help='Database version directory, e.g. db/0.2.1.')
+    return parser
+
+
+def main():
+    args = get_arguments().parse_args()
+
+    prepare_db(args.db_dir)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
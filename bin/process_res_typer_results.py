@@ -6,11 +6,16 @@ import re
 import glob
 import subprocess
 import json
-import pandas as pd
+import multiprocessing
 from collections import defaultdict
+from types import MappingProxyType
+from functools import lru_cache
+from lib.allele_names import normalise_allele
 from lib.six_frame_translation import six_frame_translate, extract_frame_aa, codon2aa
 from lib.file_io import get_seq_content
 from lib.file_utils import FileUtils
+from lib.result_cache import add_cache_arguments, get_cache, run_cached
+from lib.srst2_fullgenes import read_fullgenes
 
 class nSeq(str): # Nucleotide sequence
     pass
@@ -20,14 +25,14 @@ class aSeq(str): # Amino acid sequence
     pass
 
 
-# Drug Class Resistance dictionary
-drugRes_Col = {
+# Drug Class Resistance dictionary (read-only template, see ResTyperState)
+drugRes_Col = MappingProxyType({
     'AG': 'neg',
     'TET': 'neg',
     'EC': 'neg',
     'FQ': 'neg',
     'OTHER': 'neg',
-}
+})
 
 # Gene to Drug Class Resistance lookup dictionary
 geneToClass = {
@@ -75,8 +80,8 @@ geneToClass = {
     'RPOBGBS-4': 'OTHER',
 }
 
-# Other Resistance Targets dictionary
-Res_Targets = {
+# Other Resistance Targets dictionary (read-only template)
+Res_Targets = MappingProxyType({
     'AAC6APH2': 'neg',
     'AADECC': 'neg',
     'ANT6IA3KF864551': 'neg',
@@ -111,10 +116,10 @@ Res_Targets = {
     'TETS': 'neg',
     'TETW32O': 'neg',
     'TETW4FN396364': 'neg'
-}
+})
 
-# GBS Resistance Targets dictionary
-GBS_Res_Targets = {
+# GBS Resistance Targets dictionary (read-only template)
+GBS_Res_Targets = MappingProxyType({
     'GYRA': 'neg',
     'PARC': 'neg',
     '23S1': 'neg',
@@ -123,10 +128,10 @@ GBS_Res_Targets = {
     'RPOBGBS-2': 'neg',
     'RPOBGBS-3': 'neg',
     'RPOBGBS-4': 'neg',
-}
+})
 
-# GBS Gene Resistance Variants dictionary
-GBS_Res_var = {
+# GBS Gene Resistance Variants dictionary (read-only template)
+GBS_Res_var = MappingProxyType({
     'GYRA_SNP': '', #10
     'PARC_SNP': '', #14
     '23S1_SNP': '', #0
@@ -135,7 +140,7 @@ GBS_Res_var = {
     'RPOBGBS-2_SNP': '', #7
     'RPOBGBS-3_SNP': '', #8
     'RPOBGBS-4_SNP': '', #9,
-}
+})
 
 # Reference sequence dictionary
 geneToRef = defaultdict(lambda: '')
@@ -169,11 +174,27 @@ snpOffset.update({
     "PARC": 73
 })
 
-geneAlleleDict = defaultdict(lambda: [])
-
 EOL_SEP = "\n"
 
 
+class ResTyperState():
+    """Per-sample resistance typing results, so that several samples can be processed in one interpreter"""
+
+    __slots__ = ('drug_res_col', 'gbs_res_targets', 'gbs_res_var', 'res_targets', 'gene_allele_dict')
+
+    def __init__(self, drug_res_col, gbs_res_targets, gbs_res_var, res_targets, gene_allele_dict):
+        self.drug_res_col = drug_res_col
+        self.gbs_res_targets = gbs_res_targets
+        self.gbs_res_var = gbs_res_var
+        self.res_targets = res_targets
+        self.gene_allele_dict = gene_allele_dict
+
+    @classmethod
+    def new(cls):
+        """Fresh state for one sample, copied from the module-level templates"""
+        return cls(dict(drugRes_Col), dict(GBS_Res_Targets), dict(GBS_Res_var), dict(Res_Targets), defaultdict(lambda: []))
+
+
 def read_header_json(header_file):
     with open(header_file, 'r') as file:
         header_json = file.read()
@@ -183,9 +204,9 @@ def read_header_json(header_file):
     return header_dict
 
 
-def update_presence_absence_target(gene, allele, depth, gbs_res_target_dict):
+def update_presence_absence_target(gene, allele, min_depth, depth, gbs_res_target_dict):
     """Update presence/absence for GBS Targets dictionary"""
-    if depth >= MIN_DEPTH:
+    if depth >= min_depth:
 
         for gene_name in gbs_res_target_dict.keys():
             if re.search(gene_name, allele):
@@ -193,48 +214,48 @@ def update_presence_absence_target(gene, allele, depth, gbs_res_target_dict):
                 gbs_res_target_dict[gene_name] = "pos"
 
 
-def derive_presence_absence_targets(input_file, GBS_Res_Targets):
+def derive_presence_absence_targets(input_file, min_depth, GBS_Res_Targets):
     """Find gene presence/absence for the GBS resistance database"""
     try:
-        with open(input_file, 'r') as fd:
-            # Skip header row
-            next(fd)
-
-            # Process file lines
-            for line in fd:
-                fields = line.split('\t')
-                gene = fields[2]
-                allele = fields[3]
-                depth = float(fields[5])
-                update_presence_absence_target(gene, allele, depth, GBS_Res_Targets)
+        for record in read_fullgenes(input_file, min_depth):
+            update_presence_absence_target(record.gene, record.allele, min_depth, record.depth, GBS_Res_Targets)
     except IOError:
         print('Cannot open {}.'.format(input_file))
 
 
-def update_presence_absence_target_for_arg_res(gene, allele, depth, drug_res_col_dict, res_target_dict, gene_allele_dict):
-    """Update presence/absence for Other Resistance Targets dictionary"""
-    if depth >= MIN_DEPTH:
+@lru_cache(maxsize=None)
+def compile_target_matcher(gene_names):
+    """Compile gene names into one pattern where the first gene name (in order) found anywhere wins"""
+    return re.compile("|".join("(?=.*?({}))".format(gene_name) for gene_name in gene_names))
 
-        other = 1
-        for gene_name in res_target_dict.keys():
-            if re.search(gene_name, "".join(re.split("[^a-zA-Z0-9]*", allele)).upper()):
-                other = 0
 
-                if allele not in gene_allele_dict.keys():
-                    gene_allele_dict[allele] = gene_name
+@lru_cache(maxsize=None)
+def find_target_gene(gene_names, allele):
+    """Return the first gene name found in the normalised allele name, or None"""
+    match = compile_target_matcher(gene_names).match(normalise_allele(allele))
+    if match and match.lastindex:
+        return gene_names[match.lastindex - 1]
+    return None
 
-                if res_target_dict[gene_name] == "neg":
-                    res_target_dict[gene_name] = "pos"
 
-                drugCat = geneToClass[gene_name]
-                if drug_res_col_dict[drugCat] == "neg":
-                    drug_res_col_dict[drugCat] = gene + '[' + allele + ']'
-                else:
-                    drug_res_col_dict[drugCat] = drug_res_col_dict[drugCat] + ':' + gene + '[' + allele + ']'
+def update_presence_absence_target_for_arg_res(gene, allele, min_depth, depth, drug_res_col_dict, res_target_dict, gene_allele_dict):
+    """Update presence/absence for Other Resistance Targets dictionary"""
+    if depth >= min_depth:
+
+        gene_name = find_target_gene(tuple(res_target_dict.keys()), allele)
+        if gene_name is not None:
+            if allele not in gene_allele_dict.keys():
+                gene_allele_dict[allele] = gene_name
 
-                break
+            if res_target_dict[gene_name] == "neg":
+                res_target_dict[gene_name] = "pos"
 
-        if other:
+            drugCat = geneToClass[gene_name]
+            if drug_res_col_dict[drugCat] == "neg":
+                drug_res_col_dict[drugCat] = gene + '[' + allele + ']'
+            else:
+                drug_res_col_dict[drugCat] = drug_res_col_dict[drugCat] + ':' + gene + '[' + allele + ']'
+        else:
             if drug_res_col_dict["OTHER"] == "neg":
                 drug_res_col_dict["OTHER"] = gene + '[' + allele + ']'
             else:
@@ -246,21 +267,13 @@ def clear_arg_res(res_target_dict):
         res_target_dict[key] = ''
 
 
-def derive_presence_absence_targets_for_arg_res(input_files, drugRes_Col, Res_Targets):
+def derive_presence_absence_targets_for_arg_res(input_files, min_depth, drugRes_Col, Res_Targets, gene_allele_dict):
     """Find gene presence/absence for other resistance databases"""
     for input_file in input_files:
         if os.stat(input_file).st_size != 0:
             try:
-                with open(input_file, 'r') as fd:
-                    # Skip header row
-                    next(fd)
-                    # Process file lines
-                    for line in fd:
-                        fields = line.split('\t')
-                        gene = fields[2]
-                        allele = fields[3]
-                        depth = float(fields[5])
-                        update_presence_absence_target_for_arg_res(gene, allele, depth, drugRes_Col, Res_Targets, geneAlleleDict)
+                for record in read_fullgenes(input_file, min_depth):
+                    update_presence_absence_target_for_arg_res(record.gene, record.allele, min_depth, record.depth, drugRes_Col, Res_Targets, gene_allele_dict)
             except IOError:
                 print('Cannot open {}.'.format(input_file))
         else:
@@ -316,51 +329,46 @@ def get_gene_names_from_consensus(consensus_seq_dict):
     return gene_names
 
 
-def get_variants(consensus_seqs):
+def get_variants(consensus_seqs, gbs_res_targets, gbs_res_var, drug_res_col):
     """Get resistance gene variants from freebayes consensus GBS sequences"""
     consensus_seq_dict = get_seq_content(consensus_seqs)
     gene_names = get_gene_names_from_consensus(consensus_seq_dict)
     for gene_name in gene_names:
-        if GBS_Res_Targets[gene_name] == "pos" and geneToTargetSeq[gene_name] and geneToRef[gene_name]:
+        if gbs_res_targets[gene_name] == "pos" and geneToTargetSeq[gene_name] and geneToRef[gene_name]:
             seq_diffs = get_seq_diffs(consensus_seq_dict[geneToTargetSeq[gene_name]], geneToRef[gene_name], snpOffset[gene_name])
-            update_GBS_Res_var(gene_name, seq_diffs, GBS_Res_var)
-            update_drug_res_col_dict(gene_name, seq_diffs, drugRes_Col, geneToClass)
+            update_GBS_Res_var(gene_name, seq_diffs, gbs_res_var)
+            update_drug_res_col_dict(gene_name, seq_diffs, drug_res_col, geneToClass)
 
 
-def run(args):
-
-    # Set minimum read depth
-    global MIN_DEPTH
-    MIN_DEPTH = args.min_depth
+def process_sample(gbs_fg_output, gbs_cs_output, other_fg_output, min_depth, header_dict, output, state):
+    """Type one sample into the given state and write its output files"""
 
     # Get presence/absence of genes
-    derive_presence_absence_targets(args.srst2_gbs_fg_output, GBS_Res_Targets)
+    derive_presence_absence_targets(gbs_fg_output, min_depth, state.gbs_res_targets)
 
-    if args.srst2_other_fg_output is not None:
-        derive_presence_absence_targets_for_arg_res(args.srst2_other_fg_output, drugRes_Col, Res_Targets)
-        GBS_Res_Targets.update(Res_Targets)
+    if other_fg_output is not None:
+        derive_presence_absence_targets_for_arg_res(other_fg_output, min_depth, state.drug_res_col, state.res_targets, state.gene_allele_dict)
+        state.gbs_res_targets.update(state.res_targets)
 
-    inc_out = FileUtils.create_output_contents(GBS_Res_Targets)
+    inc_out = FileUtils.create_output_contents(state.gbs_res_targets)
 
     # Get variants
-    get_variants(args.srst2_gbs_cs_output)
-    var_out = FileUtils.create_output_contents(GBS_Res_var)
+    get_variants(gbs_cs_output, state.gbs_res_targets, state.gbs_res_var, state.drug_res_col)
+    var_out = FileUtils.create_output_contents(state.gbs_res_var)
 
     # Get alleles for all drug classes
-    allele_out = FileUtils.create_output_contents(drugRes_Col)
+    allele_out = FileUtils.create_output_contents(state.drug_res_col)
 
     # Write allele accessions/gene contents
-    header_dict = read_header_json(args.headers)
     content = ""
-    id = args.output.split('/')[len(args.output.split('/'))-1]
-    for key, value in geneAlleleDict.items():
+    id = output.split('/')[len(output.split('/'))-1]
+    for key, value in state.gene_allele_dict.items():
         if value in header_dict["combine_all"]:
-            print(value)
             row_name = header_dict["combine_all"][value]
             content = f'{content}{id}\t{row_name}\t{key}\n'
 
     try:
-        output_filename = args.output + "_res_alleles_accessions.txt"
+        output_filename = output + "_res_alleles_accessions.txt"
         with open(output_filename, 'w') as out:
             out.write(content)
     except IOError:
@@ -368,18 +376,83 @@ def run(args):
         raise
 
     # Write incidence output
-    FileUtils.write_output(inc_out, args.output + '_res_incidence.txt')
+    FileUtils.write_output(inc_out, output + '_res_incidence.txt')
     # Write gbs variant output
-    FileUtils.write_output(var_out, args.output + "_res_gbs_variants.txt")
+    FileUtils.write_output(var_out, output + "_res_gbs_variants.txt")
     # Write allele output
-    FileUtils.write_output(allele_out, args.output + "_res_alleles_variants.txt")
+    FileUtils.write_output(allele_out, output + "_res_alleles_variants.txt")
+
+
+def get_sample_output_files(output):
+    """Get the output files written for one sample"""
+    return [output + suffix for suffix in ["_res_alleles_accessions.txt", '_res_incidence.txt', "_res_gbs_variants.txt", "_res_alleles_variants.txt"]]
+
+
+def process_sample_cached(gbs_fg_output, gbs_cs_output, other_fg_output, min_depth, header_dict, output, state, cache, db_version):
+    """Type one sample, or restore its output files from the result cache"""
+    input_files = [gbs_fg_output, gbs_cs_output] + (other_fg_output or [])
+    params = {
+        'min_depth': min_depth,
+        'db_version': db_version,
+        'headers': header_dict,
+        'id': output.split('/')[len(output.split('/'))-1],
+        'other_fullgenes': other_fg_output is not None
+    }
+    run_cached(cache, 'process_res_typer_results', input_files, params, get_sample_output_files(output),
+               lambda: process_sample(gbs_fg_output, gbs_cs_output, other_fg_output, min_depth, header_dict, output, state))
+
+
+def read_manifest(manifest_file):
+    """Read a tab-delimited manifest of output prefix, GBS fullgenes, GBS consensus and other fullgenes files per sample"""
+    samples = []
+    with open(manifest_file, 'r') as manifest:
+        for line in manifest:
+            fields = line.rstrip('\n').split('\t')
+            if not fields[0]:
+                continue
+            if len(fields) < 3:
+                raise ValueError('Manifest line needs an output prefix, GBS fullgenes and GBS consensus file: {}'.format(line.rstrip('\n')))
+            # No other fullgenes files is the same as a single sample run without --srst2_other_fullgenes
+            samples.append((fields[0], fields[1], fields[2], [file for file in fields[3:] if file] or None))
+    return samples
+
+
+def process_manifest_sample(sample, min_depth, header_dict, cache=None, db_version=''):
+    """Type one manifest sample with its own state"""
+    output, gbs_fg_output, gbs_cs_output, other_fg_output = sample
+    process_sample_cached(gbs_fg_output, gbs_cs_output, other_fg_output, min_depth, header_dict, output, ResTyperState.new(), cache, db_version)
+    return output
+
+
+def run_manifest(args):
+    """Type every sample of a manifest in this interpreter, optionally across a pool of processes"""
+    header_dict = read_header_json(args.headers)
+    samples = read_manifest(args.manifest)
+    cache = get_cache(args)
+    if args.processes > 1:
+        with multiprocessing.Pool(args.processes) as pool:
+            pool.starmap(process_manifest_sample, [(sample, args.min_depth, header_dict, cache, args.db_version) for sample in samples])
+    else:
+        for sample in samples:
+            process_manifest_sample(sample, args.min_depth, header_dict, cache, args.db_version)
+
+
+def run(args):
+
+    if args.manifest is not None:
+        run_manifest(args)
+        return
+
+    header_dict = read_header_json(args.headers)
+    process_sample_cached(args.srst2_gbs_fg_output, args.srst2_gbs_cs_output, args.srst2_other_fg_output, args.min_depth,
+                          header_dict, args.output, ResTyperState.new(), get_cache(args), args.db_version)
 
 
 def get_arguments():
     parser = argparse.ArgumentParser(description='Modify SRST2 sequence typing output files.')
-    parser.add_argument('--srst2_gbs_fullgenes', dest='srst2_gbs_fg_output', required=True,
+    parser.add_argument('--srst2_gbs_fullgenes', dest='srst2_gbs_fg_output', required=False,
                         help='Input SRST2 fullgenes output for the GBS reference database.')
-    parser.add_argument('--srst2_gbs_consensus', dest='srst2_gbs_cs_output', required=True,
+    parser.add_argument('--srst2_gbs_consensus', dest='srst2_gbs_cs_output', required=False,
                         help='Input freebayes consensus sequence output for the GBS reference database.')
     parser.add_argument('--srst2_other_fullgenes', dest='srst2_other_fg_output', required=False,
                         help='Input SRST2 fullgenes outputs for other references databases.',
@@ -388,14 +461,22 @@ def get_arguments():
                         help = 'Minimum read depth where mappings with fewer reads are excluded. Default: 30.')
     parser.add_argument('--headers', dest='headers', required=True,
                         help='JSON file of expected headers.')
-    parser.add_argument('--output_prefix', dest='output', required=True,
+    parser.add_argument('--output_prefix', dest='output', required=False,
                         help='Output prefix of filename.')
+    parser.add_argument('--manifest', dest='manifest', required=False,
+                        help='Tab-delimited file of output prefix, GBS fullgenes, GBS consensus and (optionally) other fullgenes files, one sample per line. Replaces the single sample options.')
+    parser.add_argument('--processes', dest='processes', required=False, type=int, default=1,
+                        help='Number of processes used to type the samples of a manifest. Default: 1.')
+    add_cache_arguments(parser)
 
     return parser
 
 
 def main():
-    args = get_arguments().parse_args()
+    parser = get_arguments()
+    args = parser.parse_args()
+    if args.manifest is None and (args.srst2_gbs_fg_output is None or args.srst2_gbs_cs_output is None or args.output is None):
+        parser.error('--srst2_gbs_fullgenes, --srst2_gbs_consensus and --output_prefix are required without --manifest')
     run(args)
 
 
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+import traceback
+from lib.result_cache import add_cache_arguments, get_cache, run_cached
+from bin import process_serotyper_results, process_surface_typer_results, process_res_typer_results
+from bin.process_res_typer_results import read_header_json
+
+
+def get_sero_output_file(output):
+    return output + '_SeroType_Results.txt'
+
+
+def get_surface_output_files(output):
+    return [output + "_surface_protein_variants_sample.txt", output + '_surface_protein_incidence_sample.txt']
+
+
+def process_sero(fullgenes_file, min_depth, output, cache, db_version):
+    """Write the serotype features of the sample, as process_serotyper_results.py does"""
+    output_file = get_sero_output_file(output)
+    params = {'min_depth': min_depth, 'db_version': db_version}
+    run_cached(cache, 'process_serotyper_results', [fullgenes_file], params, [output_file],
+               lambda: process_serotyper_results.process_fullgenes(fullgenes_file, min_depth, output_file))
+
+
+def process_res(gbs_fullgenes, gbs_consensus, other_fullgenes, min_depth, header_dict, output, cache, db_version):
+    """Write the resistance typing outputs of the sample, as process_res_typer_results.py does"""
+    process_res_typer_results.process_sample_cached(gbs_fullgenes, gbs_consensus, other_fullgenes, min_depth, header_dict, output,
+                                                    process_res_typer_results.ResTyperState.new(), cache, db_version)
+
+
+def process_surface(fullgenes_file, min_depth, output, cache, db_version):
+    """Write the surface protein typing outputs of the sample, as process_surface_typer_results.py does"""
+    output_files = get_surface_output_files(output)
+    params = {'min_depth': min_depth, 'db_version': db_version}
+    run_cached(cache, 'process_surface_typer_results', [fullgenes_file], params, output_files,
+               lambda: process_surface_typer_results.process_fullgenes(fullgenes_file, min_depth, output_files,
+                                                                       process_surface_typer_results.SurfaceTyperState.new()))
+
+
+def combine_sero_res(sample_id, header_dict, output):
+    """Write the combined serotyping and resistance typing tables of the sample, as combine_results.py does"""
+    # Imported here as it loads pandas
+    from bin.combine_results import get_id_df, write_sero_res_results
+    write_sero_res_results(get_id_df(sample_id, header_dict), header_dict, get_sero_output_file(output), output + '_res_incidence.txt',
+                           output + '_res_alleles_variants.txt', output + '_res_gbs_variants.txt', output)
+
+
+def combine_surface(sample_id, header_dict, output):
+    """Write the combined surface typing tables of the sample, as combine_results.py does"""
+    # Imported here as it loads pandas
+    from bin.combine_results import get_id_df, write_surface_typer_results
+    surface_variants, surface_inc = get_surface_output_files(output)
+    write_surface_typer_results(get_id_df(sample_id, header_dict), header_dict, surface_inc, surface_variants, output)
+
+
+def run_step(name, step, *args):
+    """Run one step, reporting rather than raising its errors so that the other steps still run"""
+    try:
+        step(*args)
+    except Exception:
+        print('Error in {} step:'.format(name), file=sys.stderr)
+        traceback.print_exc()
+        return False
+    return True
+
+
+def run_combine_step(name, inputs_succeeded, step, *args):
+    """Run a step combining the outputs of earlier steps, unless any of them failed"""
+    if not inputs_succeeded:
+        print('Skipping {} step as its inputs failed'.format(name), file=sys.stderr)
+        return False
+    return run_step(name, step, *args)
+
+
+def run(args):
+    """Write every per-sample table of the serotyping, resistance typing and surface typing results of a sample.
+    The typing steps all run even if one fails, but the sample fails if any step, or the inputs of a combining step, failed."""
+    header_dict = read_header_json(args.headers)
+    output = args.output if args.output is not None else args.id
+    cache = get_cache(args)
+
+    succeeded = True
+    if args.sero_fullgenes is not None:
+        sero_succeeded = run_step('serotyping', process_sero, args.sero_fullgenes, args.sero_min_depth, output, cache, args.db_version)
+        succeeded &= sero_succeeded
+
+    if args.res_gbs_fullgenes is not None:
+        res_succeeded = run_step('resistance typing', process_res, args.res_gbs_fullgenes, args.res_gbs_consensus, args.res_other_fullgenes,
+                                 args.res_min_depth, header_dict, output, cache, args.db_version)
+        succeeded &= res_succeeded
+
+    if args.sero_fullgenes is not None and args.res_gbs_fullgenes is not None:
+        succeeded &= run_combine_step('serotyping and resistance typing results', sero_succeeded and res_succeeded,
+                                      combine_sero_res, args.id, header_dict, output)
+
+    if args.surface_fullgenes is not None:
+        surface_succeeded = run_step('surface typing', process_surface, args.surface_fullgenes, args.surface_min_depth, output, cache, args.db_version)
+        succeeded &= run_combine_step('surface typing results', surface_succeeded,
+                                      combine_surface, args.id, header_dict, output)
+
+    return 0 if succeeded else 1
+
+
+def get_arguments():
+    parser = argparse.ArgumentParser(description='Process the SRST2 outputs of a sample into all of its serotyping, resistance typing and surface typing tables.')
+    parser.add_argument('--id', '-i', dest='id', required=True,
+                        help='Sample ID.')
+    parser.add_argument('--headers', '-t', dest='headers', required=True,
+                        help='JSON file of expected headers.')
+    parser.add_argument('--output_prefix', '-o', dest='output', required=False, default=None,
+                        help='Output prefix of filenames. Default: the sample ID.')
+    parser.add_argument('--sero_fullgenes', dest='sero_fullgenes', required=False, default=None,
+                        help='Input SRST2 fullgenes output for the serotyping database.')
+    parser.add_argument('--sero_min_read_depth', dest='sero_min_depth', required=False, type=float, default=0,
+                        help='Minimum read depth of serotyping mappings. Default: 0.')
+    parser.add_argument('--res_gbs_fullgenes', dest='res_gbs_fullgenes', required=False, default=None,
+                        help='Input SRST2 fullgenes output for the GBS resistance database.')
+    parser.add_argument('--res_gbs_consensus', dest='res_gbs_consensus', required=False, default=None,
+                        help='Input freebayes consensus sequence output for the GBS resistance database.')
+    parser.add_argument('--res_other_fullgenes', dest='res_other_fullgenes', required=False, nargs='*', default=None,
+                        help='Input SRST2 fullgenes outputs for other resistance databases.')
+    parser.add_argument('--res_min_read_depth', dest='res_min_depth', required=False, type=float, default=30,
+                        help='Minimum read depth of resistance typing mappings. Default: 30.')
+    parser.add_argument('--surface_fullgenes', dest='surface_fullgenes', required=False, default=None,
+                        help='Input SRST2 fullgenes output for the surface protein database.')
+    parser.add_argument('--surface_min_read_depth', dest='surface_min_depth', required=False, type=float, default=30,
+                        help='Minimum read depth of surface typing mappings. Default: 30.')
+    add_cache_arguments(parser)
+    return parser
+
+
+def main():
+    parser = get_arguments()
+    args = parser.parse_args()
+    if args.res_gbs_fullgenes is not None and args.res_gbs_consensus is None:
+        parser.error('--res_gbs_consensus is required with --res_gbs_fullgenes')
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 import argparse
 import sys
+from lib.result_cache import add_cache_arguments, get_cache, run_cached
+from lib.srst2_fullgenes import read_fullgenes
 
 replace_values = {
     'GBS-SBG:': '',
@@ -19,13 +21,10 @@ replace_values = {
 def make_gene_list(input_file, depth_threshold):
     """Get features from SRST2 input file into dictionary depending on read depth threshold"""
     gene_list = []
-    with open(input_file, 'r') as fg_file:
-        next(fg_file) # Skip header row
-        for line in fg_file:
-            feature = line.split('\t')
-            if float(feature[5]) <= depth_threshold:
-                feature[3] = 'NT'
-            gene_list.append(feature[2:-1])
+    for record in read_fullgenes(input_file):
+        if record.depth <= depth_threshold:
+            record = record._replace(allele='NT')
+        gene_list.append(record)
     return gene_list
 
 
@@ -35,15 +34,15 @@ def write_outfile(gene_list, out_file):
     match_type = []
     serotype = []
     avgdepth = []
-    for values in gene_list:
-        status = 'imperfect' if values[4] != '' else 'identical'
-        value = values[1]
+    for record in gene_list:
+        status = 'imperfect' if record.diffs != '' else 'identical'
+        value = record.allele
         for key, item in replace_values.items():
             value = value.replace(key, item)
         matched_alleles = matched_alleles + [value]
         match_type = match_type + [value + '=' + status]
         serotype = serotype + [value]
-        avgdepth = avgdepth + [values[3]]
+        avgdepth = avgdepth + [record.raw_depth]
     if len(serotype) > 1 and 'NT' in serotype:
         serotype = [x for x in serotype if x != 'NT']
     with open(out_file, 'w') as out:
@@ -60,6 +59,7 @@ def get_arguments():
                         help='Output filename.')
     parser.add_argument('--min_read_depth', '-d', dest='depth', default = 0, type=float, required=False,
                         help='Minimum read depth where mappings with fewer reads are excluded. Default: 0.')
+    add_cache_arguments(parser)
 
     return parser
 
@@ -71,11 +71,19 @@ def main():
     # Specift fullgenes file path from ID and database name
     fullgenes_file = args.id + '__fullgenes__' + db_name + '__results.txt'
 
+    params = {'min_depth': args.depth, 'db_version': args.db_version}
+    run_cached(get_cache(args), 'process_serotyper_results', [fullgenes_file], params, [args.output],
+               lambda: process_fullgenes(fullgenes_file, args.depth, args.output))
+
+
+def process_fullgenes(fullgenes_file, min_depth, output):
+    """Get serotype features from the fullgenes file and write them"""
+
     # Get feature dictionary
-    gene_list = make_gene_list(fullgenes_file, args.depth)
+    gene_list = make_gene_list(fullgenes_file, min_depth)
 
     # Write tab-delimited output file with serotype features
-    write_outfile(gene_list, args.output)
+    write_outfile(gene_list, output)
 
 
 if __name__ == "__main__":
@@ -2,25 +2,29 @@
 import argparse
 import sys
 import re
+from types import MappingProxyType
+from lib.allele_names import normalise_allele
 from lib.file_utils import FileUtils
+from lib.result_cache import add_cache_arguments, get_cache, run_cached
+from lib.srst2_fullgenes import read_fullgenes
 
 
-variantLookup = {
+variantLookup = MappingProxyType({
     'ALP': 'ALPH',
     'RIB': 'ALPH',
     'SRR': 'SRR',
     'PI':  'PILI',
     'HVGA': 'HVGA',
-}
+})
 
-featureCol = {
+featureCol = MappingProxyType({
     'ALPH': 'neg',
     'SRR': 'neg',
     'PILI': 'neg',
     'HVGA': 'neg',
-}
+})
 
-binFeatureCol = {
+binFeatureCol = MappingProxyType({
     'HVGA':  'neg',
     'PI1':   'neg',
     'PI2A1': 'neg',
@@ -32,7 +36,46 @@ binFeatureCol = {
     'ALP23': 'neg',
     'ALPHA': 'neg',
     'RIB':   'neg',
-}
+})
+
+
+class SurfaceTyperState():
+    """Per-sample surface typing results, so that several samples can be processed in one interpreter"""
+
+    __slots__ = ('feature_col', 'bin_feature_col')
+
+    def __init__(self, feature_col, bin_feature_col):
+        self.feature_col = feature_col
+        self.bin_feature_col = bin_feature_col
+
+    @classmethod
+    def new(cls):
+        """Fresh state for one sample, copied from the module-level templates"""
+        return cls(dict(featureCol), dict(binFeatureCol))
+
+
+class FeatureLookup():
+    """Features of a surface protein database found in allele names, matched with one compiled pattern
+    and remembered per allele so each allele of the database is only searched once"""
+
+    def __init__(self, features):
+        self.features = tuple(features)
+        # Every feature is an optional lookahead, so one match captures each feature found anywhere in the name
+        self.pattern = re.compile("".join("(?=.*?({}))?".format(feature) for feature in self.features))
+        self.features_by_allele = {}
+
+    def find(self, allele):
+        """Return the features (in order) found in the normalised allele name"""
+        features = self.features_by_allele.get(allele)
+        if features is None:
+            groups = self.pattern.match(normalise_allele(allele)).groups()
+            features = tuple(feature for feature, found in zip(self.features, groups) if found is not None)
+            self.features_by_allele[allele] = features
+        return features
+
+
+VARIANT_FEATURES = FeatureLookup(variantLookup)
+BIN_FEATURES = FeatureLookup(binFeatureCol)
 
 
 def update_protein_presence_absence(
@@ -41,34 +84,26 @@ def update_protein_presence_absence(
 
     if depth >= min_depth:
 
-        for variant in variant_lookup_dict.keys():
-            if re.search(variant, "".join(re.split("[^a-zA-Z0-9]*", allele)).upper()):
+        for variant in VARIANT_FEATURES.find(allele):
 
-                feature = variant_lookup_dict[variant]
-                if feature_col_dict[feature] == "neg":
-                    feature_col_dict[feature] = gene
-                else:
-                    feature_col_dict[feature] = feature_col_dict[feature] + ':' + gene
+            feature = variant_lookup_dict[variant]
+            if feature_col_dict[feature] == "neg":
+                feature_col_dict[feature] = gene
+            else:
+                feature_col_dict[feature] = feature_col_dict[feature] + ':' + gene
 
-        for feature in bin_feature_col_dict.keys():
-            if re.search(feature, "".join(re.split("[^a-zA-Z0-9]*", allele)).upper()):
-                bin_feature_col_dict[feature] = "pos"
+        for feature in BIN_FEATURES.find(allele):
+            bin_feature_col_dict[feature] = "pos"
 
 
-def derive_presence_absence(input_file, min_depth, processor):
+def derive_presence_absence(input_file, min_depth, processor, state=None):
     """Find surface protein gene presence/absence for GBS surface database"""
+    if state is None:
+        state = SurfaceTyperState.new()
 
     try:
-        with open(input_file, 'r') as fd:
-            # Skip header row
-            next(fd)
-            # Process file lines
-            for line in fd:
-                fields = line.split('\t')
-                gene = fields[2]
-                allele = fields[3]
-                depth = float(fields[5])
-                processor(gene, allele, min_depth, depth, featureCol, binFeatureCol, variantLookup)
+        for record in read_fullgenes(input_file, min_depth):
+            processor(record.gene, record.allele, min_depth, record.depth, state.feature_col, state.bin_feature_col, variantLookup)
     except IOError:
         print('Cannot open {}.'.format(input_file))
 
@@ -80,17 +115,29 @@ def run(args):
     # Specify fullgenes file path from ID and database name
     fullgenes_file = args.fullgenes_file_id + '__fullgenes__' + db_name + '__results.txt'
 
+    output_files = [args.output + "_surface_protein_variants_sample.txt", args.output + '_surface_protein_incidence_sample.txt']
+    params = {'min_depth': args.min_depth, 'db_version': args.db_version}
+    run_cached(get_cache(args), 'process_surface_typer_results', [fullgenes_file], params, output_files,
+               lambda: process_fullgenes(fullgenes_file, args.min_depth, output_files))
+
+
+def process_fullgenes(fullgenes_file, min_depth, output_files, state=None):
+    """Type surface proteins from the fullgenes file into the given state (by default a new one)
+    and write the variant and incidence outputs"""
+    if state is None:
+        state = SurfaceTyperState.new()
+
     # Get presence/absence of genes
-    derive_presence_absence(fullgenes_file, args.min_depth, update_protein_presence_absence)
+    derive_presence_absence(fullgenes_file, min_depth, update_protein_presence_absence, state)
 
-    feature_out = FileUtils.create_output_contents(featureCol)
-    bin_feature_out = FileUtils.create_output_contents(binFeatureCol)
+    feature_out = FileUtils.create_output_contents(state.feature_col)
+    bin_feature_out = FileUtils.create_output_contents(state.bin_feature_col)
 
     # Write gbs variant output
-    FileUtils.write_output(feature_out, args.output + "_surface_protein_variants_sample.txt")
+    FileUtils.write_output(feature_out, output_files[0])
 
     # Write incidence output
-    FileUtils.write_output(bin_feature_out, args.output + '_surface_protein_incidence_sample.txt')
+    FileUtils.write_output(bin_feature_out, output_files[1])
 
 
 def get_arguments():
@@ -104,6 +151,7 @@ def get_arguments():
                         help='Output prefix for filename.')
     parser.add_argument('--min_read_depth', '-d', dest='min_depth', default=30, type=float,
                         help='Minimum read depth where mappings with fewer reads are excluded. Default: 30.')
+    add_cache_arguments(parser)
     return parser
 
 
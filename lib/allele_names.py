@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""Normalised allele names, shared by the surface protein and resistance typers"""
+import re
+from functools import lru_cache
+
+
+NON_ALPHANUMERIC = re.compile("[^a-zA-Z0-9]*")
+
+
+@lru_cache(maxsize=None)
+def normalise_allele(allele):
+    """Strip non-alphanumeric characters from an allele name and upper case it"""
+    return "".join(NON_ALPHANUMERIC.split(allele)).upper()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Samtools-style (.fai) FASTA index for looking up records by byte offset"""
+import os
+from collections import defaultdict
+from typing import NamedTuple
+
+
+class FastaIndexEntry(NamedTuple):
+    """Row of a .fai index"""
+    name: str
+    length: int
+    offset: int
+    line_bases: int
+    line_width: int
+
+    def get_size(self):
+        """Number of bytes of the sequence lines, including line endings"""
+        if not self.length:
+            return 0
+        num_lines = (self.length + self.line_bases - 1) // self.line_bases
+        return self.length + num_lines * (self.line_width - self.line_bases)
+
+
+def build_fasta_index(fasta_file):
+    """Index the name, sequence length, byte offset and line layout of every record"""
+    entries = []
+    record = None
+    with open(fasta_file, 'rb') as fasta:
+        offset = 0
+        for line in fasta:
+            offset += len(line)
+            if line[0:1] == b'>':
+                if record is not None:
+                    entries.append(FastaIndexEntry(*record[:5]))
+                name = line[1:].split(None, 1)[0].decode() if line[1:].strip() else ''
+                # Name, length, offset, line bases, line width and whether a short (last) line was read
+                record = [name, 0, offset, 0, 0, False]
+            elif record is not None:
+                bases = len(line.rstrip(b'\r\n'))
+                if record[5] or (record[3] and (bases > record[3] or (line.endswith(b'\n') and len(line) - bases != record[4] - record[3]))):
+                    raise ValueError('Different line length in sequence {} of {}'.format(record[0], fasta_file))
+                if not record[3]:
+                    record[3], record[4] = bases, len(line)
+                elif bases < record[3]:
+                    record[5] = True
+                record[1] += bases
+        if record is not None:
+            entries.append(FastaIndexEntry(*record[:5]))
+
+    return entries
+
+
+def write_fasta_index(entries, index_file):
+    """Write a .fai index"""
+    with open(index_file, 'w') as out:
+        for entry in entries:
+            out.write('\t'.join(str(field) for field in entry) + '\n')
+
+
+def read_fasta_index(index_file):
+    """Read a .fai index"""
+    entries = []
+    with open(index_file, 'r') as index:
+        for line in index:
+            fields = line.rstrip('\n').split('\t')
+            entries.append(FastaIndexEntry(fields[0], *(int(field) for field in fields[1:5])))
+
+    return entries
+
+
+def matches_file_size(entries, fasta_file):
+    """Check that the last indexed record ends where the FASTA file ends, with or without a final line ending"""
+    if not entries:
+        return os.path.getsize(fasta_file) == 0
+    last_entry = max(entries, key=lambda entry: entry.offset)
+    end = last_entry.offset + last_entry.get_size()
+    return os.path.getsize(fasta_file) in (end, end - (last_entry.line_width - last_entry.line_bases))
+
+
+def get_fasta_index(fasta_file, index_file=None):
+    """Read the .fai index of a FASTA file, or None if it does not exist, is older than the FASTA file
+    or does not match the FASTA file size"""
+    if index_file is None:
+        index_file = fasta_file + '.fai'
+    if not os.path.exists(index_file) or os.path.getmtime(index_file) < os.path.getmtime(fasta_file):
+        return None
+
+    entries = read_fasta_index(index_file)
+    if not matches_file_size(entries, fasta_file):
+        return None
+
+    return entries
+
+
+def get_entries_by_name(entries):
+    """Group index entries by record name, keeping FASTA order"""
+    entries_by_name = defaultdict(list)
+    for entry in entries:
+        entries_by_name[entry.name].append(entry)
+
+    return entries_by_name
+
+
+HEADER_CHUNK_SIZE = 256
+
+
+def get_header_offset(fasta, entry):
+    """Find the byte offset of the header line of an index entry, which ends just before the sequence offset"""
+    position = entry.offset - 1
+    while position > 0:
+        chunk_start = max(0, position - HEADER_CHUNK_SIZE)
+        fasta.seek(chunk_start)
+        newline = fasta.read(position - chunk_start).rfind(b'\n')
+        if newline != -1:
+            return chunk_start + newline + 1
+        position = chunk_start
+
+    return 0
+
+
+def read_record(fasta, entry):
+    """Read the record of an index entry, with its original header line, from a FASTA file opened in binary mode"""
+    header_offset = get_header_offset(fasta, entry)
+    fasta.seek(header_offset)
+    return fasta.read(entry.offset - header_offset + entry.get_size())
+
+
+def write_target_records(targets, fasta_file, entries, output_prefix):
+    """Write a FASTA file of the records of each target, looking them up in the index of the FASTA file.
+    As for a scan of the FASTA file, a record matches a target if its whole header line is the target."""
+    entries_by_name = get_entries_by_name(entries)
+    with open(fasta_file, 'rb') as fasta:
+        for target in dict.fromkeys(targets):
+            name = target.split()[0] if target.split() else ''
+            with open(output_prefix + target + '_ref.fna', 'wb') as out:
+                for entry in entries_by_name.get(name, []):
+                    record = read_record(fasta, entry)
+                    if record[1:].split(b'\n', 1)[0] == target.encode():
+                        out.write(record)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Random-access FASTA reader backed by a memory map and a .fai index"""
+import mmap
+import os
+from lib.fasta_index import build_fasta_index, get_fasta_index
+
+
+class FastaReader():
+    """Look sequences and subsequences up by name without reading the whole FASTA file.
+    Names are the first word of the headers and the first record wins for repeated names.
+    Coordinates are 0-based and end-exclusive, as for Python slices."""
+
+    def __init__(self, fasta_file, index_file=None):
+        entries = get_fasta_index(fasta_file, index_file)
+        if entries is None:
+            entries = build_fasta_index(fasta_file)
+        self._entries = {}
+        for entry in entries:
+            self._entries.setdefault(entry.name, entry)
+
+        with open(fasta_file, 'rb') as fasta:
+            # Empty files cannot be memory-mapped
+            self._data = mmap.mmap(fasta.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(fasta_file) else b''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    def get_names(self):
+        return list(self._entries)
+
+    def get_length(self, name):
+        return self._entries[name].length
+
+    def get_byte_range(self, name, start=0, end=None):
+        """Get the byte offsets in the file of a region of a sequence"""
+        entry = self._entries[name]
+        start, end, _ = slice(start, end).indices(entry.length)
+        end = max(start, end)
+        if start == end:
+            return entry.offset, entry.offset
+
+        def get_offset(position):
+            return entry.offset + position // entry.line_bases * entry.line_width + position % entry.line_bases
+
+        return get_offset(start), get_offset(end - 1) + 1
+
+    def get_raw(self, name, start=0, end=None):
+        """Get a zero-copy view of the bytes of a region of a sequence, including any line endings.
+        Release the view before closing the reader."""
+        byte_start, byte_end = self.get_byte_range(name, start, end)
+        return memoryview(self._data)[byte_start:byte_end]
+
+    def get_sequence(self, name, start=0, end=None):
+        """Get a region of a sequence, reading only the pages of the file it spans"""
+        entry = self._entries[name]
+        byte_start, byte_end = self.get_byte_range(name, start, end)
+        seq = self._data[byte_start:byte_end]
+        if entry.line_width != entry.line_bases:
+            seq = seq.replace(b'\n', b'').replace(b'\r', b'')
+        return seq.decode()
@@ -1,20 +1,30 @@
 from collections import defaultdict
 
 
+def read_seq_records(seq_file):
+    """Yield (header, sequence) records from a sequence file one record at a time"""
+    with open(seq_file, 'r') as fd:
+        seq_name = None
+        seq_lines = []
+        for line in fd:
+            if line[0] == '>':
+                if seq_name is not None:
+                    yield seq_name, ''.join(seq_lines)
+                seq_name = line[1:].rstrip('\n')
+                seq_lines = []
+            elif seq_name is not None:
+                seq_lines.append(line.rstrip('\n'))
+        if seq_name is not None:
+            yield seq_name, ''.join(seq_lines)
+
+
 def get_seq_content(seq_file):
     """Return sequence file content in dictionary"""
     seq_dict = defaultdict(lambda: '')
     try:
-        with open(seq_file, 'r') as fd:
-            for line in fd:
-                if line[0] == '>':
-                    seq_name = line.split('>')[1].split('\n')[0]
-                else:
-                    if seq_dict[seq_name] == '':
-                        seq_dict[seq_name] = line.split('\n')[0]
-                    else:
-                        tmp_seq = seq_dict[seq_name] + line.split('\n')[0]
-                        seq_dict[seq_name] = tmp_seq
+        for seq_name, seq in read_seq_records(seq_file):
+            # Sequences of repeated headers are concatenated
+            seq_dict[seq_name] += seq
     except IOError:
         print('Cannot open {}.'.format(seq_file))
 
@@ -1,5 +1,3 @@
-import pandas as pd
-
 class FileUtils:
     """ Common file handling methods used by the pipelines """
 
@@ -38,3 +36,12 @@ class FileUtils:
         except IOError:
             print('Cannot open filename starting "{}"'.format(output_filename))
             raise
+
+    @staticmethod
+    def write_parquet_output(content, output_filename):
+        """Write a pandas dataframe to a columnar Parquet file (requires pyarrow)"""
+        try:
+            content.to_parquet(output_filename, index=False)
+        except IOError:
+            print('Cannot open filename starting "{}"'.format(output_filename))
+            raise
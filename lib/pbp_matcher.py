@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""In-process matching of translated PBP fragments against the PBP allele databases, as an alternative to blastp"""
+import math
+import re
+from collections import Counter, defaultdict
+from Bio import Align
+from Bio.Align import substitution_matrices
+from lib.file_io import read_seq_records
+from lib.seq_data import BlastHit
+
+KMER_SIZE = 3
+MAX_CANDIDATES = 10
+
+# blastp defaults: BLOSUM62 with gap open 11 and gap extend 1, and their Karlin-Altschul parameters
+GAP_OPEN = 11
+GAP_EXTEND = 1
+LAMBDA = 0.267
+K = 0.041
+# blastp default -evalue, above which hits are not reported
+MAX_EVALUE = 10
+
+BLOSUM62 = substitution_matrices.load('BLOSUM62')
+NON_BLOSUM62 = re.compile('[^{}]'.format(re.escape(''.join(BLOSUM62.alphabet))))
+
+
+def get_aligner():
+    """Local aligner scoring like blastp"""
+    aligner = Align.PairwiseAligner()
+    aligner.mode = 'local'
+    aligner.substitution_matrix = BLOSUM62
+    aligner.open_gap_score = -(GAP_OPEN + GAP_EXTEND)
+    aligner.extend_gap_score = -GAP_EXTEND
+    return aligner
+
+
+class PbpAlleleMatcher():
+    """Find the best matching allele of each query by an exact lookup of its sequence, or else by aligning it
+    to the alleles that share the most k-mers with it. Hits are reported as BLAST tabular output would be."""
+
+    def __init__(self, alleles, kmer_size=KMER_SIZE, max_candidates=MAX_CANDIDATES):
+        self._alleles = {name: self.clean_seq(seq) for name, seq in alleles.items()}
+        self._order = {name: n for n, name in enumerate(self._alleles)}
+        self._kmer_size = kmer_size
+        self._max_candidates = max_candidates
+        self._db_length = sum(len(seq) for seq in self._alleles.values())
+        self._aligner = get_aligner()
+
+        # Earliest allele of each sequence and alleles of each k-mer
+        self._exact = {}
+        self._kmers = defaultdict(set)
+        for name, seq in self._alleles.items():
+            self._exact.setdefault(seq, name)
+            for kmer in self.get_kmers(seq):
+                self._kmers[kmer].add(name)
+
+    @classmethod
+    def from_fasta_files(cls, fasta_files, **kwargs):
+        alleles = {}
+        for fasta_file in fasta_files:
+            for name, seq in read_seq_records(fasta_file):
+                alleles.setdefault(name.split()[0] if name else name, seq)
+        return cls(alleles, **kwargs)
+
+    @staticmethod
+    def clean_seq(seq):
+        """Upper case amino acids, with characters that cannot be scored as X"""
+        return NON_BLOSUM62.sub('X', seq.upper())
+
+    def get_kmers(self, seq):
+        return {seq[i:i + self._kmer_size] for i in range(len(seq) - self._kmer_size + 1)}
+
+    def get_exact_match(self, seq):
+        return self._exact.get(self.clean_seq(seq))
+
+    def get_candidates(self, seq):
+        """Get the alleles sharing the most k-mers with the sequence, earliest alleles first for equal counts"""
+        shared = Counter()
+        for kmer in self.get_kmers(self.clean_seq(seq)):
+            shared.update(self._kmers.get(kmer, ()))
+        return sorted(shared, key=lambda name: (-shared[name], self._order[name]))[:self._max_candidates]
+
+    def get_bitscore(self, score):
+        return (LAMBDA * score - math.log(K)) / math.log(2)
+
+    def get_evalue(self, score, query_length):
+        return K * query_length * self._db_length * math.exp(-LAMBDA * score)
+
+    def get_exact_hit(self, query, seq, allele):
+        length = len(seq)
+        score = sum(BLOSUM62[aa][aa] for aa in self.clean_seq(seq))
+        return BlastHit(query, allele, 100.0, length, 0, 0, 1, length, 1, length,
+                        self.get_evalue(score, length), round(self.get_bitscore(score), 1))
+
+    def align(self, query, seq, allele):
+        """Align the query to an allele and describe the best local alignment as a BLAST hit, or None if they do not align"""
+        seq = self.clean_seq(seq)
+        allele_seq = self._alleles[allele]
+        alignments = self._aligner.align(allele_seq, seq)
+        if not alignments.score > 0:
+            return None
+        alignment = alignments[0]
+
+        # Aligned blocks of the allele and query, without the gaps between them
+        blocks = [((int(s_start), int(s_end)), (int(q_start), int(q_end))) for (s_start, s_end), (q_start, q_end) in zip(*alignment.aligned)]
+
+        identities = mismatches = gap_opens = gaps = 0
+        previous = None
+        for (s_start, s_end), (q_start, q_end) in blocks:
+            if previous is not None:
+                for gap in (s_start - previous[0], q_start - previous[1]):
+                    if gap:
+                        gap_opens += 1
+                        gaps += gap
+            for allele_aa, query_aa in zip(allele_seq[s_start:s_end], seq[q_start:q_end]):
+                if allele_aa == query_aa:
+                    identities += 1
+                else:
+                    mismatches += 1
+            previous = (s_end, q_end)
+
+        length = identities + mismatches + gaps
+        return BlastHit(query, allele, round(100 * identities / length, 3), length, mismatches, gap_opens,
+                        blocks[0][1][0] + 1, blocks[-1][1][1], blocks[0][0][0] + 1, blocks[-1][0][1],
+                        self.get_evalue(alignment.score, len(seq)), round(self.get_bitscore(float(alignment.score)), 1))
+
+    def get_best_hit(self, query, seq):
+        """Get the best hit of a query, or None if it does not align to any allele with an e-value blastp would report"""
+        allele = self.get_exact_match(seq)
+        if allele is not None:
+            hit = self.get_exact_hit(query, seq, allele)
+            return hit if hit.evalue <= MAX_EVALUE else None
+
+        best_hit = None
+        for allele in self.get_candidates(seq):
+            hit = self.align(query, seq, allele)
+            if hit is not None and hit.evalue <= MAX_EVALUE and (best_hit is None or hit.rank() > best_hit.rank()):
+                best_hit = hit
+        return best_hit
+
+    def get_best_hits(self, queries):
+        """Get the best hit of each query of a header to sequence dictionary, like BlastData.get_best_hit"""
+        best_hits = {}
+        for query, seq in queries.items():
+            hit = self.get_best_hit(query, seq)
+            if hit is not None:
+                best_hits[query] = hit
+        return best_hits
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Content-addressed on-disk cache of the outputs of the result processing scripts"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+
+DEFAULT_MAX_SIZE_MB = 1024
+CHUNK_SIZE = 1024 * 1024
+# File of each cache entry listing which outputs it holds
+MANIFEST_FILE = 'outputs.json'
+# Pipeline directory, whose bin/ and lib/ sources make up the code version
+PIPELINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CODE_DIRS = ('bin', 'lib')
+
+
+@lru_cache(maxsize=None)
+def get_code_version(pipeline_dir=PIPELINE_DIR):
+    """Hash the Python sources of the pipeline, so that cached outputs of older code are not reused"""
+    hasher = hashlib.sha256()
+    for code_dir in CODE_DIRS:
+        code_path = os.path.join(pipeline_dir, code_dir)
+        if not os.path.isdir(code_path):
+            continue
+        for filename in sorted(os.listdir(code_path)):
+            if not filename.endswith('.py'):
+                continue
+            hasher.update('{}/{}\0'.format(code_dir, filename).encode())
+            with open(os.path.join(code_path, filename), 'rb') as f:
+                hasher.update(f.read())
+
+    return hasher.hexdigest()
+
+
+class ResultCache():
+    """Cache entries are directories named by a hash of the script name, code version, parameters and input file contents.
+    Least recently used entries are evicted once the cache grows beyond its maximum size."""
+
+    def __init__(self, cache_dir, max_size=DEFAULT_MAX_SIZE_MB * 1024 * 1024):
+        self._cache_dir = cache_dir
+        self._max_size = max_size
+
+    @staticmethod
+    def get_key(name, input_files, params):
+        """Hash the script name, code version, parameters and contents of the input files"""
+        hasher = hashlib.sha256()
+        hasher.update(json.dumps([name, get_code_version(), sorted(params.items())], default=str).encode())
+        for input_file in input_files:
+            hasher.update(b'\0')
+            if not os.path.isfile(input_file):
+                hasher.update(b'missing')
+                continue
+            with open(input_file, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    hasher.update(chunk)
+
+        return hasher.hexdigest()
+
+    def get_entry(self, key):
+        return os.path.join(self._cache_dir, key)
+
+    def fetch(self, key, output_files):
+        """Copy the cached outputs to the output files, returning False unless every output listed in the entry is restored.
+        Outputs that were not written when the entry was stored are removed."""
+        entry = self.get_entry(key)
+        try:
+            with open(os.path.join(entry, MANIFEST_FILE), 'r') as manifest:
+                stored = set(json.load(manifest))
+            for n, output_file in enumerate(output_files):
+                if n in stored:
+                    shutil.copyfile(os.path.join(entry, str(n)), output_file)
+                elif os.path.exists(output_file):
+                    os.remove(output_file)
+            # Mark the entry as recently used
+            os.utime(entry)
+        except (OSError, ValueError):
+            # Entry missing, or (partly) evicted by another process
+            return False
+
+        return True
+
+    def store(self, key, output_files):
+        """Store the output files that exist under the key and evict old entries"""
+        os.makedirs(self._cache_dir, exist_ok=True)
+        tmp_entry = tempfile.mkdtemp(dir=self._cache_dir, prefix='.tmp')
+        stored = []
+        for n, output_file in enumerate(output_files):
+            if os.path.exists(output_file):
+                shutil.copyfile(output_file, os.path.join(tmp_entry, str(n)))
+                stored.append(n)
+        with open(os.path.join(tmp_entry, MANIFEST_FILE), 'w') as manifest:
+            json.dump(stored, manifest)
+        entry = self.get_entry(key)
+        try:
+            os.rename(tmp_entry, entry)
+        except OSError:
+            # Replace the existing entry, which may be stale (e.g. partly evicted or without a manifest)
+            shutil.rmtree(entry, ignore_errors=True)
+            try:
+                os.rename(tmp_entry, entry)
+            except OSError:
+                # Entry stored again by another process in the meantime
+                shutil.rmtree(tmp_entry, ignore_errors=True)
+
+        self.evict()
+
+    def get_entries(self):
+        """Get (last used time, size, path) of every cache entry"""
+        entries = []
+        for name in os.listdir(self._cache_dir):
+            if name.startswith('.'):
+                continue
+            entry = self.get_entry(name)
+            try:
+                # Sizes of the cached outputs (the manifest is negligible)
+                size = sum(os.path.getsize(os.path.join(entry, file)) for file in os.listdir(entry) if file != MANIFEST_FILE)
+                entries.append((os.path.getmtime(entry), size, entry))
+            except OSError:
+                continue
+
+        return entries
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits its maximum size"""
+        entries = self.get_entries()
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total_size <= self._max_size:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total_size -= size
+
+
+def add_cache_arguments(parser):
+    """Add the result cache options to a script's argument parser"""
+    parser.add_argument('--cache_dir', dest='cache_dir', required=False, default=None,
+                        help='Directory of the result cache. Outputs are only cached if given.')
+    parser.add_argument('--cache_max_size', dest='cache_max_size', required=False, type=float, default=DEFAULT_MAX_SIZE_MB,
+                        help='Maximum size of the result cache in MB. Default: {}.'.format(DEFAULT_MAX_SIZE_MB))
+    parser.add_argument('--db_version', dest='db_version', required=False, default='',
+                        help='Database version, included in the result cache key.')
+
+
+def get_cache(args):
+    """Get the result cache from the script arguments, or None if caching is off"""
+    if args.cache_dir is None:
+        return None
+
+    return ResultCache(args.cache_dir, int(args.cache_max_size * 1024 * 1024))
+
+
+def run_cached(cache, name, input_files, params, output_files, run):
+    """Restore the output files from the cache, or call run and cache its output files"""
+    if cache is None:
+        run()
+        return
+
+    key = cache.get_key(name, input_files, params)
+    if cache.fetch(key, output_files):
+        return
+
+    run()
+    # Runs with a missing input only report an error, so they are not cached
+    if all(os.path.isfile(input_file) for input_file in input_files):
+        cache.store(key, output_files)
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 """Common classes containing and processing FASTA and BLAST output data"""
 from collections import defaultdict
+from typing import NamedTuple
 from lib.file_io import get_seq_content
-from lib.six_frame_translation import six_frame_translate, extract_frame_aa, codon2aa
+from lib.six_frame_translation import six_frame_translate, six_frame_translate_records, check_frame, get_dna, extract_frame_aa, codon2aa
 
 
 class SeqData():
@@ -15,36 +16,71 @@ class SeqData():
     def calculate_seq_length(self):
         return {header: len(seq) for header, seq in self._data.items()}
 
+    def get_six_frame_translations(self):
+        """Get the translations of frames 1 to 6 of each sequence, reverse complementing each sequence once"""
+        return dict(six_frame_translate_records((header, get_dna(seq)) for header, seq in self._data.items()))
+
     def translate_content(self, frame):
-        for header in self._data:
-            self._data[header] = six_frame_translate(self._data[header], frame)
+        check_frame(frame)
+        for header, frames in self.get_six_frame_translations().items():
+            self._data[header] = frames[frame - 1]
+
+
+class BlastHit(NamedTuple):
+    """Typed row of BLAST tabular output (-outfmt 6)"""
+    qseqid: str
+    sseqid: str
+    pident: float
+    length: int
+    mismatch: int
+    gapopen: int
+    qstart: int
+    qend: int
+    sstart: int
+    send: int
+    evalue: float
+    bitscore: float
+
+    @classmethod
+    def from_line(cls, line):
+        fields = line.rstrip('\n').split('\t')
+        return cls(fields[0], fields[1], float(fields[2]), int(fields[3]), int(fields[4]), int(fields[5]),
+                   int(fields[6]), int(fields[7]), int(fields[8]), int(fields[9]), float(fields[10]), float(fields[11]))
+
+    def rank(self):
+        """Rank hits by bitscore, then identity, then alignment length"""
+        return self.bitscore, self.pident, self.length
 
 
 class BlastData():
     def __init__(self, filename):
         self._filename = filename
-        self._data = defaultdict(lambda: '')
-        self.read_blast_out()
+        self._data = None
 
-    def read_blast_out(self):
+    def read_hits(self):
         with open(self._filename, 'r') as f:
             for line in f:
-                elements = line.split('\n')[0].split('\t')
-                if self._data[elements[0]] == '':
-                    self._data[elements[0]] = [elements[1:]]
-                else:
-                    self._data[elements[0]].append(elements[1:])
+                yield BlastHit.from_line(line)
+
+    def read_blast_out(self):
+        self._data = defaultdict(list)
+        for hit in self.read_hits():
+            self._data[hit.qseqid].append(hit)
 
     def get_data(self):
+        if self._data is None:
+            self.read_blast_out()
         return self._data
 
-    def get_best_hit(self):
-        for allele, stats in self._data.items():
-            # Sort by bitscore
-            sorted(self._data[allele], key=lambda stat: float(stat[10]), reverse=False)
-            # Sort by identity
-            sorted(self._data[allele], key=lambda stat: float(stat[1]), reverse=False)
-            # Sort by alignment length
-            sorted(self._data[allele], key=lambda stat: float(stat[2]), reverse=False)
+    def get_best_hit(self, subjects=None):
+        """Return the best hit of each query while reading the BLAST output; ties keep the earliest hit.
+        If subjects is given, only hits to those subject IDs are considered."""
+        best_hits = {}
+        for hit in self.read_hits():
+            if subjects is not None and hit.sseqid not in subjects:
+                continue
+            best_hit = best_hits.get(hit.qseqid)
+            if best_hit is None or hit.rank() > best_hit.rank():
+                best_hits[hit.qseqid] = hit
 
-        return {allele: stats[0] for allele, stats in self._data.items()}
+        return best_hits
@@ -1,40 +1,46 @@
 #!/usr/bin/env python3
 import re
-from Bio.Seq import Seq
+from functools import lru_cache
+
+# Complements of IUPAC nucleotide codes
+COMPLEMENT_TABLE = str.maketrans('ACGTUMRWSYKVHDBNacgtumrwsykvhdbn', 'TGCAAKYWSRMBDHVNtgcaakywsrmbdhvn')
+
+# Codon to amino acid lookup table
+CODON_TO_AA = {
+    'TCA': 'S', 'TCC': 'S', 'TCG': 'S', 'TCT': 'S', 'TTC': 'F', 'TTT': 'F', 'TTA': 'L', 'TTG': 'L',
+    'TAC': 'Y', 'TAT': 'Y', 'TAA': '*', 'TAG': '*', 'TGC': 'C', 'TGT': 'C', 'TGA': '*', 'TGG': 'W',
+    'CTA': 'L', 'CTC': 'L', 'CTG': 'L', 'CTT': 'L', 'CCA': 'P', 'CCC': 'P', 'CCG': 'P', 'CCT': 'P',
+    'CAC': 'H', 'CAT': 'H', 'CAA': 'Q', 'CAG': 'Q', 'CGA': 'R', 'CGC': 'R', 'CGG': 'R', 'CGT': 'R',
+    'ATA': 'I', 'ATC': 'I', 'ATT': 'I', 'ATG': 'M', 'ACA': 'T', 'ACC': 'T', 'ACG': 'T', 'ACT': 'T',
+    'AAC': 'N', 'AAT': 'N', 'AAA': 'K', 'AAG': 'K', 'AGC': 'S', 'AGT': 'S', 'AGA': 'R', 'AGG': 'R',
+    'GTA': 'V', 'GTC': 'V', 'GTG': 'V', 'GTT': 'V', 'GCA': 'A', 'GCC': 'A', 'GCG': 'A', 'GCT': 'A',
+    'GAC': 'D', 'GAT': 'D', 'GAA': 'E', 'GAG': 'E', 'GGA': 'G', 'GGC': 'G', 'GGG': 'G', 'GGT': 'G'
+}
+
+# Amino acids of four-fold degenerate codons, in order of priority
+DEGENERATE_CODON_TO_AA = [
+    (re.compile(r"GC."), 'A'),
+    (re.compile(r"GG."), 'G'),
+    (re.compile(r"CC."), 'P'),
+    (re.compile(r"AC."), 'T'),
+    (re.compile(r"GT."), 'V'),
+    (re.compile(r"CG."), 'R'),
+    (re.compile(r"TC."), 'S'),
+]
+
 
 def codon2aa(codon):
     """Translate codons to amino acids"""
 
     codon = codon.upper()
 
-    codon_dict = {
-        'TCA': 'S', 'TCC': 'S', 'TCG': 'S', 'TCT': 'S', 'TTC': 'F', 'TTT': 'F', 'TTA': 'L', 'TTG': 'L',
-        'TAC': 'Y', 'TAT': 'Y', 'TAA': '*', 'TAG': '*', 'TGC': 'C', 'TGT': 'C', 'TGA': '*', 'TGG': 'W',
-        'CTA': 'L', 'CTC': 'L', 'CTG': 'L', 'CTT': 'L', 'CCA': 'P', 'CCC': 'P', 'CCG': 'P', 'CCT': 'P',
-        'CAC': 'H', 'CAT': 'H', 'CAA': 'Q', 'CAG': 'Q', 'CGA': 'R', 'CGC': 'R', 'CGG': 'R', 'CGT': 'R',
-        'ATA': 'I', 'ATC': 'I', 'ATT': 'I', 'ATG': 'M', 'ACA': 'T', 'ACC': 'T', 'ACG': 'T', 'ACT': 'T',
-        'AAC': 'N', 'AAT': 'N', 'AAA': 'K', 'AAG': 'K', 'AGC': 'S', 'AGT': 'S', 'AGA': 'R', 'AGG': 'R',
-        'GTA': 'V', 'GTC': 'V', 'GTG': 'V', 'GTT': 'V', 'GCA': 'A', 'GCC': 'A', 'GCG': 'A', 'GCT': 'A',
-        'GAC': 'D', 'GAT': 'D', 'GAA': 'E', 'GAG': 'E', 'GGA': 'G', 'GGC': 'G', 'GGG': 'G', 'GGT': 'G'
-    }
-
     try:
-        result = codon_dict[codon]
+        result = CODON_TO_AA[codon]
     except KeyError:
-        if re.search(r"GC.", codon):
-            result = 'A'
-        elif re.search(r"GG.", codon):
-            result = 'G'
-        elif re.search(r"CC.", codon):
-            result = 'P'
-        elif re.search(r"AC.", codon):
-            result = 'T'
-        elif re.search(r"GT.", codon):
-            result = 'V'
-        elif re.search(r"CG.", codon):
-            result = 'R'
-        elif re.search(r"TC.", codon):
-            result = 'S'
+        for pattern, amino_acid in DEGENERATE_CODON_TO_AA:
+            if pattern.search(codon):
+                result = amino_acid
+                break
         else:
             result = 'x'
             print("Bad codon " + codon + "!!")
@@ -42,6 +48,20 @@ def codon2aa(codon):
     return result
 
 
+def translate_codons(bases, start=0):
+    """
+    :param bases: upper case dna bases
+    :param start: index of the first base of the first codon
+    :return: Amino acid translation of consecutive codons
+    """
+    return ''.join([CODON_TO_AA.get(bases[i:i+3]) or codon2aa(bases[i:i+3]) for i in range(start, len(bases)-2, 3)])
+
+
+def reverse_complement(sequence):
+    """Return the reverse complement of dna bases"""
+    return sequence.translate(COMPLEMENT_TABLE)[::-1]
+
+
 def extract_frame_aa(sequence, frame):
     """
     :param sequence: dna bases
@@ -51,17 +71,42 @@ def extract_frame_aa(sequence, frame):
 
     bases = sequence
     if frame > 3:
-        seq = Seq(sequence)
-        bases = str(seq.reverse_complement())
+        bases = reverse_complement(sequence)
         frame -= 3
 
-    i = frame - 1
-    protein = ""
-    while i < len(bases)-2:
-        protein += codon2aa(bases[i:i+3])
-        i += 3
+    return translate_codons(bases.upper(), frame - 1)
+
+
+@lru_cache(maxsize=128)
+def translate_six_frames(sequence):
+    """
+    :param sequence: dna bases
+    :return: Tuple of amino acid translations of frames 1 to 6, from one reverse complement and reused for repeated sequences
+    """
+    bases = sequence.upper()
+    reverse_bases = reverse_complement(bases)
+
+    return tuple(translate_codons(bases, i) for i in range(3)) + \
+        tuple(translate_codons(reverse_bases, i) for i in range(3))
+
+
+def six_frame_translate_records(records):
+    """
+    :param records: iterable of (header, dna bases) records
+    :return: Generator of (header, tuple of amino acid translations of frames 1 to 6) records
+    """
+    for header, sequence in records:
+        yield header, translate_six_frames(sequence)
 
-    return protein
+
+def check_frame(frame):
+    if frame < 1 or frame > 6:
+        raise IndexError("Frame number argument is out of bounds: " + str(frame))
+
+
+def get_dna(seq_input):
+    """Return the dna bases of a Fasta feature, ignoring the id line"""
+    return ''.join([line.strip() for line in seq_input.splitlines() if not line.startswith('>')])
 
 
 def six_frame_translate(seq_input, frame):
@@ -71,15 +116,6 @@ def six_frame_translate(seq_input, frame):
     :return: protein translation
     """
 
-    if frame < 1 or frame > 6:
-        raise IndexError("Frame number argument is out of bounds: " + str(frame))
-
-    lines = seq_input.splitlines()
-    dna = ""
-    for line in lines:
-        if line.startswith('>'):
-            continue
-        else:
-            dna += line.strip()
+    check_frame(frame)
 
-    return extract_frame_aa(dna, frame)
+    return extract_frame_aa(get_dna(seq_input), frame)
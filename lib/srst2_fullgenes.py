@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Streaming reader of SRST2 fullgenes results"""
+from typing import NamedTuple
+
+
+class FullgenesRecord(NamedTuple):
+    """Typed fields of a row of an SRST2 fullgenes results file, with the read depth also as written by SRST2"""
+    gene: str
+    allele: str
+    coverage: float
+    depth: float
+    diffs: str
+    divergence: float
+    raw_depth: str
+
+
+FULLGENES_COLUMNS = ('gene', 'allele', 'coverage', 'depth', 'diffs', 'divergence')
+
+
+def get_column_indices(header):
+    """Get the index of each record field from the header row"""
+    columns = header.rstrip('\r\n').split('\t')
+    missing = [column for column in FULLGENES_COLUMNS if column not in columns]
+    if missing:
+        raise ValueError('Missing fullgenes columns: {}'.format(', '.join(missing)))
+    return [columns.index(column) for column in FULLGENES_COLUMNS]
+
+
+def read_fullgenes(input_file, min_depth=None):
+    """Yield a record for each row of an SRST2 fullgenes file, optionally skipping rows with a read depth below min_depth.
+    Empty files, as touched when SRST2 fails, have no records."""
+    with open(input_file, 'r') as fd:
+        header = fd.readline()
+        if not header:
+            return
+        gene_i, allele_i, coverage_i, depth_i, diffs_i, divergence_i = get_column_indices(header)
+
+        # Only split as far as the last field that is needed
+        max_split = max(gene_i, allele_i, coverage_i, depth_i, diffs_i, divergence_i) + 1
+        for line in fd:
+            if not line.strip():
+                continue
+            fields = line.rstrip('\r\n').split('\t', max_split)
+            depth = float(fields[depth_i])
+            if min_depth is not None and depth < min_depth:
+                continue
+            yield FullgenesRecord(fields[gene_i], fields[allele_i], float(fields[coverage_i]), depth,
+                                  fields[diffs_i], float(fields[divergence_i]), fields[depth_i])
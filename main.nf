@@ -10,11 +10,11 @@ nextflow.enable.dsl=2
 include {printHelp} from './modules/help.nf'
 include {serotyping} from './modules/serotyping.nf'
 include {srst2_for_res_typing; split_target_RES_seq_from_sam_file; split_target_RES_sequences; freebayes} from './modules/res_alignments.nf'
-include {res_typer} from './modules/res_typer.nf'
 include {surface_typer} from './modules/surface_typer.nf'
+include {process_sample_results} from './modules/sample_results.nf'
 include {getmlst_for_srst2; srst2_for_mlst; get_mlst_allele_and_pileup} from './modules/mlst.nf'
-include {get_pbp_genes; get_pbp_alleles} from './modules/pbp_typer.nf'
-include {finalise_sero_res_results; finalise_surface_typer_results; finalise_pbp_existing_allele_results; combine_results} from './modules/combine.nf'
+include {get_pbp_genes; build_pbp_blast_db; get_pbp_alleles} from './modules/pbp_typer.nf'
+include {finalise_pbp_existing_allele_results; combine_cohort_results; write_parquet_output as write_sero_res_parquet; write_parquet_output as write_alleles_variants_parquet; write_parquet_output as write_gbs_typer_report_parquet} from './modules/combine.nf'
 include {get_version} from './modules/version.nf'
 
 
@@ -111,6 +111,11 @@ if (params.surfacetyper_min_read_depth < 0){
     System.exit(1)
 }
 
+if (!(params.pbp_matcher in ['blast', 'python'])){
+    println("--pbp_matcher value not recognised. Please specify blast or python.")
+    System.exit(1)
+}
+
 // Create results directory if it doesn't already exist
 results_dir = file(params.results_dir)
 
@@ -146,9 +151,11 @@ workflow GBS_RES {
 
         gbs_res_typer_db = file(params.gbs_res_typer_db, checkIfExists: true)
         gbs_res_targets_db = file(params.gbs_res_targets_db, checkIfExists: true)
+        // FASTA index written by bin/prepare_db.py, if the database has been prepared
+        gbs_res_typer_db_index = file("${params.gbs_res_typer_db}.fai")
 
         // Split GBS target sequences from GBS resistance database into separate FASTA files per sequence
-        split_target_RES_sequences(gbs_res_typer_db, gbs_res_targets_db)
+        split_target_RES_sequences(gbs_res_typer_db, gbs_res_typer_db_index.exists() ? gbs_res_typer_db_index : [], gbs_res_targets_db)
 
         // Map genomes to GBS resistance database using SRST2
         srst2_for_res_typing(reads, gbs_res_typer_db, params.gbs_res_min_coverage, params.gbs_res_max_divergence)
@@ -213,69 +220,36 @@ workflow MLST {
         srst2_results
 }
 
-// PBP-1A allele typing pipeline
-workflow PBP1A {
-
-    take:
-        pbp_typer_output
-
-    main:
-        // Run
-        get_pbp_alleles(pbp_typer_output, 'GBS1A-1', file(params.gbs_blactam_1A_db, checkIfExists: true))
-
-        // Output new PBP alleles to results directory
-        get_pbp_alleles.out.new_pbp.subscribe { it ->
-            it.copyTo(file("${results_dir}"))
-        }
-
-        // Combine existing PBP alleles results in one file
-        finalise_pbp_existing_allele_results(get_pbp_alleles.out.existing_pbp, file(params.config, checkIfExists: true))
-
-    emit:
-        // Emit existing PBP alleles for collection
-        finalise_pbp_existing_allele_results.out
-}
-
-// PBP-2B allele typing pipeline
-workflow PBP2B {
+// PBP allele typing pipeline
+workflow PBP {
 
     take:
         pbp_typer_output
 
     main:
-        // Run
-        get_pbp_alleles(pbp_typer_output, 'GBS2B-1', file(params.gbs_blactam_2B_db, checkIfExists: true))
-
-        // Output new PBP alleles to results directory
-        get_pbp_alleles.out.new_pbp.subscribe { it ->
-            it.copyTo(file("${results_dir}"))
+        // Run PBP-1A, PBP-2B and PBP-2X allele typing in one step
+        blactam_dbs = [
+            'GBS1A-1': file(params.gbs_blactam_1A_db, checkIfExists: true),
+            'GBS2B-1': file(params.gbs_blactam_2B_db, checkIfExists: true),
+            'GBS2X-1': file(params.gbs_blactam_2X_db, checkIfExists: true)
+        ]
+        gbs_blactam_dbs = blactam_dbs.values() as List
+        blactam_db_names = blactam_dbs.collectEntries { pbp_gene, db -> [pbp_gene, db.getName()] }
+        // Build the blast database once for all samples, unless matching in process
+        if (params.pbp_matcher == 'python'){
+            pbp_blast_db = []
+        } else {
+            pbp_blast_db = build_pbp_blast_db(gbs_blactam_dbs).collect()
         }
-
-        // Combine existing PBP alleles results in one file
-        finalise_pbp_existing_allele_results(get_pbp_alleles.out.existing_pbp, file(params.config, checkIfExists: true))
-
-    emit:
-        // Emit existing PBP alleles for collection
-        finalise_pbp_existing_allele_results.out
-}
-
-// PBP-2X allele typing pipeline
-workflow PBP2X {
-
-    take:
-        pbp_typer_output
-
-    main:
-        // Run
-        get_pbp_alleles(pbp_typer_output, 'GBS2X-1', file(params.gbs_blactam_2X_db, checkIfExists: true))
+        get_pbp_alleles(pbp_typer_output, gbs_blactam_dbs, blactam_db_names, pbp_blast_db)
 
         // Output new PBP alleles to results directory
-        get_pbp_alleles.out.new_pbp.subscribe { it ->
+        get_pbp_alleles.out.new_pbp.flatten().subscribe { it ->
             it.copyTo(file("${results_dir}"))
         }
 
-        // Combine existing PBP alleles results in one file
-        finalise_pbp_existing_allele_results(get_pbp_alleles.out.existing_pbp, file(params.config, checkIfExists: true))
+        // Combine existing PBP alleles results of each type in one file
+        finalise_pbp_existing_allele_results(get_pbp_alleles.out.existing_pbp.transpose(), file(params.config, checkIfExists: true))
 
     emit:
         // Emit existing PBP alleles for collection
@@ -290,37 +264,18 @@ workflow {
         if (params.run_sero_res){
 
             // Serotyping Process
-            serotyping(read_pairs_ch, file(params.sero_gene_db, checkIfExists: true), params.serotyper_min_read_depth)
+            serotyping(read_pairs_ch, file(params.sero_gene_db, checkIfExists: true))
 
             // Resistance Mapping Workflows
             GBS_RES(read_pairs_ch)
             OTHER_RES(read_pairs_ch)
 
-            // Once GBS or both resistance workflows are complete, trigger resistance typing
-            GBS_RES.out.fullgenes
+            // Once serotyping and GBS or both resistance workflows are complete, collect the SRST2 outputs for resistance typing
+            serotyping.out
+            .join(GBS_RES.out.fullgenes)
             .join(GBS_RES.out.consensus)
             .join(OTHER_RES.out.fullgenes)
-            .set { res_files_ch }
-
-            res_typer(res_files_ch, params.restyper_min_read_depth, file(params.config, checkIfExists: true))
-
-            // Combine serotype and resistance type results for each sample
-            sero_res_ch = serotyping.out.join(res_typer.out.res_out)
-
-            finalise_sero_res_results(sero_res_ch, file(params.config, checkIfExists: true))
-
-            // Combine samples and output results files
-            finalise_sero_res_results.out.sero_res_incidence
-                .collectFile(name: file("${results_dir}/${params.sero_res_incidence_out}"), keepHeader: true)
-
-            finalise_sero_res_results.out.res_alleles_variants
-                .collectFile(name: file("${results_dir}/${params.alleles_variants_out}"), keepHeader: true)
-
-            finalise_sero_res_results.out.res_variants
-                .collectFile(name: file("${results_dir}/${params.variants_out}"), keepHeader: true)
-
-            res_typer.out.res_accessions
-                .collectFile(name: file("${results_dir}/${params.res_accessions_out}"))
+            .set { sero_res_files_ch }
         }
 
         // MLST
@@ -344,17 +299,56 @@ workflow {
         if (params.run_surfacetyper){
 
             surface_typer(read_pairs_ch, file(params.gbs_surface_typer_db, checkIfExists: true),
-                params.surfacetyper_min_read_depth, params.surfacetyper_min_coverage,
-                params.surfacetyper_max_divergence)
+                params.surfacetyper_min_coverage, params.surfacetyper_max_divergence)
+
+        }
+
+        // Process the serotyping, resistance typing and surface typing SRST2 outputs of each sample in one step
+        if (params.run_sero_res | params.run_surfacetyper){
 
-            finalise_surface_typer_results(surface_typer.out, file(params.config, checkIfExists: true))
+            if (params.run_sero_res & params.run_surfacetyper){
+                sample_results_ch = sero_res_files_ch.join(surface_typer.out)
+            } else if (params.run_sero_res){
+                sample_results_ch = sero_res_files_ch.map { it + [[]] }
+            } else {
+                sample_results_ch = surface_typer.out.map { pair_id, surface_fullgenes -> [pair_id, [], [], [], [], surface_fullgenes] }
+            }
+
+            process_sample_results(sample_results_ch, params.serotyper_min_read_depth, params.restyper_min_read_depth,
+                params.surfacetyper_min_read_depth, file(params.config, checkIfExists: true))
+
+            if (params.run_sero_res){
+
+                // Combine samples and output results files
+                process_sample_results.out.sero_res_incidence
+                    .collectFile(name: file("${results_dir}/${params.sero_res_incidence_out}"), keepHeader: true)
+                    .set { sero_res_incidence_ch }
 
-            // Combine results for surface typing
-            finalise_surface_typer_results.out.surface_protein_incidence
-                .collectFile(name: file("${results_dir}/${params.surface_protein_incidence_out}"), keepHeader: true)
-            finalise_surface_typer_results.out.surface_protein_variants
-                .collectFile(name: file("${results_dir}/${params.surface_protein_variants_out}"), keepHeader: true)
+                process_sample_results.out.res_alleles_variants
+                    .collectFile(name: file("${results_dir}/${params.alleles_variants_out}"), keepHeader: true)
+                    .set { alleles_variants_ch }
+
+                // Write columnar copies of the cohort tables
+                if (params.parquet_output){
+                    write_sero_res_parquet(sero_res_incidence_ch, file(params.config, checkIfExists: true))
+                    write_alleles_variants_parquet(alleles_variants_ch, file(params.config, checkIfExists: true))
+                }
+
+                process_sample_results.out.res_variants
+                    .collectFile(name: file("${results_dir}/${params.variants_out}"), keepHeader: true)
+
+                process_sample_results.out.res_accessions
+                    .collectFile(name: file("${results_dir}/${params.res_accessions_out}"))
+            }
 
+            if (params.run_surfacetyper){
+
+                // Combine results for surface typing
+                process_sample_results.out.surface_protein_incidence
+                    .collectFile(name: file("${results_dir}/${params.surface_protein_incidence_out}"), keepHeader: true)
+                process_sample_results.out.surface_protein_variants
+                    .collectFile(name: file("${results_dir}/${params.surface_protein_variants_out}"), keepHeader: true)
+            }
         }
 
         // PBP Typer
@@ -374,15 +368,9 @@ workflow {
             get_pbp_genes(contig_paths, file(params.gbs_blactam_db, checkIfExists: true), params.pbp_frac_align_threshold, params.pbp_frac_identity_threshold)
 
             // Get PBP existing and new alleles
-            PBP1A(get_pbp_genes.out)
-            PBP2B(get_pbp_genes.out)
-            PBP2X(get_pbp_genes.out)
+            PBP(get_pbp_genes.out)
 
-            PBP1A.out
-            .concat(PBP2B.out, PBP2X.out)
-            .set { PBP_all }
-
-            PBP_all
+            PBP.out
                 .collectFile(name: file("${results_dir}/${params.existing_pbp_alleles_out}"), keepHeader: true, sort: true)
         }
 
@@ -394,14 +382,32 @@ workflow {
             version_ch = get_version.out
 
             // Combine serotype and resistance type results for each sample
-            combined_ch = serotyping.out
-                .join(res_typer.out.res_out)
-                .join(surface_typer.out)
+            combined_ch = process_sample_results.out.sero_res_out
+                .join(process_sample_results.out.surface_out)
                 .join(MLST.out.srst2_results)
 
-            combine_results(combined_ch, file(params.config, checkIfExists: true), version_ch)
+            // List the result files of each sample in a manifest and combine all samples in one process
+            combined_ch
+                .map { pair_id, sero_results, res_incidence, res_alleles, res_variants, surface_protein_incidence, surface_protein_variants, mlst_allelic_frequency ->
+                    [pair_id, sero_results.name, res_incidence.name, res_variants.name, mlst_allelic_frequency.name, surface_protein_incidence.name].join('\t') }
+                .collectFile(name: 'combine_manifest.txt', newLine: true, sort: true)
+                .set { combine_manifest_ch }
+
+            combined_ch
+                .map { pair_id, sero_results, res_incidence, res_alleles, res_variants, surface_protein_incidence, surface_protein_variants, mlst_allelic_frequency ->
+                    [sero_results, res_incidence, res_variants, mlst_allelic_frequency, surface_protein_incidence] }
+                .flatten()
+                .collect()
+                .set { combine_files_ch }
 
-            combine_results.out
-                .collectFile(name: file("${results_dir}/${params.gbs_typer_report}"), keepHeader: true, sort: true)
+            combine_cohort_results(combine_manifest_ch, combine_files_ch, file(params.config, checkIfExists: true), version_ch)
+
+            combine_cohort_results.out
+                .collectFile(name: file("${results_dir}/${params.gbs_typer_report}"))
+                .set { gbs_typer_report_ch }
+
+            if (params.parquet_output){
+                write_gbs_typer_report_parquet(gbs_typer_report_ch, file(params.config, checkIfExists: true))
+            }
         }
 }
@@ -32,8 +32,11 @@ def printHelp() {
         --mlst_min_read_depth           Minimum read depth where mappings to alleles in MLST with fewer reads are excluded. Only operational with --run_mlst. (Default: 30)
         --pbp_frac_align_threshold      Minimum fraction of sequence alignment length of PBP gene. Only operational with --run_pbptyper. (Default: 0.5)
         --pbp_frac_identity_threshold   Minimum fraction of alignment identity between PBP genes and assemblies. Only operational with --run_pbptyper. (Default: 0.5)
+        --pbp_matcher                   How translated PBP genes are matched to PBP alleles: "blast" with blastp, or "python" with an in-process exact lookup and alignment. Only operational with --run_pbptyper. (Default: "blast")
         --surfacetyper_min_coverage     Minimum coverage for mapping to the GBS surface protein database. Only operational with --run_surfacetyper. (Default: 70)
         --surfacetyper_max_divergence   Maximum divergence for mapping to the GBS surface protein database. Only operational with --run_surfacetyper. (Default: 8, i.e. report only hits with <8% divergence)
         --surfacetyper_min_read_depth   Minimum read depth for surface protein typing workflow. Only operational with --run_surfacetyper. (Default: 30)
+        --parquet_output                Also write serotype_res_incidence, drug_cat_alleles_variants and gbs_typer_report as Parquet files in the results directory. (Default: false)
+        --cache_dir                     Absolute path of a directory where the outputs of the result processing scripts and the PBP blast database are cached by their inputs, thresholds and --db_version. Reruns with unchanged inputs reuse them. (Default: no cache)
   """.stripIndent()
 }
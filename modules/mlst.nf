@@ -65,12 +65,13 @@ process get_mlst_allele_and_pileup {
     output_new_mlst_pileup="${pair_id}_new_mlst_pileup.txt"
     output_existing_mlst_alleles="${pair_id}_existing_mlst_alleles.txt"
     output_new_mlst_alleles_log="${pair_id}_new_mlst_alleles.log"
+    cache_options=params.cache_dir ? "--cache_dir ${params.cache_dir} --db_version ${params.db_version}" : ""
 
     """
 
     # Get alleles from mismatches in SRST2 MLST results file
     samtools index ${bam_file}
-    get_alleles_from_srst2_mlst.py --mlst_results_file ${results_file} --min_read_depth ${min_read_depth} --output_prefix ${pair_id}
+    get_alleles_from_srst2_mlst.py --mlst_results_file ${results_file} --min_read_depth ${min_read_depth} --output_prefix ${pair_id} ${cache_options}
     if [[ -f ${pair_id}_new_mlst_alleles.txt ]]
     then
         num_alleles=\$(cat ${pair_id}_new_mlst_alleles.txt | wc -l)
@@ -6,7 +6,7 @@ process get_pbp_genes {
     val(frac_identity_len_threshold)
 
     output:
-    tuple val(pair_id), file("${pair_id}_*bed"), file(contigs), optional: true
+    tuple val(pair_id), file("${pair_id}_*faa"), optional: true
 
     """
     # Build a blast reference database from the assmeblies
@@ -15,43 +15,65 @@ process get_pbp_genes {
     # Blast the blactam database against the blast reference database
     blastn -db ${pair_id}_contig_blast_db -query ${blactam_ref} -outfmt 6 -word_size 7 -out ${pair_id}_blast_blactam.out
 
-    # Get BED file of PBP fragments
-    get_pbp_genes_from_contigs.py --blast_out_file ${pair_id}_blast_blactam.out --query_fasta ${blactam_ref} --frac_align_len_threshold ${frac_align_len_threshold} --frac_identity_threshold ${frac_identity_len_threshold} --output_prefix ${pair_id}_
+    # Get translated PBP fragments from the contigs
+    get_pbp_genes_from_contigs.py --blast_out_file ${pair_id}_blast_blactam.out --query_fasta ${blactam_ref} --frac_align_len_threshold ${frac_align_len_threshold} --frac_identity_threshold ${frac_identity_len_threshold} --contigs ${contigs} --output_prefix ${pair_id}_
 
     unlink ${blactam_ref}
+    unlink ${contigs}
     """
 }
 
-process get_pbp_alleles {
+process build_pbp_blast_db {
     input:
-    tuple val(pair_id), file(bed_file), file(contigs)
-    val(pbp_type)
-    file(gbs_blactam_db)
+    file(gbs_blactam_dbs) // PBP allele databases of all types
 
     output:
-    path "${pair_id}_${pbp_type}_PBP_new_allele.faa", optional: true, emit: new_pbp
-    tuple val(pair_id), file("${pair_id}_${pbp_type}_PBP_existing_allele.txt"), optional: true, emit: existing_pbp
+    path("GBS_bLactam_PBP-DB.faa*")
 
+    script:
+    cache_options=params.cache_dir ? "--cache_dir ${params.cache_dir} --db_version ${params.db_version}" : ""
     """
-    # Get PBP alleles
-    if [ -f ${pair_id}_${pbp_type}.bed ]; then
-        # Convert BED file to fasta
-        bedtools getfasta -s -fi ${contigs} -bed ${pair_id}_${pbp_type}.bed -fo ${pair_id}_${pbp_type}_contig_fragments.fasta
+    # Build one blast database of the PBP alleles of all types
+    build_pbp_blast_db.py --fasta ${gbs_blactam_dbs} --output GBS_bLactam_PBP-DB.faa ${cache_options}
 
-        # Translate fasta file into separate faa files using the translator in python
-        translate_pbp_genes.py --blactam_fasta ${pair_id}_${pbp_type}_contig_fragments.fasta --output_file ${pair_id}_${pbp_type}.faa
+    unlink ${gbs_blactam_dbs}
+    """
+}
 
-        # Build blast databases of PBP alleles and blast amino acids against database
-        makeblastdb -in ${gbs_blactam_db} -dbtype prot -out ${gbs_blactam_db}
-        blastp -db ${gbs_blactam_db} -query ${pair_id}_${pbp_type}.faa -outfmt 6 -out ${pair_id}_blast_${pbp_type}.out
+process get_pbp_alleles {
+    input:
+    tuple val(pair_id), file(faa_files) // ID and FAA files of the translated PBP fragments of each type
+    file(gbs_blactam_dbs) // PBP allele databases of all types
+    val(blactam_db_names) // Name of the PBP allele database of each type, by PBP gene
+    file(pbp_blast_db) // BLAST database of the PBP alleles of all types, or empty when matching in process
 
-        # Get identical or imperfect hits
-        get_pbp_alleles.py --blast_out_file ${pair_id}_blast_${pbp_type}.out --query_fasta ${pair_id}_${pbp_type}.faa --output_prefix ${pair_id}_${pbp_type}_PBP
+    output:
+    path "${pair_id}_*_PBP_new_allele.faa", optional: true, emit: new_pbp
+    tuple val(pair_id), file("${pair_id}_*_PBP_existing_allele.txt"), optional: true, emit: existing_pbp
 
-        unlink ${pair_id}_${pbp_type}.bed
-    fi
+    script:
+    faa_list = faa_files instanceof List ? faa_files : [faa_files]
+    output_prefixes = faa_list.collect { it.getBaseName() + '_PBP' }.join(' ')
+    allele_fastas = faa_list.collect { blactam_db_names[it.getBaseName() - "${pair_id}_"] }.join(' ')
+    if (params.pbp_matcher == 'python')
+        """
+        # Get identical or imperfect matches of each PBP type in process
+        get_pbp_alleles.py --allele_fasta ${allele_fastas} --query_fasta ${faa_files} --output_prefix ${output_prefixes}
 
-    unlink ${contigs}
-    unlink ${gbs_blactam_db}
-    """
+        unlink ${faa_files}
+        unlink ${gbs_blactam_dbs}
+        """
+    else
+        """
+        # Blast the amino acids of the PBP fragments of all types against the database at once
+        cat ${faa_files} > ${pair_id}_PBP.faa
+        blastp -db GBS_bLactam_PBP-DB.faa -query ${pair_id}_PBP.faa -outfmt 6 -out ${pair_id}_blast_PBP.out
+
+        # Get identical or imperfect hits of each PBP type among the alleles of that type
+        get_pbp_alleles.py --blast_out_file ${pair_id}_blast_PBP.out --allele_fasta ${allele_fastas} --query_fasta ${faa_files} --output_prefix ${output_prefixes}
+
+        unlink ${faa_files}
+        unlink ${gbs_blactam_dbs}
+        unlink ${pbp_blast_db}
+        """
 }
@@ -24,6 +24,7 @@ process split_target_RES_sequences {
 
     input:
     file(fasta_file) // FASTA file of GBS target sequences
+    file(fasta_index) // FASTA index of the FASTA file (optional)
     file(targets_file) // Text file of GBS targets of interest
 
     output:
@@ -35,6 +36,9 @@ process split_target_RES_sequences {
     # Clean
     unlink ${fasta_file}
     unlink ${targets_file}
+    if [ -L ${fasta_file}.fai ]; then
+        unlink ${fasta_file}.fai
+    fi
     """
 }
 
@@ -51,17 +55,14 @@ process split_target_RES_seq_from_sam_file {
 
     """
     set +e
-    samtools view -h ${bam_file} > \$(basename ${bam_file} .bam).sam
-    get_targets_from_samfile.py -s \$(basename ${bam_file} .bam).sam -t ${targets_file} -i ${pair_id} -o CHECK_
-    for check_sam_file in CHECK_*_${pair_id}*.sam; do
-        samtools view -bS \${check_sam_file} > \$(basename \${check_sam_file} .sam).bam
-        samtools index \$(basename \${check_sam_file} .sam).bam \$(basename \${check_sam_file} .sam).bai
-    done
+    # Write an indexed BAM file for each target from region queries of the mapped BAM file
+    get_targets_from_samfile.py -b ${bam_file} -t ${targets_file} -i ${pair_id} -o CHECK_
 
     touch dummy_dummy_${pair_id}_dummy.bam
     touch dummy_dummy_${pair_id}_dummy.bai
 
     # Clean directory
+    rm -f ${bam_file}.bai
     unlink ${bam_file}
     unlink ${targets_file}
     """
@@ -0,0 +1,53 @@
+process process_sample_results {
+
+    input:
+    // ID, serotyping fullgenes, GBS resistance fullgenes, GBS resistance consensus, other resistance fullgenes, surface protein fullgenes
+    // ([] for the results of pipelines that are not run)
+    tuple val(pair_id), path(sero_fullgenes), path(gbs_fullgenes), path(gbs_consensus), path(other_fullgenes), path(surface_fullgenes)
+    val(sero_min_read_depth) // Minimum read depth threshold for serotyping
+    val(res_min_read_depth) // Minimum read depth threshold for resistance typing
+    val(surface_min_read_depth) // Minimum read depth threshold for surface typing
+    path config
+
+    output:
+    // Outputs are optional only for the pipelines that are not run, as the task fails if a step of a pipeline that is run fails
+    tuple val(pair_id), file(sero_output_file), file(inc_output_file), file(alleles_output_file), file(variants_output_file), emit: sero_res_out, optional: true
+    path("${alleles_accessions_file}"), emit: res_accessions, optional: true
+    path("${pair_id}_sero_res_incidence.txt"), emit: sero_res_incidence, optional: true
+    path("${pair_id}_id_alleles_variants.txt"), emit: res_alleles_variants, optional: true
+    path("${pair_id}_id_variants.txt"), emit: res_variants, optional: true
+    tuple val(pair_id), file(surface_inc_output_file), file(surface_variants_output_file), emit: surface_out, optional: true
+    path("${pair_id}_surface_protein_incidence.txt"), emit: surface_protein_incidence, optional: true
+    path("${pair_id}_surface_protein_variants.txt"), emit: surface_protein_variants, optional: true
+
+    script:
+    sero_output_file="${pair_id}_SeroType_Results.txt"
+    inc_output_file="${pair_id}_res_incidence.txt"
+    alleles_output_file="${pair_id}_res_alleles_variants.txt"
+    variants_output_file="${pair_id}_res_gbs_variants.txt"
+    alleles_accessions_file="${pair_id}_res_alleles_accessions.txt"
+    surface_inc_output_file="${pair_id}_surface_protein_incidence_sample.txt"
+    surface_variants_output_file="${pair_id}_surface_protein_variants_sample.txt"
+    sero_options=sero_fullgenes ? "--sero_fullgenes ${sero_fullgenes} --sero_min_read_depth ${sero_min_read_depth}" : ""
+    res_options=gbs_fullgenes ? "--res_gbs_fullgenes ${gbs_fullgenes} --res_gbs_consensus ${gbs_consensus} --res_other_fullgenes ${other_fullgenes} --res_min_read_depth ${res_min_read_depth}" : ""
+    surface_options=surface_fullgenes ? "--surface_fullgenes ${surface_fullgenes} --surface_min_read_depth ${surface_min_read_depth}" : ""
+    // Must create the typing outputs of each pipeline that is run (empty if fails)
+    sero_res_outputs=sero_fullgenes && gbs_fullgenes ? "${sero_output_file} ${inc_output_file} ${alleles_output_file} ${variants_output_file} ${alleles_accessions_file}" : ""
+    surface_outputs=surface_fullgenes ? "${surface_inc_output_file} ${surface_variants_output_file}" : ""
+    cache_options=params.cache_dir ? "--cache_dir ${params.cache_dir} --db_version ${params.db_version}" : ""
+    """
+    set +e
+
+    process_sample_results.py \
+        --id ${pair_id} \
+        --headers ${config} \
+        --output_prefix ${pair_id} \
+        ${sero_options} ${res_options} ${surface_options} ${cache_options}
+    status=\$?
+
+    touch ${sero_res_outputs} ${surface_outputs}
+
+    # Fail the task if any step failed, as its combined tables are then missing
+    exit \$status
+    """
+}
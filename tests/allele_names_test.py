@@ -0,0 +1,10 @@
+import unittest
+from lib.allele_names import normalise_allele
+
+
+class TestAlleleNames(unittest.TestCase):
+
+    def test_normalise_allele(self):
+        self.assertEqual(normalise_allele('alp2/3-1.b'), 'ALP231B')
+        self.assertEqual(normalise_allele("tet(O/W/32/O)_1"), "TETOW32O1")
+        self.assertEqual(normalise_allele("erm(B)"), "ERMB")
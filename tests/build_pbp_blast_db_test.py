@@ -0,0 +1,77 @@
+import argparse
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, call
+
+from bin.build_pbp_blast_db import concatenate_fasta_files, build_blast_db, get_arguments, main
+
+
+def fake_makeblastdb(command, **kwargs):
+    """Write the files of a BLAST database named by the -out option"""
+    output = command[command.index('-out') + 1]
+    for extension in ('.phr', '.pin', '.psq'):
+        with open(output + extension, 'w') as out:
+            out.write(extension)
+
+
+class TestBuildPBPBlastDb(unittest.TestCase):
+    TEST_1A_DB = 'tests/test_data/input/test_GBS1A-1.faa'
+    TEST_2X_DB = 'tests/test_data/input/test_GBS2X-1.faa'
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.tmp_dir.name, 'GBS_bLactam_PBP-DB.faa')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_concatenate_fasta_files(self):
+        no_newline = os.path.join(self.tmp_dir.name, 'no_newline.faa')
+        with open(no_newline, 'w') as out:
+            out.write('>seq\nMK')
+
+        concatenate_fasta_files([no_newline, self.TEST_1A_DB], self.output)
+
+        with open(self.output, 'r') as f, open(self.TEST_1A_DB, 'r') as g:
+            self.assertEqual(f.read(), '>seq\nMK\n' + g.read())
+
+    @patch('bin.build_pbp_blast_db.subprocess.run', side_effect=fake_makeblastdb)
+    def test_build_blast_db(self, mock_run):
+        concatenate_fasta_files([self.TEST_1A_DB], self.output)
+
+        build_blast_db(self.output)
+
+        mock_run.assert_called_once_with(['makeblastdb', '-in', self.output, '-dbtype', 'prot', '-out', self.output], check=True)
+        self.assertTrue(os.path.exists(self.output + '.pin'))
+
+    @patch('bin.build_pbp_blast_db.get_makeblastdb_version', return_value='makeblastdb: 2.12.0+')
+    @patch('bin.build_pbp_blast_db.subprocess.run', side_effect=fake_makeblastdb)
+    @patch('bin.build_pbp_blast_db.get_arguments')
+    def test_main_with_cache(self, mock_get_arguments, mock_run, mock_get_makeblastdb_version):
+        args = mock_get_arguments.return_value.parse_args()
+        args.fasta = [self.TEST_1A_DB, self.TEST_2X_DB]
+        args.output = self.output
+        args.cache_dir = os.path.join(self.tmp_dir.name, 'cache')
+        args.cache_max_size = 1
+        args.db_version = '0.2.1'
+
+        main()
+        for extension in ('.phr', '.pin', '.psq'):
+            os.remove(self.output + extension)
+        main()
+
+        self.assertEqual(mock_run.call_count, 1)
+        self.assertTrue(os.path.exists(self.output + '.pin'))
+
+        # Other alleles are a different cache entry, so the database is built again
+        args.fasta = [self.TEST_1A_DB]
+        main()
+
+        self.assertEqual(mock_run.call_count, 2)
+
+    def test_arguments(self):
+        actual = get_arguments().parse_args(
+            ['--fasta', 'fasta_1', 'fasta_2', '--output', 'output'])
+        self.assertEqual(actual, argparse.Namespace(fasta=['fasta_1', 'fasta_2'], output='output',
+                                                    cache_dir=None, cache_max_size=1024, db_version=''))
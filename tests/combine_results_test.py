@@ -4,8 +4,12 @@ from unittest.mock import patch, call, ANY
 import pandas as pd
 import numpy as np
 import os
+import tempfile
+import importlib.util
 
-from bin.combine_results import read_header_json, get_content, create_model_df, merge_dfs, create_df, rename_columns, get_arguments, main
+from bin.combine_results import read_header_json, get_content, create_model_df, merge_dfs, create_df, rename_columns, get_arguments, main, \
+    read_first_row, combine_rows, read_manifest, write_cohort_report, get_column_dtypes, read_table, \
+    update_cohort_report, build_report_index, read_report_index
 from lib.file_utils import FileUtils
 
 class TestCombineResults(unittest.TestCase):
@@ -196,6 +200,154 @@ class TestCombineResults(unittest.TestCase):
         self.assertEqual(list(actual.to_dict().keys()), ['Sample_id', 'cps_type', 'ST', 'adhP', 'pheS', 'atr', 'glnA', 'sdhA', 'glcK', 'tkt', "aac(6')-aph(2'')", 'ant(6-Ia)', "aph(3'-III)", 'aadE', 'cat(pc194)', 'catQ', 'ermA', 'ermB', 'ermT', 'lnuB', 'lnuC', 'lsaC', 'lsaE', 'mefA', 'msrD', 'tetB', 'tetL', 'tetM', 'tetW', 'tetO', 'tetS','tetO32O', 'tetOW', 'tetOW32O', 'tetOW32OWO','tetOWO','tetSM','tetW32O','alp1', 'alp2/3', 'alpha', 'hvgA', 'PI1', 'PI2A1', 'PI2A2', 'PI2B', 'rib', 'srr1', 'srr2', '23S1_SNP', '23S3_SNP', 'gyrA_SNP', 'parC_SNP', 'typer_pipeline_version'])
         os.remove(self.TEST_OUTPUT)
 
+    def test_read_first_row(self):
+        actual = read_first_row(self.TEST_DATA_RES_VARIANTS)
+        self.assertEqual(actual, {'23S1_SNP': '*', '23S3_SNP': '*', 'GYRA_SNP': 'V1A,M2Q,G3W,K4W', 'PARC_SNP': '*'})
+
+    def test_read_first_row_for_empty_file(self):
+        self.assertEqual(read_first_row(self.TEST_DATA_EMPTY_SURFACE_TYPER), {})
+        self.assertEqual(read_first_row('tests/test_data/input/does_not_exist.txt'), {})
+
+    def test_combine_rows(self):
+        actual = combine_rows([{'A': '1'}, {'A': '2', 'B': '3'}, {}])
+        self.assertEqual(actual, {'A': '1', 'B': '3'})
+
+    def test_write_cohort_report_matches_combine_all(self):
+        files = [self.TEST_DATA_SEROTYPE, self.TEST_DATA_RES_INCIDENCE, self.TEST_DATA_RES_VARIANTS, self.TEST_DATA_MLST_ALLELIC_FREQUENCY]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            version_file = os.path.join(tmp_dir, 'version.txt')
+            with open(version_file, 'w') as out:
+                out.write('version\nv1.0.0\n')
+            manifest = os.path.join(tmp_dir, 'manifest.txt')
+            with open(manifest, 'w') as out:
+                out.write('\t'.join(['sample1'] + files + [self.TEST_DATA_SURFACE_TYPER]) + '\n')
+                out.write('\t'.join(['sample2'] + files + [self.TEST_DATA_EMPTY_SURFACE_TYPER]) + '\n')
+            report = os.path.join(tmp_dir, 'gbs_typer_report.txt')
+
+            write_cohort_report(read_manifest(manifest), self.header_dict, version_file, report)
+
+            expected = []
+            for id, surface_inc in [('sample1', self.TEST_DATA_SURFACE_TYPER), ('sample2', self.TEST_DATA_EMPTY_SURFACE_TYPER)]:
+                id_df = pd.DataFrame(id, columns=self.header_dict["id"], index = [0])
+                df_combine_all = create_df(list(self.header_dict["combine_all"].keys()), id_df, files + [surface_inc, version_file])
+                df_combine_all = rename_columns(df_combine_all, self.header_dict["combine_all"], id_df)
+                output = os.path.join(tmp_dir, id + '_id_combined_output.txt')
+                FileUtils.write_pandas_output(df_combine_all, output)
+                with open(output, 'r') as f:
+                    expected.append(f.readlines())
+
+            with open(report, 'r') as f:
+                actual = f.readlines()
+
+        self.assertEqual(actual, expected[0] + expected[1][1:])
+
+    def write_serotype_file(self, tmp_dir, id, serotype):
+        sero_file = os.path.join(tmp_dir, id + '_SeroType_Results.txt')
+        with open(sero_file, 'w') as out:
+            out.write('Serotype\n' + serotype + '\n')
+        return sero_file
+
+    def read_report_rows(self, report):
+        with open(report, 'r') as f:
+            return [line.split('\t')[:2] for line in f.readlines()[1:] if line.strip()]
+
+    def test_update_cohort_report(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            version_file = os.path.join(tmp_dir, 'version.txt')
+            with open(version_file, 'w') as out:
+                out.write('version\nv1.0.0\n')
+            report = os.path.join(tmp_dir, 'gbs_typer_report.txt')
+
+            # Report is created if it does not exist
+            samples = [(id, [self.write_serotype_file(tmp_dir, id, 'III')]) for id in ['sample1', 'sample2', 'sample3']]
+            update_cohort_report(samples, self.header_dict, version_file, report)
+            self.assertEqual(self.read_report_rows(report), [['sample1', 'III'], ['sample2', 'III'], ['sample3', 'III']])
+
+            # New samples are appended and unchanged samples are left alone
+            with open(report, 'rb') as f:
+                existing_content = f.read()
+            samples = [('sample1', [self.write_serotype_file(tmp_dir, 'sample1', 'III')]), ('sample4', [self.write_serotype_file(tmp_dir, 'sample4', 'Ia')])]
+            update_cohort_report(samples, self.header_dict, version_file, report)
+            with open(report, 'rb') as f:
+                self.assertTrue(f.read().startswith(existing_content))
+            self.assertEqual(self.read_report_rows(report), [['sample1', 'III'], ['sample2', 'III'], ['sample3', 'III'], ['sample4', 'Ia']])
+
+            # Changed samples of the same length are replaced in place, without rewriting the rows after them
+            with open(report, 'rb') as f:
+                content = f.read()
+            offset, length = read_report_index(report)['sample2']
+            samples = [('sample2', [self.write_serotype_file(tmp_dir, 'sample2', 'Ib ')])]
+            update_cohort_report(samples, self.header_dict, version_file, report)
+            with open(report, 'rb') as f:
+                updated_content = f.read()
+            self.assertEqual(len(updated_content), len(content))
+            self.assertEqual(updated_content[:offset], content[:offset])
+            self.assertEqual(updated_content[offset + length:], content[offset + length:])
+            self.assertEqual(self.read_report_rows(report), [['sample1', 'III'], ['sample2', 'Ib '], ['sample3', 'III'], ['sample4', 'Ia']])
+
+            # Changed samples of another length are blanked and appended with the new samples
+            samples = [('sample2', [self.write_serotype_file(tmp_dir, 'sample2', 'V')]), ('sample5', [self.write_serotype_file(tmp_dir, 'sample5', 'II')])]
+            update_cohort_report(samples, self.header_dict, version_file, report)
+            with open(report, 'rb') as f:
+                self.assertTrue(f.read().startswith(content[:offset] + b'\n' * length + content[offset + length:]))
+            self.assertEqual(self.read_report_rows(report), [['sample1', 'III'], ['sample3', 'III'], ['sample4', 'Ia'], ['sample2', 'V'], ['sample5', 'II']])
+            self.assertEqual(pd.read_csv(report, sep='\t', dtype=str)['Sample_id'].to_list(), ['sample1', 'sample3', 'sample4', 'sample2', 'sample5'])
+
+            # The index kept up to date is the same as a rebuilt one
+            self.assertEqual(read_report_index(report), build_report_index(report))
+            with open(report, 'rb') as f:
+                offset, length = read_report_index(report)['sample4']
+                f.seek(offset)
+                self.assertTrue(f.read(length).startswith(b'sample4\tIa\t'))
+
+    def test_update_cohort_report_with_different_columns(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            report = os.path.join(tmp_dir, 'gbs_typer_report.txt')
+            with open(report, 'w') as out:
+                out.write('Sample_id\tcps_type\n')
+
+            with self.assertRaises(ValueError):
+                update_cohort_report([], self.header_dict, os.path.join(tmp_dir, 'version.txt'), report)
+
+    def test_get_column_dtypes(self):
+        actual = get_column_dtypes(self.header_dict, ['Sample_id', 'Serotype', 'cps_type', 'ERMB', 'ermB', 'alp2/3', 'ST', 'GYRA_SNP'])
+        self.assertEqual(actual, {
+            'Sample_id': 'string',
+            'Serotype': 'category',
+            'cps_type': 'category',
+            'ERMB': 'category',
+            'ermB': 'category',
+            'alp2/3': 'category',
+            'ST': 'string',
+            'GYRA_SNP': 'string'
+        })
+
+    def test_read_table(self):
+        actual = read_table(self.TEST_DATA_RES_VARIANTS, self.header_dict)
+        self.assertEqual(str(actual['GYRA_SNP'].dtype), 'string')
+        self.assertEqual(actual.loc[0, 'GYRA_SNP'], 'V1A,M2Q,G3W,K4W')
+        self.assertTrue(pd.isna(actual.loc[0, 'RPOBGBS-1_SNP']))
+
+        actual = read_table(self.TEST_DATA_RES_INCIDENCE, self.header_dict)
+        self.assertEqual(str(actual['ERMB'].dtype), 'category')
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow is not installed')
+    @patch('bin.combine_results.get_arguments')
+    def test_main_for_parquet(self, mock_get_arguments):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            args = mock_get_arguments.return_value.parse_args()
+            args.which = "parquet"
+            args.headers = self.TEST_HEADERS_FILE
+            args.input = self.TEST_DATA_RES_INCIDENCE
+            args.output = os.path.join(tmp_dir, 'serotype_res_incidence.parquet')
+
+            main()
+
+            actual = pd.read_parquet(args.output, columns=['TETM', 'ERMB'])
+
+        self.assertEqual(actual.astype(str).to_dict(), {'TETM': {0: 'pos'}, 'ERMB': {0: 'neg'}})
+        self.assertEqual(str(actual['TETM'].dtype), 'category')
+
     @patch('bin.combine_results.get_arguments')
     @patch('lib.file_utils.FileUtils.write_pandas_output')
     @patch('bin.combine_results.create_df')
@@ -321,3 +473,17 @@ class TestCombineResults(unittest.TestCase):
         actual = get_arguments().parse_args(['combine_all', '-i', 'id', '-t', 'header_file', '-s', 'sero_file', '-r', 'res_file', '-v', 'variants_file', '-m', 'mlst_file', '-x', 'surface_typer_file', '-n', 'version', '-o', 'output_prefix'])
         self.assertEqual(actual,
                          argparse.Namespace(which='combine_all', id='id', headers='header_file', sero='sero_file', inc='res_file', variants='variants_file', mlst='mlst_file', surface_inc='surface_typer_file', output='output_prefix', version='version'))
+
+    def test_arguments_short_options_combine_cohort(self):
+        actual = get_arguments().parse_args(['combine_cohort', '-t', 'header_file', '-f', 'manifest_file', '-n', 'version', '-o', 'gbs_typer_report.txt'])
+        self.assertEqual(actual,
+                         argparse.Namespace(which='combine_cohort', headers='header_file', manifest='manifest_file', version='version', output='gbs_typer_report.txt', update=False))
+
+    def test_arguments_short_options_parquet(self):
+        actual = get_arguments().parse_args(['parquet', '-t', 'header_file', '-i', 'gbs_typer_report.txt', '-o', 'gbs_typer_report.parquet'])
+        self.assertEqual(actual,
+                         argparse.Namespace(which='parquet', headers='header_file', input='gbs_typer_report.txt', output='gbs_typer_report.parquet'))
+
+    def test_arguments_combine_cohort_update(self):
+        actual = get_arguments().parse_args(['combine_cohort', '-t', 'header_file', '-f', 'manifest_file', '-n', 'version', '-o', 'gbs_typer_report.txt', '--update'])
+        self.assertTrue(actual.update)
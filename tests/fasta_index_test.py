@@ -0,0 +1,124 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from lib.fasta_index import FastaIndexEntry, build_fasta_index, write_fasta_index, read_fasta_index, \
+    get_fasta_index, get_entries_by_name, read_record, write_target_records
+from bin.get_targets_from_db import write_target_fasta_files
+
+
+class TestFastaIndex(unittest.TestCase):
+
+    TEST_FASTA = 'tests/test_data/input/GBS_Res_Gene-DB_Final_0.0.1.fasta'
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_file(self, name, content):
+        filename = os.path.join(self.tmp_dir.name, name)
+        with open(filename, 'w') as out:
+            out.write(content)
+        return filename
+
+    def test_build_fasta_index(self):
+        fasta_file = self.write_file('test.fasta', '>seq1 description\nACGT\nACGT\nAC\n>seq2\nACG\n>seq3\n')
+
+        self.assertEqual(build_fasta_index(fasta_file), [
+            FastaIndexEntry('seq1', 10, 18, 4, 5),
+            FastaIndexEntry('seq2', 3, 37, 3, 4),
+            FastaIndexEntry('seq3', 0, 47, 0, 0)])
+
+    def test_build_fasta_index_without_final_newline(self):
+        fasta_file = self.write_file('test.fasta', '>seq1\nACGT\nAC')
+
+        self.assertEqual(build_fasta_index(fasta_file), [FastaIndexEntry('seq1', 6, 6, 4, 5)])
+
+    def test_build_fasta_index_with_irregular_lines(self):
+        fasta_file = self.write_file('test.fasta', '>seq1\nAC\nACGT\n')
+
+        with self.assertRaises(ValueError):
+            build_fasta_index(fasta_file)
+
+    def test_write_and_read_fasta_index(self):
+        index_file = os.path.join(self.tmp_dir.name, 'test.fasta.fai')
+        entries = build_fasta_index(self.TEST_FASTA)
+        write_fasta_index(entries, index_file)
+
+        self.assertEqual(read_fasta_index(index_file), entries)
+
+    def test_get_fasta_index(self):
+        fasta_file = self.write_file('test.fasta', '>seq1\nACGT\n')
+        self.assertIsNone(get_fasta_index(fasta_file))
+
+        write_fasta_index(build_fasta_index(fasta_file), fasta_file + '.fai')
+        self.assertEqual(get_fasta_index(fasta_file), [FastaIndexEntry('seq1', 4, 6, 4, 5)])
+
+        # A FASTA file changed after indexing makes its index stale
+        os.utime(fasta_file, (time.time() + 10, time.time() + 10))
+        self.assertIsNone(get_fasta_index(fasta_file))
+
+    def test_get_fasta_index_checks_file_size(self):
+        fasta_file = self.write_file('test.fasta', '>seq1\nACGT\nAC\n')
+        write_fasta_index(build_fasta_index(fasta_file), fasta_file + '.fai')
+        self.assertEqual(get_fasta_index(fasta_file), [FastaIndexEntry('seq1', 6, 6, 4, 5)])
+
+        # A FASTA file rewritten within the mtime resolution is caught by its size
+        stat = os.stat(fasta_file)
+        self.write_file('test.fasta', '>seq1\nACGT\nACG\n')
+        os.utime(fasta_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertIsNone(get_fasta_index(fasta_file))
+
+        # Without a final line ending
+        self.write_file('test.fasta', '>seq1\nACGT\nAC')
+        write_fasta_index(build_fasta_index(fasta_file), fasta_file + '.fai')
+        self.assertEqual(get_fasta_index(fasta_file), [FastaIndexEntry('seq1', 6, 6, 4, 5)])
+
+    def test_get_fasta_index_of_test_database(self):
+        index_file = os.path.join(self.tmp_dir.name, 'test.fasta.fai')
+        write_fasta_index(build_fasta_index(self.TEST_FASTA), index_file)
+        self.assertEqual(get_fasta_index(self.TEST_FASTA, index_file), build_fasta_index(self.TEST_FASTA))
+
+    def test_read_record(self):
+        entries_by_name = get_entries_by_name(build_fasta_index(self.TEST_FASTA))
+
+        with open(self.TEST_FASTA, 'rb') as fasta:
+            actual = read_record(fasta, entries_by_name['1__CAT__CAT-1__1'][0])
+        self.assertEqual(actual, b'>1__CAT__CAT-1__1\n'
+                                 b'CTTAGTGACAAGGGTGATAAACTCAAATACAGCTTTTAGAACTGGTTACAATAGCGACGG\n'
+                                 b'AGAGTTAGGTTATTGGGATAAGTTAGAGCCACTTTATACA\n')
+
+    def test_write_target_records(self):
+        output_prefix = os.path.join(self.tmp_dir.name, 'CHECK_')
+        write_target_records(['1__CAT__CAT-1__1', 'NOT_IN_DB'], self.TEST_FASTA, build_fasta_index(self.TEST_FASTA), output_prefix)
+
+        with open(output_prefix + '1__CAT__CAT-1__1_ref.fna', 'r') as f:
+            self.assertEqual(f.readline(), '>1__CAT__CAT-1__1\n')
+        with open(output_prefix + 'NOT_IN_DB_ref.fna', 'r') as f:
+            self.assertEqual(f.read(), '')
+
+    def test_read_record_keeps_header(self):
+        fasta_file = self.write_file('test.fasta', '>seq1 description\nACGT\nAC\n>seq2\nACG\n')
+
+        with open(fasta_file, 'rb') as fasta:
+            actual = [read_record(fasta, entry) for entry in build_fasta_index(fasta_file)]
+        self.assertEqual(actual, [b'>seq1 description\nACGT\nAC\n', b'>seq2\nACG\n'])
+
+    def test_write_target_records_matches_fasta_scan(self):
+        fasta_file = self.write_file('test.fasta', '>seq1 description\nACGT\nAC\n>seq1\nAAAA\n>' + 'x' * 50 + ' long header\nCC\n')
+        targets = ['seq1', 'seq1 description', 'x' * 50 + ' long header', 'x' * 50]
+        index_prefix = os.path.join(self.tmp_dir.name, 'index_')
+        scan_prefix = os.path.join(self.tmp_dir.name, 'scan_')
+
+        # Headers longer than a chunk are read back over several chunks
+        with mock.patch('lib.fasta_index.HEADER_CHUNK_SIZE', 8):
+            write_target_records(targets, fasta_file, build_fasta_index(fasta_file), index_prefix)
+        write_target_fasta_files(targets, fasta_file, scan_prefix)
+
+        for target in targets:
+            with open(index_prefix + target + '_ref.fna', 'rb') as index_out, open(scan_prefix + target + '_ref.fna', 'rb') as scan_out:
+                self.assertEqual(index_out.read(), scan_out.read(), target)
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+from lib.fasta_index import build_fasta_index, write_fasta_index
+from lib.fasta_reader import FastaReader
+from lib.file_io import get_seq_content
+
+
+class TestFastaReader(unittest.TestCase):
+
+    TEST_FASTA = 'tests/test_data/input/GBS_Res_Gene-DB_Final_0.0.1.fasta'
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_file(self, name, content):
+        filename = os.path.join(self.tmp_dir.name, name)
+        with open(filename, 'w', newline='') as out:
+            out.write(content)
+        return filename
+
+    def test_get_sequence(self):
+        seqs = get_seq_content(self.TEST_FASTA)
+
+        with FastaReader(self.TEST_FASTA) as reader:
+            for name in reader.get_names():
+                self.assertEqual(reader.get_sequence(name), seqs[name])
+                self.assertEqual(reader.get_length(name), len(seqs[name]))
+
+    def test_get_subsequence(self):
+        fasta_file = self.write_file('test.fasta', '>seq1 description\nACGT\nTGCA\nAC\n>seq2\nGGG\n')
+
+        with FastaReader(fasta_file) as reader:
+            self.assertEqual(reader.get_sequence('seq1', 2, 7), 'GTTGC')
+            self.assertEqual(reader.get_sequence('seq1', 8), 'AC')
+            self.assertEqual(reader.get_sequence('seq1', -3), 'AAC')
+            self.assertEqual(reader.get_sequence('seq1', 5, 3), '')
+            self.assertEqual(reader.get_sequence('seq1', 8, 100), 'AC')
+            self.assertEqual(reader.get_sequence('seq2'), 'GGG')
+
+    def test_get_subsequence_with_windows_line_endings(self):
+        fasta_file = self.write_file('test.fasta', '>seq1\r\nACGT\r\nTGCA\r\n')
+
+        with FastaReader(fasta_file) as reader:
+            self.assertEqual(reader.get_sequence('seq1', 3, 6), 'TTG')
+
+    def test_get_raw(self):
+        fasta_file = self.write_file('test.fasta', '>seq1\nACGT\nTGCA\n')
+
+        with FastaReader(fasta_file) as reader:
+            with reader.get_raw('seq1', 2, 6) as raw:
+                self.assertEqual(raw.tobytes(), b'GT\nTG')
+
+    def test_uses_existing_index(self):
+        fasta_file = self.write_file('test.fasta', '>seq1\nACGT\n')
+        index_file = os.path.join(self.tmp_dir.name, 'other.fai')
+        write_fasta_index(build_fasta_index(self.write_file('other.fasta', '>other\nACGT\n')), index_file)
+
+        with FastaReader(fasta_file, index_file) as reader:
+            self.assertEqual(reader.get_names(), ['other'])
+            self.assertNotIn('seq1', reader)
+
+    def test_empty_file(self):
+        fasta_file = self.write_file('test.fasta', '')
+
+        with FastaReader(fasta_file) as reader:
+            self.assertEqual(reader.get_names(), [])
@@ -0,0 +1,36 @@
+import unittest
+import os
+from lib.file_io import get_seq_content, read_seq_records
+
+
+class TestFileIO(unittest.TestCase):
+    """Unit test class for the file_io module"""
+
+    TEST_CONSENSUS_SEQ_FILE = "tests/test_data/input/26189_8#5_consensus_seq.fna"
+    TEST_FASTA_FILE = "tests/test_data/input/GBS_Res_Gene-DB_Final_0.0.1.fasta"
+    TEST_OUTPUT = "tests/test_data/output/file_io_test.fasta"
+
+    def tearDown(self):
+        if os.path.exists(self.TEST_OUTPUT):
+            os.remove(self.TEST_OUTPUT)
+
+    def test_read_seq_records(self):
+        records = read_seq_records(self.TEST_FASTA_FILE)
+        self.assertEqual(next(records), ('1__CAT__CAT-1__1',
+            'CTTAGTGACAAGGGTGATAAACTCAAATACAGCTTTTAGAACTGGTTACAATAGCGACGGAGAGTTAGGTTATTGGGATAAGTTAGAGCCACTTTATACA'))
+        self.assertEqual(next(records), ('2__ERMB__ERMB-1__2',
+            'GCTTAAGCTGCCAGCGGAATGCTTTCATCCTAAACCAAAAGTAAACAGTGTCTTAATAAAACTTACCCGCCATACCACAGATGTTCCAGATAAATATTGG'))
+        self.assertEqual(len(list(records)), 17)
+
+    def test_get_seq_content_matches_records(self):
+        actual = get_seq_content(self.TEST_CONSENSUS_SEQ_FILE)
+        self.assertEqual(actual, dict(read_seq_records(self.TEST_CONSENSUS_SEQ_FILE)))
+
+    def test_get_seq_content_with_repeated_and_empty_records(self):
+        with open(self.TEST_OUTPUT, 'w') as out:
+            out.write('>seq1\nAC\nGT\n>empty\n>seq1\nTT\n')
+
+        self.assertEqual(get_seq_content(self.TEST_OUTPUT), {'seq1': 'ACGTTT', 'empty': ''})
+
+    def test_get_seq_content_with_missing_file(self):
+        self.assertEqual(get_seq_content('tests/test_data/input/missing.fasta'), {})
@@ -1,3 +1,4 @@
+import importlib.util
 import unittest
 import os
 from lib.file_utils import FileUtils
@@ -32,3 +33,14 @@ class TestFileUtils(unittest.TestCase):
         actual = "".join(f.readlines())
         os.remove(self.TEST_OUTPUT)
         self.assertEqual(actual, """Sample_id\tcps_type\tST\n25292_2#85\tIII\tST-1\n""")
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow is not installed')
+    def test_write_parquet_output(self):
+        final_df = pd.DataFrame.from_dict({
+            'Sample_id': {0: '25292_2#85'},
+            'cps_type': {0: 'III'},
+            'ST': {0: 'ST-1'}})
+        FileUtils.write_parquet_output(final_df, self.TEST_OUTPUT)
+        actual = pd.read_parquet(self.TEST_OUTPUT, columns=['ST'])
+        os.remove(self.TEST_OUTPUT)
+        self.assertEqual(actual.to_dict(), {'ST': {0: 'ST-1'}})
@@ -58,10 +58,10 @@ class TestProcessResults(unittest.TestCase):
             ['--mlst_results_file', 'mlst_file', '--min_read_depth', '30',
             '--output_prefix', 'out'])
         self.assertEqual(actual,
-                         argparse.Namespace(mlst='mlst_file', min_depth=30, output='out'))
+                         argparse.Namespace(mlst='mlst_file', min_depth=30, output='out', cache_dir=None, cache_max_size=1024, db_version=''))
 
     def test_arguments_short_options(self):
         actual = get_arguments().parse_args(
             ['-m', 'mlst_file', '-d', '30', '-o', 'out'])
         self.assertEqual(actual,
-                         argparse.Namespace(mlst='mlst_file', min_depth=30, output='out'))
+                         argparse.Namespace(mlst='mlst_file', min_depth=30, output='out', cache_dir=None, cache_max_size=1024, db_version=''))
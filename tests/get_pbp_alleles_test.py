@@ -1,13 +1,23 @@
 import argparse
+import io
+import os
+import tempfile
 import unittest
 from unittest.mock import patch, call, ANY
 
-from bin.get_pbp_alleles import BlastData, SeqData, get_identical_allele, get_imperfect_allele, write_content, get_arguments, main
+from lib.seq_data import BlastHit
+from bin.get_pbp_alleles import BlastData, SeqData, get_identical_allele, get_imperfect_allele, write_content, get_allele_ids, get_arguments, main
 
 class TestGetPBPAlleles(unittest.TestCase):
     TEST_BLAST_DATA = 'tests/test_data/input/test_blast_PBP_alleles.out'
     TEST_BLAST_IMPERFECT_DATA = 'tests/test_data/input/test_blast_imperfect_PBP_alleles.out'
+    TEST_BLAST_COMBINED_DATA = 'tests/test_data/input/test_blast_combined_PBP_alleles.out'
+    TEST_BLAST_CROSS_TYPE_DATA = 'tests/test_data/input/test_blast_cross_type_PBP_alleles.out'
     TEST_SEQ_DATA = 'tests/test_data/input/test_GBS1A-1.faa'
+    TEST_SEQ_DATA_2X = 'tests/test_data/input/test_GBS2X-1.faa'
+    TEST_ALLELE_DB = 'tests/test_data/input/test_GBS_bLactam_1A-DB.faa'
+    TEST_ALLELE_DB_1A = 'tests/test_data/input/test_GBS_bLactam_1A-DB_0.2.1.faa'
+    TEST_ALLELE_DB_2X = 'tests/test_data/input/test_GBS_bLactam_2X-DB.faa'
     TEST_OUTPUT_PREFIX = 'tests/test_data/output/GBS1A-1'
     TEST_OUTPUT_IDENTICAL_ALLELES = TEST_OUTPUT_PREFIX + '_existing_allele.txt'
     TEST_OUTPUT_NEW_ALLELES = TEST_OUTPUT_PREFIX + '_new_allele.faa'
@@ -18,8 +28,8 @@ class TestGetPBPAlleles(unittest.TestCase):
         Test output of blast
         """
         params_list = [
-            ('.26077_6_118.11:39458-40418(+)', 0, ['1||GBS_1A', '100.000', '320', '0', '0', '1', '320', '1', '320', '0.0', '652']),
-            ('.26077_6_118.11:39458-40418(+)', 1, ['138||GBS_1A', '99.688', '320', '1', '0', '1', '320', '1', '320', '0.0', '651'])
+            ('.26077_6_118.11:39458-40418(+)', 0, BlastHit('.26077_6_118.11:39458-40418(+)', '1||GBS_1A', 100.0, 320, 0, 0, 1, 320, 1, 320, 0.0, 652.0)),
+            ('.26077_6_118.11:39458-40418(+)', 1, BlastHit('.26077_6_118.11:39458-40418(+)', '138||GBS_1A', 99.688, 320, 1, 0, 1, 320, 1, 320, 0.0, 651.0))
         ]
         for params in params_list:
             blast_data_to_process = BlastData(self.TEST_BLAST_DATA)
@@ -34,7 +44,7 @@ class TestGetPBPAlleles(unittest.TestCase):
         blast_data_to_process = BlastData(self.TEST_BLAST_DATA)
         actual = blast_data_to_process.get_best_hit()['.26077_6_118.11:39458-40418(+)']
 
-        self.assertEqual(actual, ['1||GBS_1A', '100.000', '320', '0', '0', '1', '320', '1', '320', '0.0', '652'])
+        self.assertEqual(actual, BlastHit('.26077_6_118.11:39458-40418(+)', '1||GBS_1A', 100.0, 320, 0, 0, 1, 320, 1, 320, 0.0, 652.0))
 
 
     def test_read_seq_data(self):
@@ -128,25 +138,26 @@ class TestGetPBPAlleles(unittest.TestCase):
 
     def test_arguments(self):
         actual = get_arguments().parse_args(
-            ['--blast_out_file', 'blast_out_file', '--query_fasta', 'fasta_file',
+            ['--blast_out_file', 'blast_out_file', '--allele_fasta', 'allele_fasta', '--query_fasta', 'fasta_file',
             '--output_prefix', 'out_prefix'])
         self.assertEqual(actual, argparse.Namespace(blast_out='blast_out_file',
-        fasta_qu='fasta_file', output='out_prefix'))
+        allele_fasta=['allele_fasta'], fasta_qu=['fasta_file'], output=['out_prefix']))
 
 
     def test_arguments_short_options(self):
         actual = get_arguments().parse_args(
-            ['-b', 'blast_out_file', '-f', 'fasta_file', '-o', 'out_prefix'])
+            ['-b', 'blast_out_file', '-a', 'allele_fasta', '-f', 'fasta_file', '-o', 'out_prefix'])
         self.assertEqual(actual, argparse.Namespace(blast_out='blast_out_file',
-        fasta_qu='fasta_file', output='out_prefix'))
+        allele_fasta=['allele_fasta'], fasta_qu=['fasta_file'], output=['out_prefix']))
 
 
     @patch('bin.get_pbp_alleles.get_arguments')
     def test_main_with_identical_alleles(self, mock_get_arguments):
         args = mock_get_arguments.return_value.parse_args()
         args.blast_out = self.TEST_BLAST_DATA
-        args.fasta_qu = self.TEST_SEQ_DATA
-        args.output = self.TEST_OUTPUT_PREFIX + '_MAIN'
+        args.allele_fasta = [self.TEST_ALLELE_DB_1A]
+        args.fasta_qu = [self.TEST_SEQ_DATA]
+        args.output = [self.TEST_OUTPUT_PREFIX + '_MAIN']
 
         main()
 
@@ -159,11 +170,100 @@ class TestGetPBPAlleles(unittest.TestCase):
     def test_main_with_imperfect_alleles(self, mock_get_arguments):
         args = mock_get_arguments.return_value.parse_args()
         args.blast_out = self.TEST_BLAST_IMPERFECT_DATA
-        args.fasta_qu = self.TEST_SEQ_DATA
-        args.output = self.TEST_OUTPUT_PREFIX + '_MAIN'
+        args.allele_fasta = [self.TEST_ALLELE_DB_1A]
+        args.fasta_qu = [self.TEST_SEQ_DATA]
+        args.output = [self.TEST_OUTPUT_PREFIX + '_MAIN']
 
         main()
 
         fo = open(self.TEST_OUTPUT_PREFIX + '_MAIN_new_allele.faa', 'r')
 
         self.assertEqual(fo.readlines(), ['>.26077_6_118.11:39458-40418(+)\n', 'DIYNSDTYIAYPNNELQIASTIMDATNGKVIAQLGGRHQNENISFGTNQSVLTDRDWGSTMKPISAYAPAIDSGVYNSTGQSLNDSVYYWPGTSTQLYDWDRQYMGWMSMQTAIQQSRNVPAVRALEAAGLDEAKSFLEKLGIYYPEMNYSNAISSNNSSSDAKYGASSEKMAAAYSAFANGGTYYKPQYVNKIEFSDGTNDTYAASGSRAMKETTAYMMTDMLKTVLTFGTGTKAAIPGVAQAGKTGTSNYTEDELAKIEATTGIYNSAVGTMAPDENFVGYTSKYTMAIWTGYKNRLTPLYGSQLDIATEVYRAMMSY\n'])
+
+
+    @patch('bin.get_pbp_alleles.get_arguments')
+    def test_main_with_multiple_pbp_types(self, mock_get_arguments):
+        args = mock_get_arguments.return_value.parse_args()
+        args.blast_out = self.TEST_BLAST_COMBINED_DATA
+        args.allele_fasta = [self.TEST_ALLELE_DB_1A, self.TEST_ALLELE_DB_2X]
+        args.fasta_qu = [self.TEST_SEQ_DATA, self.TEST_SEQ_DATA_2X]
+        args.output = [self.TEST_OUTPUT_PREFIX + '_MAIN_COMBINED', 'tests/test_data/output/GBS2X-1_MAIN_COMBINED']
+
+        main()
+
+        fo = open(self.TEST_OUTPUT_PREFIX + '_MAIN_COMBINED_existing_allele.txt', 'r')
+        self.assertEqual(fo.readlines(), ['Contig\tPBP_allele\n', '.26077_6_118.11:39458-40418(+)\t1||GBS_1A\n'])
+        fo = open('tests/test_data/output/GBS2X-1_MAIN_COMBINED_existing_allele.txt', 'r')
+        self.assertEqual(fo.readlines(), ['Contig\tPBP_allele\n', '.26077_6_118.11:51259-52297(-)\t1||GBS_2X\n'])
+
+
+    @patch('bin.get_pbp_alleles.get_arguments')
+    def test_main_with_allele_fasta(self, mock_get_arguments):
+        args = mock_get_arguments.return_value.parse_args()
+        args.blast_out = None
+        args.allele_fasta = [self.TEST_ALLELE_DB]
+        args.fasta_qu = [self.TEST_SEQ_DATA]
+        args.output = [self.TEST_OUTPUT_PREFIX + '_MAIN_MATCHER']
+
+        main()
+
+        fo = open(self.TEST_OUTPUT_PREFIX + '_MAIN_MATCHER_existing_allele.txt', 'r')
+        self.assertEqual(fo.readlines(), ['Contig\tPBP_allele\n', '.26077_6_118.11:39458-40418(+)\t1||GBS_1A\n'])
+
+
+    def test_get_allele_ids(self):
+        self.assertEqual(get_allele_ids(self.TEST_ALLELE_DB_2X), {'1||GBS_2X', '2||GBS_2X'})
+
+
+    def test_get_best_blast_hit_of_subjects(self):
+        """
+        Test the best blast hit among the alleles of one PBP type
+        """
+        blast_data_to_process = BlastData(self.TEST_BLAST_CROSS_TYPE_DATA)
+
+        self.assertEqual(blast_data_to_process.get_best_hit()['.26077_6_118.11:39458-40418(+)'].sseqid, '1||GBS_2X')
+        self.assertEqual(blast_data_to_process.get_best_hit(get_allele_ids(self.TEST_ALLELE_DB_1A))['.26077_6_118.11:39458-40418(+)'].sseqid, '138||GBS_1A')
+
+
+    @patch('bin.get_pbp_alleles.get_arguments')
+    def test_main_with_best_hit_of_other_pbp_type(self, mock_get_arguments):
+        args = mock_get_arguments.return_value.parse_args()
+        args.blast_out = self.TEST_BLAST_CROSS_TYPE_DATA
+        args.allele_fasta = [self.TEST_ALLELE_DB_1A]
+        args.fasta_qu = [self.TEST_SEQ_DATA]
+        args.output = [self.TEST_OUTPUT_PREFIX + '_MAIN_CROSS_TYPE']
+
+        main()
+
+        # The identical 2X allele is not a 1A allele, so the 1A fragment is an imperfect match of a 1A allele
+        self.assertFalse(os.path.exists(self.TEST_OUTPUT_PREFIX + '_MAIN_CROSS_TYPE_existing_allele.txt'))
+        fo = open(self.TEST_OUTPUT_PREFIX + '_MAIN_CROSS_TYPE_new_allele.faa', 'r')
+        self.assertEqual(fo.readline(), '>.26077_6_118.11:39458-40418(+)\n')
+
+
+    @patch('bin.get_pbp_alleles.get_arguments')
+    def test_main_without_real_match_is_same_for_blast_and_matcher(self, mock_get_arguments):
+        args = mock_get_arguments.return_value.parse_args()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            query_fasta = os.path.join(tmp_dir, 'GBS1A-1.faa')
+            with open(query_fasta, 'w') as out:
+                out.write('>query\nRAKIKEYGNLD\n')
+            # blastp reports no hits of the query at its default e-value
+            blast_out = os.path.join(tmp_dir, 'blast_PBP.out')
+            open(blast_out, 'w').close()
+
+            outputs = {}
+            for engine, blast_out_file in [('blast', blast_out), ('python', None)]:
+                args.blast_out = blast_out_file
+                args.allele_fasta = [self.TEST_ALLELE_DB]
+                args.fasta_qu = [query_fasta]
+                args.output = [os.path.join(tmp_dir, engine, 'GBS1A-1')]
+                os.makedirs(os.path.join(tmp_dir, engine))
+
+                with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+                    main()
+
+                outputs[engine] = (sorted(os.listdir(os.path.join(tmp_dir, engine))), stdout.getvalue())
+
+        self.assertEqual(outputs['python'], outputs['blast'])
+        self.assertEqual(outputs['blast'], ([], 'Error: No hits found.\n'))
@@ -1,11 +1,16 @@
 import argparse
+import os
+import tempfile
 import unittest
 from unittest.mock import patch, call, ANY
 
+from lib.seq_data import BlastHit
+from lib.six_frame_translation import reverse_complement, extract_frame_aa
 from bin.get_pbp_genes_from_contigs import BlastData, SeqData, FragmentData, get_arguments, check_arguments, main
 
 class TestGetPBPGenesFromContigs(unittest.TestCase):
     TEST_BLAST_DATA = 'tests/test_data/input/test_blast_blactam.out'
+    TEST_UNORDERED_BLAST_DATA = 'tests/test_data/input/test_blast_unordered_blactam.out'
     TEST_SEQ_DATA = 'tests/test_data/input/test_GBS_bLactam_Ref.fasta'
     TEST_OUTPUT_PREFIX = 'tests/test_data/output/TEST_'
 
@@ -16,9 +21,9 @@ class TestGetPBPGenesFromContigs(unittest.TestCase):
         """
         blast_data_to_process = BlastData(self.TEST_BLAST_DATA)
         params_list = [
-            ('GBS1A-1', 0, ['.26077_6_118.11', '100.000', '960', '0', '0', '1', '960', '39459', '40418', '0.0', '1773']),
-            ('GBS2B-1', 1, ['.26077_6_118.2', '100.000', '16', '0', '0', '534', '549', '101982', '101967', '1.3', '30.7']),
-            ('GBS2X-1', 2, ['.26077_6_118.10', '100.000', '15', '0', '0', '611', '625', '8263', '8277', '4.5', '28.8'])
+            ('GBS1A-1', 0, BlastHit('GBS1A-1', '.26077_6_118.11', 100.0, 960, 0, 0, 1, 960, 39459, 40418, 0.0, 1773.0)),
+            ('GBS2B-1', 1, BlastHit('GBS2B-1', '.26077_6_118.2', 100.0, 16, 0, 0, 534, 549, 101982, 101967, 1.3, 30.7)),
+            ('GBS2X-1', 2, BlastHit('GBS2X-1', '.26077_6_118.10', 100.0, 15, 0, 0, 611, 625, 8263, 8277, 4.5, 28.8))
         ]
         for param in params_list:
             actual = blast_data_to_process.get_data()[param[0]][param[1]]
@@ -31,33 +36,29 @@ class TestGetPBPGenesFromContigs(unittest.TestCase):
         """
         blast_data_to_process = BlastData(self.TEST_BLAST_DATA)
         params_list = [
-            ('GBS1A-1', ['.26077_6_118.11', '100.000', '960', '0', '0', '1', '960', '39459', '40418', '0.0', '1773']),
-            ('GBS2B-1', ['.26077_6_118.2', '100.000', '1065', '0', '0', '1', '1065', '185772', '186836', '0.0',	'1967']),
-            ('GBS2X-1', ['.26077_6_118.11', '100.000', '1038', '0', '0', '1', '1038', '52297', '51260',	'0.0', '1917'])
+            ('GBS1A-1', BlastHit('GBS1A-1', '.26077_6_118.11', 100.0, 960, 0, 0, 1, 960, 39459, 40418, 0.0, 1773.0)),
+            ('GBS2B-1', BlastHit('GBS2B-1', '.26077_6_118.2', 100.0, 1065, 0, 0, 1, 1065, 185772, 186836, 0.0, 1967.0)),
+            ('GBS2X-1', BlastHit('GBS2X-1', '.26077_6_118.11', 100.0, 1038, 0, 0, 1, 1038, 52297, 51260, 0.0, 1917.0))
         ]
         for param in params_list:
             self.assertEqual(blast_data_to_process.get_best_hit()[param[0]], param[1])
 
 
-    def test_get_start_end_positions(self):
+    def test_get_best_blast_hit_from_unordered_hits(self):
         """
-        Test getting the start and end blactam positions in the contigs
+        Test the best blast hit is ranked by bitscore, then identity, then alignment length, keeping the earliest tied hit
         """
-        blast_data_to_process = BlastData(self.TEST_BLAST_DATA)
-        seq_data_to_analyse = SeqData(self.TEST_SEQ_DATA)
-        seq_lengths = seq_data_to_analyse.calculate_seq_length()
-        best_blast_hits = blast_data_to_process.get_best_hit()
-        fragment_data = FragmentData()
-        fragment_data.get_start_end_positions(best_blast_hits, seq_lengths, 0.5, 0.5)
+        blast_data_to_process = BlastData(self.TEST_UNORDERED_BLAST_DATA)
+        best_hits = blast_data_to_process.get_best_hit()
 
-        self.assertEqual(fragment_data.get_data(), {'GBS1A-1': ('.26077_6_118.11', '39458', '40418', 'forward', '1', '+'),
-                                                    'GBS2B-1': ('.26077_6_118.2', '185771', '186836', 'forward', '1', '+'),
-                                                    'GBS2X-1': ('.26077_6_118.11', '51259', '52297', 'reverse', '1', '-')})
+        self.assertEqual(best_hits['GBS1A-1'].sseqid, '.contig.1')
+        self.assertEqual(best_hits['GBS2B-1'].sseqid, '.contig.6')
+        self.assertEqual(best_hits['GBS2X-1'].sseqid, '.contig.7')
 
 
-    def test_write_start_end_positions(self):
+    def test_get_start_end_positions(self):
         """
-        Test output file contents containing start and end positions
+        Test getting the start and end blactam positions in the contigs
         """
         blast_data_to_process = BlastData(self.TEST_BLAST_DATA)
         seq_data_to_analyse = SeqData(self.TEST_SEQ_DATA)
@@ -66,17 +67,9 @@ class TestGetPBPGenesFromContigs(unittest.TestCase):
         fragment_data = FragmentData()
         fragment_data.get_start_end_positions(best_blast_hits, seq_lengths, 0.5, 0.5)
 
-        params_list = [
-            ('GBS1A-1', ['.26077_6_118.11\t39458\t40418\tforward\t1\t+\n']),
-            ('GBS2B-1', ['.26077_6_118.2\t185771\t186836\tforward\t1\t+\n']),
-            ('GBS2X-1', ['.26077_6_118.11\t51259\t52297\treverse\t1\t-\n'])
-        ]
-        for param in params_list:
-            fragment_data_location = 'tests/test_data/output/' + param[0] + '.bed'
-            fragment_data.write_start_end_positions('tests/test_data/output/')
-            fo = open(fragment_data_location, 'r')
-
-            self.assertEqual(fo.readlines(), param[1])
+        self.assertEqual(fragment_data.get_data(), {'GBS1A-1': ('.26077_6_118.11', '39458', '40418', 'forward', '1', '+'),
+                                                    'GBS2B-1': ('.26077_6_118.2', '185771', '186836', 'forward', '1', '+'),
+                                                    'GBS2X-1': ('.26077_6_118.11', '51259', '52297', 'reverse', '1', '-')})
 
 
     def test_read_seq_data(self):
@@ -109,17 +102,17 @@ class TestGetPBPGenesFromContigs(unittest.TestCase):
         actual = get_arguments().parse_args(
             ['--blast_out_file', 'blast_out_file', '--query_fasta', 'fasta_file',
             '--frac_align_len_threshold', '0.6', '--frac_identity_threshold', '0.6',
-            '--output_prefix', 'out_prefix'])
+            '--output_prefix', 'out_prefix', '--contigs', 'contigs_file'])
         self.assertEqual(actual, argparse.Namespace(blast_out='blast_out_file',
-        fasta_qu='fasta_file', frac_align=0.6, frac_ident=0.6, output='out_prefix'))
+        fasta_qu='fasta_file', frac_align=0.6, frac_ident=0.6, output='out_prefix', contigs='contigs_file'))
 
 
     def test_arguments_short_options(self):
         actual = get_arguments().parse_args(
             ['-b', 'blast_out_file', '-f', 'fasta_file',
-            '-fa', '0.5', '-fi', '0.5', '-o', 'out_prefix'])
+            '-fa', '0.5', '-fi', '0.5', '-o', 'out_prefix', '-c', 'contigs_file'])
         self.assertEqual(actual, argparse.Namespace(blast_out='blast_out_file',
-        fasta_qu='fasta_file', frac_align=0.5, frac_ident=0.5, output='out_prefix'))
+        fasta_qu='fasta_file', frac_align=0.5, frac_ident=0.5, output='out_prefix', contigs='contigs_file'))
 
 
     def test_check_arguments_frac_align(self):
@@ -129,7 +122,7 @@ class TestGetPBPGenesFromContigs(unittest.TestCase):
         ]
         for param in params_list:
             args = argparse.Namespace(blast_out='blast_out_file',
-            fasta_qu='fasta_file', frac_align=param[0], frac_ident=param[1], output='bed_file')
+            fasta_qu='fasta_file', frac_align=param[0], frac_ident=param[1], output='out_prefix')
 
             with self.assertRaises(Exception) as exp:
                 check_arguments(args)
@@ -143,24 +136,78 @@ class TestGetPBPGenesFromContigs(unittest.TestCase):
         ]
         for param in params_list:
             args = argparse.Namespace(blast_out='blast_out_file',
-            fasta_qu='fasta_file', frac_align=param[0], frac_ident=param[1], output='bed_file')
+            fasta_qu='fasta_file', frac_align=param[0], frac_ident=param[1], output='out_prefix')
 
             with self.assertRaises(Exception) as exp:
                 check_arguments(args)
             self.assertEqual(str(exp.exception), "Invalid frac_identity_threshold value. Value must be between 0 and 1.")
 
 
+    def write_test_contigs(self, contigs_file):
+        """
+        Write contigs containing the reference PBP genes at the positions of the test BLAST hits
+        """
+        refs = SeqData(self.TEST_SEQ_DATA).get_data()
+        contig_11 = ['A'] * 52297
+        contig_11[39458:40418] = refs['GBS1A-1']
+        contig_11[51259:52297] = reverse_complement(refs['GBS2X-1'])
+        contig_2 = ['C'] * 186836
+        contig_2[185771:186836] = refs['GBS2B-1']
+        with open(contigs_file, 'w') as out:
+            for name, seq in [('.26077_6_118.11', ''.join(contig_11)), ('.26077_6_118.2', ''.join(contig_2))]:
+                out.write('>' + name + '\n')
+                for i in range(0, len(seq), 60):
+                    out.write(seq[i:i+60] + '\n')
+        return refs
+
+
+    def test_get_fragment_sequences(self):
+        """
+        Test extracting the strand-aware fragment sequences from the contigs
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            contigs_file = os.path.join(tmp_dir, 'contigs.fa')
+            refs = self.write_test_contigs(contigs_file)
+            fragment_data = FragmentData()
+            fragment_data.get_start_end_positions(BlastData(self.TEST_BLAST_DATA).get_best_hit(), SeqData(self.TEST_SEQ_DATA).calculate_seq_length(), 0.5, 0.5)
+
+            actual = fragment_data.get_fragment_sequences(contigs_file)
+
+        self.assertEqual(actual, {'GBS1A-1': ('.26077_6_118.11:39458-40418(+)', refs['GBS1A-1']),
+                                  'GBS2B-1': ('.26077_6_118.2:185771-186836(+)', refs['GBS2B-1']),
+                                  'GBS2X-1': ('.26077_6_118.11:51259-52297(-)', refs['GBS2X-1'])})
+
+
+    def test_get_fragment_sequences_beyond_contig(self):
+        """
+        Test fragments outside of the contigs are skipped
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            contigs_file = os.path.join(tmp_dir, 'contigs.fa')
+            with open(contigs_file, 'w') as out:
+                out.write('>contig\nACGTACGT\n')
+            fragment_data = FragmentData()
+            fragment_data.calculate_start_end_positions('GBS1A-1', BlastHit('GBS1A-1', 'contig', 100.0, 6, 0, 0, 1, 6, 3, 8, 0.0, 10.0), 10)
+            fragment_data.calculate_start_end_positions('GBS2B-1', BlastHit('GBS2B-1', 'other_contig', 100.0, 6, 0, 0, 1, 6, 1, 6, 0.0, 10.0), 6)
+
+            self.assertEqual(fragment_data.get_fragment_sequences(contigs_file), {})
+
+
     @patch('bin.get_pbp_genes_from_contigs.get_arguments')
-    def test_main(self, mock_get_arguments):
-        args = mock_get_arguments.return_value.parse_args()
-        args.blast_out = self.TEST_BLAST_DATA
-        args.fasta_qu = self.TEST_SEQ_DATA
-        args.frac_align = 0.5
-        args.frac_ident = 0.5
-        args.output = self.TEST_OUTPUT_PREFIX
-
-        main()
-
-        fo = open('tests/test_data/output/TEST_GBS1A-1.bed', 'r')
-        
-        self.assertEqual(fo.readlines(), ['.26077_6_118.11\t39458\t40418\tforward\t1\t+\n'])
+    def test_main_with_contigs(self, mock_get_arguments):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            contigs_file = os.path.join(tmp_dir, 'contigs.fa')
+            refs = self.write_test_contigs(contigs_file)
+            args = mock_get_arguments.return_value.parse_args()
+            args.blast_out = self.TEST_BLAST_DATA
+            args.fasta_qu = self.TEST_SEQ_DATA
+            args.frac_align = 0.5
+            args.frac_ident = 0.5
+            args.output = self.TEST_OUTPUT_PREFIX
+            args.contigs = contigs_file
+
+            main()
+
+        fo = open('tests/test_data/output/TEST_GBS2X-1.faa', 'r')
+
+        self.assertEqual(fo.readlines(), ['>.26077_6_118.11:51259-52297(-)\n', extract_frame_aa(refs['GBS2X-1'], 1) + '\n'])
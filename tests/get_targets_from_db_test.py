@@ -3,7 +3,9 @@ import io
 import unittest
 from unittest.mock import patch, call
 
-from bin.get_targets_from_db import get_targets, write_line, write_fasta_file, write_target_fasta_files, get_arguments
+from lib.fasta_index import build_fasta_index
+
+from bin.get_targets_from_db import get_targets, write_line, write_fasta_file, write_target_fasta_files, get_arguments, main
 
 class TestProcessResults(unittest.TestCase):
 
@@ -43,32 +45,71 @@ class TestProcessResults(unittest.TestCase):
         actual = "".join(f.readlines())
         self.assertEqual(actual, """>7__PARCGBS__PARCGBS-1__7\nCATCCTCATGGGGATTCCTCTATTTATGACGCGATGGTTCGTATGTCTCAA\n""")
 
-    @patch('bin.get_targets_from_db.write_fasta_file')
-    def test_write_target_fasta_files(self, mock_write_fasta_file):
+    def test_write_target_fasta_files(self):
         targets = ['7__PARCGBS__PARCGBS-1__7',
             '5__GYRAGBS__GYRAGBS-1__5',
-            '11__23S1__23S1-1__11',
-            '12__23S3__23S3-3__12',
-            '16__RPOBgbs__RPOBgbs-1__16',
-            '17__RPOBgbs__RPOBgbs-2__17',
-            '18__RPOBgbs__RPOBgbs-3__18',
-            '19__RPOBgbs__RPOBgbs-4__19']
-
-        write_target_fasta_files(targets, self.TEST_FASTA, 'tests/test_data/output/CHECK_')
-        
-        mock_write_fasta_file.assert_has_calls([
-            call(self.TEST_FASTA, '7__PARCGBS__PARCGBS-1__7', 'tests/test_data/output/CHECK_'),
-            call(self.TEST_FASTA, '5__GYRAGBS__GYRAGBS-1__5', 'tests/test_data/output/CHECK_'),
-            call(self.TEST_FASTA, '11__23S1__23S1-1__11', 'tests/test_data/output/CHECK_'),
-            call(self.TEST_FASTA, '12__23S3__23S3-3__12', 'tests/test_data/output/CHECK_'),
-            call(self.TEST_FASTA, '16__RPOBgbs__RPOBgbs-1__16', 'tests/test_data/output/CHECK_'),
-            call(self.TEST_FASTA, '17__RPOBgbs__RPOBgbs-2__17', 'tests/test_data/output/CHECK_'),
-            call(self.TEST_FASTA, '18__RPOBgbs__RPOBgbs-3__18', 'tests/test_data/output/CHECK_'),
-            call(self.TEST_FASTA, '19__RPOBgbs__RPOBgbs-4__19', 'tests/test_data/output/CHECK_')
-            ], any_order = False)
+            '12__23S3__23S3-3__12']
+
+        write_target_fasta_files(targets, self.TEST_FASTA, 'tests/test_data/output/CHECK_MULTI_')
+
+        f = open('tests/test_data/output/CHECK_MULTI_7__PARCGBS__PARCGBS-1__7_ref.fna', "r")
+        actual = "".join(f.readlines())
+        self.assertEqual(actual, """>7__PARCGBS__PARCGBS-1__7\nCATCCTCATGGGGATTCCTCTATTTATGACGCGATGGTTCGTATGTCTCAA\n""")
+
+        f = open('tests/test_data/output/CHECK_MULTI_5__GYRAGBS__GYRAGBS-1__5_ref.fna', "r")
+        actual = "".join(f.readlines())
+        self.assertEqual(actual, """>5__GYRAGBS__GYRAGBS-1__5\nGTTATGGGTAAATACCATCCACATGGTGATTCATCTATTTACGAAGCAATGGTGCGTATG\nGCACAATGGTGG\n""")
+
+        for target in targets:
+            write_fasta_file(self.TEST_FASTA, target, 'tests/test_data/output/CHECK_SINGLE_')
+            f = open('tests/test_data/output/CHECK_MULTI_' + target + '_ref.fna', "r")
+            g = open('tests/test_data/output/CHECK_SINGLE_' + target + '_ref.fna', "r")
+            self.assertEqual(f.readlines(), g.readlines())
+
+    @patch('bin.get_targets_from_db.write_fasta_file')
+    def test_write_target_fasta_files_reads_fasta_once(self, mock_write_fasta_file):
+        write_target_fasta_files(['7__PARCGBS__PARCGBS-1__7', 'NOT_IN_DB'], self.TEST_FASTA, 'tests/test_data/output/CHECK_MULTI_')
+
+        mock_write_fasta_file.assert_not_called()
+        f = open('tests/test_data/output/CHECK_MULTI_NOT_IN_DB_ref.fna', "r")
+        self.assertEqual(f.readlines(), [])
+
+    @patch('bin.get_targets_from_db.get_arguments')
+    @patch('bin.get_targets_from_db.get_fasta_index')
+    @patch('bin.get_targets_from_db.write_target_records')
+    @patch('bin.get_targets_from_db.write_target_fasta_files')
+    def test_main_uses_fasta_index(self, mock_write_target_fasta_files, mock_write_target_records, mock_get_fasta_index, mock_get_arguments):
+        args = mock_get_arguments.return_value.parse_args()
+        args.fasta = self.TEST_FASTA
+        args.target = self.TEST_TARGETS
+        args.fasta_index = None
+        args.output = 'tests/test_data/output/CHECK_'
+        fasta_index = build_fasta_index(self.TEST_FASTA)
+        mock_get_fasta_index.return_value = fasta_index
+
+        main()
+
+        mock_get_fasta_index.assert_called_once_with(self.TEST_FASTA, None)
+        mock_write_target_records.assert_called_once_with(get_targets(self.TEST_TARGETS), self.TEST_FASTA, fasta_index, 'tests/test_data/output/CHECK_')
+        mock_write_target_fasta_files.assert_not_called()
+
+    @patch('bin.get_targets_from_db.get_arguments')
+    @patch('bin.get_targets_from_db.get_fasta_index')
+    @patch('bin.get_targets_from_db.write_target_fasta_files')
+    def test_main_without_fasta_index(self, mock_write_target_fasta_files, mock_get_fasta_index, mock_get_arguments):
+        args = mock_get_arguments.return_value.parse_args()
+        args.fasta = self.TEST_FASTA
+        args.target = self.TEST_TARGETS
+        args.fasta_index = None
+        args.output = 'tests/test_data/output/CHECK_'
+        mock_get_fasta_index.return_value = None
+
+        main()
+
+        mock_write_target_fasta_files.assert_called_once_with(get_targets(self.TEST_TARGETS), self.TEST_FASTA, 'tests/test_data/output/CHECK_')
 
     def test_arguments(self):
         actual = get_arguments().parse_args(
             ['--fasta_file', 'fasta_file', '--target_file', 'target_file', '--output_prefix', 'output'])
         self.assertEqual(actual,
-                         argparse.Namespace(fasta='fasta_file', target='target_file', output='output'))
+                         argparse.Namespace(fasta='fasta_file', target='target_file', output='output', fasta_index=None))
@@ -1,8 +1,10 @@
 import argparse
 import unittest
+import importlib.util
 from unittest.mock import patch, call
 
-from bin.get_targets_from_samfile import get_targets, in_line, write_sam_file, write_target_sam_files, get_arguments
+from bin.get_targets_from_samfile import get_targets, in_line, write_sam_file, write_target_sam_files, get_header_sequence_name, \
+    write_target_bam_files, main, get_arguments
 
 
 
@@ -55,33 +57,113 @@ class TestProcessResults(unittest.TestCase):
         self.assertEqual(actual, """@HD\tVN:1.0\tSO:unsorted\n@SQ\tSN:12__23S3__23S3-3__12\tLN:60\n@PG\tID:bowtie2\nHX4_26077:6:2110:21704:24005\t153\t12__23S3__23S3-3__12\t1\n""")
 
 
+    def test_get_header_sequence_name(self):
+        self.assertEqual(get_header_sequence_name('@SQ\tSN:12__23S3__23S3-3__12\tLN:60\n'), '12__23S3__23S3-3__12')
+        self.assertEqual(get_header_sequence_name('@SQ\tLN:60\tSN:12__23S3__23S3-3__12\n'), '12__23S3__23S3-3__12')
+        self.assertIsNone(get_header_sequence_name('@SQ\tLN:60\n'))
+
+    def test_write_target_sam_files(self):
+        targets = ['12__23S3__23S3-3__12', '19__RPOBgbs__RPOBgbs-4__19']
+
+        write_target_sam_files(targets, self.TEST_SAM, '26189_8#5', 'tests/test_data/output/CHECK_MULTI_')
+
+        f = open('tests/test_data/output/CHECK_MULTI_12__23S3__23S3-3__12_26189_8#5_seq.sam', "r")
+        actual = "".join(f.readlines())
+        self.assertEqual(actual, """@HD\tVN:1.0\tSO:unsorted\n@SQ\tSN:12__23S3__23S3-3__12\tLN:60\n@PG\tID:bowtie2\nHX4_26077:6:2110:21704:24005\t153\t12__23S3__23S3-3__12\t1\n""")
+
+        f = open('tests/test_data/output/CHECK_MULTI_19__RPOBgbs__RPOBgbs-4__19_26189_8#5_seq.sam', "r")
+        actual = "".join(f.readlines())
+        self.assertEqual(actual, """@HD\tVN:1.0\tSO:unsorted\n@PG\tID:bowtie2\n""")
+
+    @patch('bin.get_targets_from_samfile.in_line')
     @patch('bin.get_targets_from_samfile.write_sam_file')
-    def test_write_target_sam_files(self, mock_write_sam_file):
-        targets = ['7__PARCGBS__PARCGBS-1__7',
-            '5__GYRAGBS__GYRAGBS-1__5',
-            '11__23S1__23S1-1__11',
-            '12__23S3__23S3-3__12',
-            '16__RPOBgbs__RPOBgbs-1__16',
-            '17__RPOBgbs__RPOBgbs-2__17',
-            '18__RPOBgbs__RPOBgbs-3__18',
-            '19__RPOBgbs__RPOBgbs-4__19']
-
-        write_target_sam_files(targets, self.TEST_SAM, '26189_8#5', 'tests/test_data/output/CHECK_')
-        
-        mock_write_sam_file.assert_has_calls([
-            call(self.TEST_SAM, '7__PARCGBS__PARCGBS-1__7', '26189_8#5', 'tests/test_data/output/CHECK_'),
-            call(self.TEST_SAM, '5__GYRAGBS__GYRAGBS-1__5', '26189_8#5', 'tests/test_data/output/CHECK_'),
-            call(self.TEST_SAM, '11__23S1__23S1-1__11', '26189_8#5', 'tests/test_data/output/CHECK_'),
-            call(self.TEST_SAM, '12__23S3__23S3-3__12', '26189_8#5', 'tests/test_data/output/CHECK_'),
-            call(self.TEST_SAM, '16__RPOBgbs__RPOBgbs-1__16', '26189_8#5', 'tests/test_data/output/CHECK_'),
-            call(self.TEST_SAM, '17__RPOBgbs__RPOBgbs-2__17', '26189_8#5', 'tests/test_data/output/CHECK_'),
-            call(self.TEST_SAM, '18__RPOBgbs__RPOBgbs-3__18', '26189_8#5', 'tests/test_data/output/CHECK_'),
-            call(self.TEST_SAM, '19__RPOBgbs__RPOBgbs-4__19', '26189_8#5', 'tests/test_data/output/CHECK_')
-            ], any_order = False)
+    def test_write_target_sam_files_reads_sam_once(self, mock_write_sam_file, mock_in_line):
+        write_target_sam_files(['12__23S3__23S3-3__12'], self.TEST_SAM, '26189_8#5', 'tests/test_data/output/CHECK_MULTI_')
+
+        mock_write_sam_file.assert_not_called()
+        mock_in_line.assert_not_called()
 
     def test_arguments(self):
         actual = get_arguments().parse_args(
             ['--sam_file', 'sam_file', '--target_file', 'target_file',
             '--id', 'id', '--output_prefix', 'output'])
         self.assertEqual(actual,
-                         argparse.Namespace(sam='sam_file', target='target_file', id='id', output='output'))
+                         argparse.Namespace(sam='sam_file', bam=None, target='target_file', id='id', output='output'))
+
+    def test_arguments_bam_file(self):
+        actual = get_arguments().parse_args(
+            ['--bam_file', 'bam_file', '--target_file', 'target_file',
+            '--id', 'id', '--output_prefix', 'output'])
+        self.assertEqual(actual,
+                         argparse.Namespace(sam=None, bam='bam_file', target='target_file', id='id', output='output'))
+
+    def test_arguments_sam_and_bam_file(self):
+        with self.assertRaises(SystemExit):
+            get_arguments().parse_args(
+                ['--sam_file', 'sam_file', '--bam_file', 'bam_file', '--target_file', 'target_file',
+                '--id', 'id', '--output_prefix', 'output'])
+
+    @patch('bin.get_targets_from_samfile.get_arguments')
+    @patch('bin.get_targets_from_samfile.write_target_sam_files')
+    @patch('bin.get_targets_from_samfile.write_target_bam_files')
+    def test_main_with_bam_file(self, mock_write_target_bam_files, mock_write_target_sam_files, mock_get_arguments):
+        args = mock_get_arguments.return_value.parse_args()
+        args.sam = None
+        args.bam = 'bam_file'
+        args.target = self.TEST_TARGETS
+        args.id = 'id'
+        args.output = 'output'
+
+        main()
+
+        mock_write_target_bam_files.assert_called_once_with(get_targets(self.TEST_TARGETS), 'bam_file', 'id', 'output')
+        mock_write_target_sam_files.assert_not_called()
+
+
+@unittest.skipUnless(importlib.util.find_spec('pysam'), 'pysam is not installed')
+class TestWriteTargetBamFiles(unittest.TestCase):
+
+    TEST_BAM = 'tests/test_data/output/get_targets_test.bam'
+    TEST_OUTPUT_PREFIX = 'tests/test_data/output/CHECK_BAM_'
+
+    @classmethod
+    def setUpClass(cls):
+        import pysam
+
+        header = {
+            'HD': {'VN': '1.0', 'SO': 'coordinate'},
+            'SQ': [{'SN': '12__23S3__23S3-3__12', 'LN': 60}, {'SN': '19__RPOBgbs__RPOBgbs-4__19', 'LN': 33}],
+            'PG': [{'ID': 'bowtie2', 'PN': 'bowtie2'}]
+        }
+        with pysam.AlignmentFile(cls.TEST_BAM, 'wb', header=header) as bam:
+            for name, tid, pos, next_tid in [('read1', 0, 0, 1), ('read2', 0, 5, 0), ('read3', 1, 2, 1)]:
+                read = pysam.AlignedSegment(bam.header)
+                read.query_name = name
+                read.flag = 1
+                read.reference_id = tid
+                read.reference_start = pos
+                read.mapping_quality = 255
+                read.cigarstring = '10M'
+                read.next_reference_id = next_tid
+                read.next_reference_start = 0
+                read.query_sequence = 'ACGTACGTAC'
+                read.query_qualities = pysam.qualitystring_to_array('JJJJJJJJJJ')
+                bam.write(read)
+
+    def test_write_target_bam_files(self):
+        import pysam
+
+        write_target_bam_files(['12__23S3__23S3-3__12', '7__PARCGBS__PARCGBS-1__7'], self.TEST_BAM, 'ID', self.TEST_OUTPUT_PREFIX)
+
+        with pysam.AlignmentFile(self.TEST_OUTPUT_PREFIX + '12__23S3__23S3-3__12_ID_seq.bam', 'rb',
+                                 index_filename=self.TEST_OUTPUT_PREFIX + '12__23S3__23S3-3__12_ID_seq.bai') as bam:
+            self.assertEqual(bam.references, ('12__23S3__23S3-3__12',))
+            self.assertEqual(bam.header.to_dict()['PG'][0]['ID'], 'bowtie2')
+            reads = list(bam.fetch('12__23S3__23S3-3__12'))
+            self.assertEqual([read.query_name for read in reads], ['read1', 'read2'])
+            self.assertEqual([read.next_reference_id for read in reads], [-1, 0])
+
+        with pysam.AlignmentFile(self.TEST_OUTPUT_PREFIX + '7__PARCGBS__PARCGBS-1__7_ID_seq.bam', 'rb',
+                                 index_filename=self.TEST_OUTPUT_PREFIX + '7__PARCGBS__PARCGBS-1__7_ID_seq.bai', check_sq=False) as bam:
+            self.assertEqual(bam.references, ())
+            self.assertEqual(list(bam.fetch(until_eof=True)), [])
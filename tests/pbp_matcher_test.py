@@ -0,0 +1,55 @@
+import unittest
+
+from lib.file_io import get_seq_content
+from lib.pbp_matcher import PbpAlleleMatcher
+from lib.seq_data import BlastHit
+
+
+class TestPbpAlleleMatcher(unittest.TestCase):
+    TEST_ALLELE_DB = 'tests/test_data/input/test_GBS_bLactam_1A-DB.faa'
+    TEST_SEQ_DATA = 'tests/test_data/input/test_GBS1A-1.faa'
+    TEST_QUERY = '.26077_6_118.11:39458-40418(+)'
+
+    def setUp(self):
+        self.matcher = PbpAlleleMatcher.from_fasta_files([self.TEST_ALLELE_DB])
+        self.query_seq = get_seq_content(self.TEST_SEQ_DATA)[self.TEST_QUERY]
+
+    def test_get_exact_match(self):
+        self.assertEqual(self.matcher.get_exact_match(self.query_seq), '1||GBS_1A')
+        self.assertEqual(self.matcher.get_exact_match(self.query_seq.lower()), '1||GBS_1A')
+        self.assertIsNone(self.matcher.get_exact_match(self.query_seq[1:]))
+
+    def test_get_best_hit_of_identical_allele(self):
+        hit = self.matcher.get_best_hit(self.TEST_QUERY, self.query_seq)
+
+        self.assertEqual(hit[:10], BlastHit(self.TEST_QUERY, '1||GBS_1A', 100.0, 320, 0, 0, 1, 320, 1, 320, 0.0, 0.0)[:10])
+
+    def test_get_best_hit_of_imperfect_allele(self):
+        # Two substitutions and a three amino acid deletion
+        seq = list(self.query_seq)
+        seq[10] = 'W'
+        seq[200] = 'W'
+        del seq[100:103]
+        hit = self.matcher.get_best_hit('query', ''.join(seq))
+
+        self.assertEqual(hit.sseqid, '1||GBS_1A')
+        self.assertEqual((hit.pident, hit.length, hit.mismatch, hit.gapopen), (98.438, 320, 2, 1))
+        self.assertEqual((hit.qstart, hit.qend, hit.sstart, hit.send), (1, 317, 1, 320))
+
+    def test_get_best_hit_of_fragment(self):
+        hit = self.matcher.get_best_hit('query', self.query_seq[20:200])
+
+        self.assertEqual((hit.sseqid, hit.pident, hit.length, hit.sstart, hit.send), ('1||GBS_1A', 100.0, 180, 21, 200))
+
+    def test_get_best_hits_without_match(self):
+        self.assertEqual(self.matcher.get_best_hits({'query': 'WWWWWWWWWW'}), {})
+
+    def test_get_best_hit_above_max_evalue(self):
+        # Aligns over three amino acids at 66.667% identity, with an e-value blastp would not report
+        self.assertIsNone(self.matcher.get_best_hit('query', 'RAKIKEYGNLD'))
+
+    def test_get_candidates(self):
+        candidates = self.matcher.get_candidates(self.query_seq)
+
+        self.assertEqual(candidates[0], '1||GBS_1A')
+        self.assertEqual(len(PbpAlleleMatcher.from_fasta_files([self.TEST_ALLELE_DB], max_candidates=2).get_candidates(self.query_seq)), 2)
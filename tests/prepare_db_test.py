@@ -0,0 +1,40 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from bin.prepare_db import prepare_db, get_fasta_files, get_arguments
+from lib.fasta_index import get_fasta_index
+
+
+class TestPrepareDb(unittest.TestCase):
+
+    TEST_FASTA = 'tests/test_data/input/GBS_Res_Gene-DB_Final_0.0.1.fasta'
+    TEST_TARGETS = 'tests/test_data/input/seqs_of_interest.txt'
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_dir = os.path.join(self.tmp_dir.name, '0.0.1')
+        os.makedirs(os.path.join(self.db_dir, 'GBS_resTyper_Gene-DB'))
+        shutil.copyfile(self.TEST_FASTA, os.path.join(self.db_dir, 'GBS_resTyper_Gene-DB', 'GBS_Res_Gene-DB_Final.fasta'))
+        shutil.copyfile(self.TEST_TARGETS, os.path.join(self.db_dir, 'GBS_resTyper_Gene-DB', 'seqs_of_interest.txt'))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_prepare_db(self):
+        bundle = prepare_db(self.db_dir)
+
+        with open(os.path.join(self.db_dir, 'bundle.json'), 'r') as f:
+            self.assertEqual(json.load(f), bundle)
+        self.assertEqual(bundle['version'], '0.0.1')
+        self.assertEqual(list(bundle['fasta']), ['GBS_resTyper_Gene-DB/GBS_Res_Gene-DB_Final.fasta'])
+        self.assertEqual(bundle['fasta_index'], ['GBS_resTyper_Gene-DB/GBS_Res_Gene-DB_Final.fasta.fai'])
+        self.assertIsNotNone(get_fasta_index(os.path.join(self.db_dir, 'GBS_resTyper_Gene-DB', 'GBS_Res_Gene-DB_Final.fasta')))
+        self.assertEqual(get_fasta_files(self.db_dir), [os.path.join(self.db_dir, 'GBS_resTyper_Gene-DB', 'GBS_Res_Gene-DB_Final.fasta')])
+
+    def test_arguments(self):
+        actual = get_arguments().parse_args(['--db_dir', 'db/0.2.1'])
+        self.assertEqual(actual, argparse.Namespace(db_dir='db/0.2.1'))
@@ -1,4 +1,8 @@
 import argparse
+import os
+import subprocess
+import sys
+import tempfile
 import unittest
 from unittest.mock import patch, call, ANY
 from collections import defaultdict
@@ -8,7 +12,7 @@ from bin.process_res_typer_results import get_arguments, codon2aa, derive_presen
     update_presence_absence_target_for_arg_res, drugRes_Col, get_seq_diffs, update_GBS_Res_var, update_drug_res_col_dict, \
     get_gene_names_from_consensus, get_variants, run, main, get_seq_content, \
     geneToRef, GBS_Res_var, Res_Targets, geneToClass, extract_frame_aa, EOL_SEP, GBS_Res_Targets, clear_arg_res, snpOffset, \
-    geneAlleleDict
+    find_target_gene, read_manifest, ResTyperState
 
 MIN_DEPTH = 30
 
@@ -280,17 +284,17 @@ class TestProcessResTyperResults(unittest.TestCase):
         misc_list = ["PARC", "GYRA", "23S1", "23S3", "RPOBGBS-1"]
         for allele in misc_list:
             gbs_res_target_dict = {allele: "neg"}
-            update_presence_absence_target("GENE1", "***"+allele+"***", depth, gbs_res_target_dict)
+            update_presence_absence_target("GENE1", "***"+allele+"***", MIN_DEPTH, depth, gbs_res_target_dict)
             self.assertEqual({allele: "pos"}, gbs_res_target_dict)
 
         # ============== Test RPOBgbs-N ==================
         gbs_res_target_dict = {"RPOBGBS-2": "neg"}
-        update_presence_absence_target("GENE1", "***RPOBGBS-2***", depth, gbs_res_target_dict)
+        update_presence_absence_target("GENE1", "***RPOBGBS-2***", MIN_DEPTH, depth, gbs_res_target_dict)
         self.assertEqual({"RPOBGBS-2": "pos"}, gbs_res_target_dict)
 
         # ============== Test depth ==================
         gbs_res_target_dict = {}
-        update_presence_absence_target("GENE1", "***RPOBGBS-1***", MIN_DEPTH-1, gbs_res_target_dict)
+        update_presence_absence_target("GENE1", "***RPOBGBS-1***", MIN_DEPTH, MIN_DEPTH-1, gbs_res_target_dict)
         self.assertEqual({}, gbs_res_target_dict)
 
         # TODO there is a suspected bug in this perl code - see Python module
@@ -303,278 +307,278 @@ class TestProcessResTyperResults(unittest.TestCase):
         res_target_dict = {"ERMB": "neg"}
         gene_allele_dict = defaultdict(lambda: [])
 
-        update_presence_absence_target_for_arg_res("GENE1", "***ERMB***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***ERMB***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "GENE1[***ERMB***]"}, drug_res_col_dict)
         self.assertEqual({"ERMB": "pos"}, res_target_dict)
         self.assertEqual(gene_allele_dict["***ERMB***"], "ERMB")
 
-        update_presence_absence_target_for_arg_res("GENE2", "***ERMB***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE2", "***ERMB***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "GENE1[***ERMB***]:GENE2[***ERMB***]"}, drug_res_col_dict)
         self.assertEqual({"ERMB": "pos"}, res_target_dict)
 
         # Check low depth
         drug_res_col_dict = {"EC": "neg"}
         res_target_dict = {"ERMB": "neg"}
-        update_presence_absence_target_for_arg_res("GENE2", "***ERMB***", MIN_DEPTH-1, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE2", "***ERMB***", MIN_DEPTH, MIN_DEPTH-1, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "neg"}, drug_res_col_dict)
         self.assertEqual({"ERMB": "neg"}, res_target_dict)
 
         # ============== Test TETM ==================
         drug_res_col_dict = {"TET": "neg"}
         res_target_dict = {"TETM": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***TETM***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***TETM***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"TET": "GENE1[***TETM***]"}, drug_res_col_dict)
         self.assertEqual({"TETM": "pos"}, res_target_dict)
-        update_presence_absence_target_for_arg_res("GENE2", "***TETM***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE2", "***TETM***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"TET": "GENE1[***TETM***]:GENE2[***TETM***]"}, drug_res_col_dict)
         self.assertEqual({"TETM": "pos"}, res_target_dict)
 
         # ============== Test CAT ==================
         drug_res_col_dict = {"OTHER": "neg"}
         res_target_dict = {"CATQ": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***CATQ***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***CATQ***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"OTHER": "GENE1[***CATQ***]"}, drug_res_col_dict)
         self.assertEqual({"CATQ": "pos"}, res_target_dict)
-        update_presence_absence_target_for_arg_res("GENE2", "***CATQ***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE2", "***CATQ***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"OTHER": "GENE1[***CATQ***]:GENE2[***CATQ***]"}, drug_res_col_dict)
         self.assertEqual({"CATQ": "pos"}, res_target_dict)
 
         # ============== Test LNUB ==================
         drug_res_col_dict = {"EC": "neg"}
         res_target_dict = {"LNUB": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***LNUB***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***LNUB***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "GENE1[***LNUB***]"}, drug_res_col_dict)
         self.assertEqual({"LNUB": "pos"}, res_target_dict)
-        update_presence_absence_target_for_arg_res("GENE2", "***LNUB***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE2", "***LNUB***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "GENE1[***LNUB***]:GENE2[***LNUB***]"}, drug_res_col_dict)
         self.assertEqual({"LNUB": "pos"}, res_target_dict)
 
         # ============== Test LSAC ==================
         drug_res_col_dict = {"EC": "neg"}
         res_target_dict = {"LSAC": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***LSAC***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***LSAC***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "GENE1[***LSAC***]"}, drug_res_col_dict)
         self.assertEqual({"LSAC": "pos"}, res_target_dict)
-        update_presence_absence_target_for_arg_res("GENE2", "***LSAC***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE2", "***LSAC***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "GENE1[***LSAC***]:GENE2[***LSAC***]"}, drug_res_col_dict)
         self.assertEqual({"LSAC": "pos"}, res_target_dict)
 
         # ============== Test MEFA ==================
         drug_res_col_dict = {"EC": "neg"}
         res_target_dict = {"MEFA": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***MEFA***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***MEFA***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "GENE1[***MEFA***]"}, drug_res_col_dict)
         self.assertEqual({"MEFA": "pos"}, res_target_dict)
-        update_presence_absence_target_for_arg_res("GENE2", "***MEFA***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE2", "***MEFA***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "GENE1[***MEFA***]:GENE2[***MEFA***]"}, drug_res_col_dict)
         self.assertEqual({"MEFA": "pos"}, res_target_dict)
 
         # ============== Test FOSA ==================
         drug_res_col_dict = {"OTHER": "neg"}
         res_target_dict = {"FOSA": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***fosA***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***fosA***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"OTHER": "GENE1[***fosA***]"}, drug_res_col_dict)
         self.assertEqual({"FOSA": "pos"}, res_target_dict)
 
         drug_res_col_dict = {"OTHER": "CATQ[***CATQ***]"}
         res_target_dict = {"FOSA": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***fosA***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***fosA***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"OTHER": "CATQ[***CATQ***]:GENE1[***fosA***]"}, drug_res_col_dict)
         self.assertEqual({"FOSA": "pos"}, res_target_dict)
 
         drug_res_col_dict = {"OTHER": "FOSA[***allele***]"}
         res_target_dict = {"FOSA": "pos"}
-        update_presence_absence_target_for_arg_res("GENE1", "***fosA***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***fosA***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"OTHER": "FOSA[***allele***]:GENE1[***fosA***]"}, drug_res_col_dict)
         self.assertEqual({"FOSA": "pos"}, res_target_dict)
 
         # ============== Test ERMB ==================
         drug_res_col_dict = {"EC": "neg"}
         res_target_dict = {"ERMB": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***erm(B)***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***erm(B)***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "GENE1[***erm(B)***]"}, drug_res_col_dict)
         self.assertEqual({"ERMB": "pos"}, res_target_dict)
 
         drug_res_col_dict = {"EC": "LNUB[***allele***]"}
         res_target_dict = {"ERMB": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***erm(B)***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***erm(B)***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "LNUB[***allele***]:GENE1[***erm(B)***]"}, drug_res_col_dict)
         self.assertEqual({"ERMB": "pos"}, res_target_dict)
 
         drug_res_col_dict = {"EC": "ERMB[***allele***]"}
         res_target_dict = {"ERMB": "pos"}
-        update_presence_absence_target_for_arg_res("GENE1", "***erm(B)***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***erm(B)***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "ERMB[***allele***]:GENE1[***erm(B)***]"}, drug_res_col_dict)
         self.assertEqual({"ERMB": "pos"}, res_target_dict)
 
         # ============== Test LNUB ==================
         drug_res_col_dict = {"EC": "neg"}
         res_target_dict = {"LNUB": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***lnu(B)***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***lnu(B)***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "GENE1[***lnu(B)***]"}, drug_res_col_dict)
         self.assertEqual({"LNUB": "pos"}, res_target_dict)
 
         drug_res_col_dict = {"EC": "ERM[***allele***]"}
         res_target_dict = {"LNUB": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***lnu(B)***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***lnu(B)***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "ERM[***allele***]:GENE1[***lnu(B)***]"}, drug_res_col_dict)
         self.assertEqual({"LNUB": "pos"}, res_target_dict)
 
         drug_res_col_dict = {"EC": "LNUB[***allele***]"}
         res_target_dict = {"LNUB": "pos"}
-        update_presence_absence_target_for_arg_res("GENE1", "***lnu(B)***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***lnu(B)***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "LNUB[***allele***]:GENE1[***lnu(B)***]"}, drug_res_col_dict)
         self.assertEqual({"LNUB": "pos"}, res_target_dict)
 
         # ============== Test LSAC ==================
         drug_res_col_dict = {"EC": "neg"}
         res_target_dict = {"LSAC": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***lsa(C)***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***lsa(C)***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "GENE1[***lsa(C)***]"}, drug_res_col_dict)
         self.assertEqual({"LSAC": "pos"}, res_target_dict)
 
         drug_res_col_dict = {"EC": "ERM[***allele***]"}
         res_target_dict = {"LSAC": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***LSAC***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***LSAC***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "ERM[***allele***]:GENE1[***LSAC***]"}, drug_res_col_dict)
         self.assertEqual({"LSAC": "pos"}, res_target_dict)
 
         drug_res_col_dict = {"EC": "ERM[***allele***]"}
         res_target_dict = {"LSAC": "pos"}
-        update_presence_absence_target_for_arg_res("GENE1", "***LSAC***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***LSAC***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "ERM[***allele***]:GENE1[***LSAC***]"}, drug_res_col_dict)
         self.assertEqual({"LSAC": "pos"}, res_target_dict)
 
         # ============== Test MEFA ==================
         drug_res_col_dict = {"EC": "neg"}
         res_target_dict = {"MEFA": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***mef(A)***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***mef(A)***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "GENE1[***mef(A)***]"}, drug_res_col_dict)
         self.assertEqual({"MEFA": "pos"}, res_target_dict)
 
         drug_res_col_dict = {"EC": "ERM[***allele***]"}
         res_target_dict = {"MEFA": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***mef(A)***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***mef(A)***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "ERM[***allele***]:GENE1[***mef(A)***]"}, drug_res_col_dict)
         self.assertEqual({"MEFA": "pos"}, res_target_dict)
 
         drug_res_col_dict = {"EC": "ERM[***allele***]"}
         res_target_dict = {"MEFA": "pos"}
-        update_presence_absence_target_for_arg_res("GENE1", "***mef(A)***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***mef(A)***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "ERM[***allele***]:GENE1[***mef(A)***]"}, drug_res_col_dict)
         self.assertEqual({"MEFA": "pos"}, res_target_dict)
 
         # ============== Test MPHC ==================
         drug_res_col_dict = {"EC": "neg"}
         res_target_dict = {"MPHC": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***mph(C)***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***mph(C)***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "GENE1[***mph(C)***]"}, drug_res_col_dict)
         self.assertEqual({"MPHC": "pos"}, res_target_dict)
 
         drug_res_col_dict = {"EC": "ERMB[***allele***]"}
         res_target_dict = {"MPHC": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***mph(C)***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***mph(C)***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "ERMB[***allele***]:GENE1[***mph(C)***]"}, drug_res_col_dict)
         self.assertEqual({"MPHC": "pos"}, res_target_dict)
 
         drug_res_col_dict = {"EC": "MPHC[***allele***]"}
         res_target_dict = {"MPHC": "pos"}
-        update_presence_absence_target_for_arg_res("GENE1", "***mph(C)***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***mph(C)***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"EC": "MPHC[***allele***]:GENE1[***mph(C)***]"}, drug_res_col_dict)
         self.assertEqual({"MPHC": "pos"}, res_target_dict)
 
         # ============== Test MSRA ==================
         drug_res_col_dict = {"OTHER": "neg"}
         res_target_dict = {"MSRA": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***msr(A)***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***msr(A)***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"OTHER": "GENE1[***msr(A)***]"}, drug_res_col_dict)
         self.assertEqual({"MSRA": "pos"}, res_target_dict)
 
         drug_res_col_dict = {"OTHER": "FOSA[***allele***]"}
         res_target_dict = {"MSRA": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***msr(A)***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***msr(A)***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"OTHER": "FOSA[***allele***]:GENE1[***msr(A)***]"}, drug_res_col_dict)
         self.assertEqual({"MSRA": "pos"}, res_target_dict)
 
         drug_res_col_dict = {"OTHER": "MSRA[***allele***]"}
         res_target_dict = {"MSRA": "pos"}
-        update_presence_absence_target_for_arg_res("GENE1", "***msr(A)***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***msr(A)***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"OTHER": "MSRA[***allele***]:GENE1[***msr(A)***]"}, drug_res_col_dict)
         self.assertEqual({"MSRA": "pos"}, res_target_dict)
 
         # ============== Test MSRD ==================
         drug_res_col_dict = {"OTHER": "neg"}
         res_target_dict = {"MSRD": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***msr(D)***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***msr(D)***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"OTHER": "GENE1[***msr(D)***]"}, drug_res_col_dict)
         self.assertEqual({"MSRD": "pos"}, res_target_dict)
 
         drug_res_col_dict = {"OTHER": "FOSA[***allele***]"}
         res_target_dict = {"MSRD": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***msr(D)***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***msr(D)***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"OTHER": "FOSA[***allele***]:GENE1[***msr(D)***]"}, drug_res_col_dict)
         self.assertEqual({"MSRD": "pos"}, res_target_dict)
 
         drug_res_col_dict = {"OTHER": "MSRD[***allele***]"}
         res_target_dict = {"MSRD": "pos"}
-        update_presence_absence_target_for_arg_res("GENE1", "***msr(D)***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***msr(D)***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"OTHER": "MSRD[***allele***]:GENE1[***msr(D)***]"}, drug_res_col_dict)
         self.assertEqual({"MSRD": "pos"}, res_target_dict)
 
         # ============== Test SUL2 ==================
         drug_res_col_dict = {"OTHER": "neg"}
         res_target_dict = {"SUL2": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***sul2***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***sul2***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"OTHER": "GENE1[***sul2***]"}, drug_res_col_dict)
         self.assertEqual({"SUL2": "pos"}, res_target_dict)
 
         drug_res_col_dict = {"OTHER": "FOSA[***allele***]"}
         res_target_dict = {"SUL2": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***sul2***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***sul2***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"OTHER": "FOSA[***allele***]:GENE1[***sul2***]"}, drug_res_col_dict)
         self.assertEqual({"SUL2": "pos"}, res_target_dict)
 
         drug_res_col_dict = {"OTHER": "SUL2[***allele***]"}
         res_target_dict = {"SUL2": "pos"}
-        update_presence_absence_target_for_arg_res("GENE1", "***sul2***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***sul2***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"OTHER": "SUL2[***allele***]:GENE1[***sul2***]"}, drug_res_col_dict)
         self.assertEqual({"SUL2": "pos"}, res_target_dict)
 
         # ============== Test TETM ==================
         drug_res_col_dict = {"TET": "neg"}
         res_target_dict = {"TETM": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***tet(M)***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***tet(M)***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"TET": "GENE1[***tet(M)***]"}, drug_res_col_dict)
         self.assertEqual({"TETM": "pos"}, res_target_dict)
 
         drug_res_col_dict = {"TET": "ERM[***allele***]"}
         res_target_dict = {"TETM": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***tet(M)***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***tet(M)***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"TET": "ERM[***allele***]:GENE1[***tet(M)***]"}, drug_res_col_dict)
         self.assertEqual({"TETM": "pos"}, res_target_dict)
 
         drug_res_col_dict = {"TET": "ERM[***allele***]"}
         res_target_dict = {"TETM": "pos"}
-        update_presence_absence_target_for_arg_res("GENE1", "***tet(M)***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***tet(M)***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"TET": "ERM[***allele***]:GENE1[***tet(M)***]"}, drug_res_col_dict)
         self.assertEqual({"TETM": "pos"}, res_target_dict)
 
         # ============== Test CATQ ==================
         drug_res_col_dict = {"OTHER": "neg"}
         res_target_dict = {"CATQ": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***CATQ***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***CATQ***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"OTHER": "GENE1[***CATQ***]"}, drug_res_col_dict)
         self.assertEqual({"CATQ": "pos"}, res_target_dict)
 
         drug_res_col_dict = {"OTHER": "ERM[***allele***]"}
         res_target_dict = {"CATQ": "neg"}
-        update_presence_absence_target_for_arg_res("GENE1", "***CATQ***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***CATQ***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"OTHER": "ERM[***allele***]:GENE1[***CATQ***]"}, drug_res_col_dict)
         self.assertEqual({"CATQ": "pos"}, res_target_dict)
 
         drug_res_col_dict = {"OTHER": "CATQ[***allele***]"}
         res_target_dict = {"CATQ": "pos"}
-        update_presence_absence_target_for_arg_res("GENE1", "***CATQ***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***CATQ***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"OTHER": "CATQ[***allele***]:GENE1[***CATQ***]"}, drug_res_col_dict)
         self.assertEqual({"CATQ": "pos"}, res_target_dict)
         self.assertEqual({'***CATQ***': 'CATQ',
@@ -597,38 +601,58 @@ class TestProcessResTyperResults(unittest.TestCase):
         # ============== Test OTHER ==================
         drug_res_col_dict = {"OTHER": "neg"}
         res_target_dict = {}
-        update_presence_absence_target_for_arg_res("GENE1", "***FOO***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***FOO***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"OTHER": "GENE1[***FOO***]"}, drug_res_col_dict)
         self.assertEqual({}, res_target_dict)
-        update_presence_absence_target_for_arg_res("GENE2", "***FOO***", depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE2", "***FOO***", MIN_DEPTH, depth, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({"OTHER": "GENE1[***FOO***]:GENE2[***FOO***]"}, drug_res_col_dict)
         self.assertEqual({}, res_target_dict)
 
         # ============== Test depth ==================
         drug_res_col_dict = {}
         res_target_dict = {}
-        update_presence_absence_target_for_arg_res("GENE1", "***CATQ***", MIN_DEPTH - 1, drug_res_col_dict, res_target_dict, gene_allele_dict)
+        update_presence_absence_target_for_arg_res("GENE1", "***CATQ***", MIN_DEPTH, MIN_DEPTH - 1, drug_res_col_dict, res_target_dict, gene_allele_dict)
         self.assertEqual({}, drug_res_col_dict)
         self.assertEqual({}, res_target_dict)
 
+    def test_find_target_gene(self):
+        gene_names = tuple(Res_Targets.keys())
+        self.assertEqual(find_target_gene(gene_names, "tet(O/W/32/O)"), "TETOW32O")
+        self.assertEqual(find_target_gene(gene_names, "tet(O)"), "TETO")
+        self.assertEqual(find_target_gene(gene_names, "unknown"), None)
+        self.assertEqual(find_target_gene((), "erm(B)"), None)
+
+    def test_find_target_gene_keeps_gene_name_order(self):
+        # The first gene name in order wins, not the leftmost match in the allele
+        self.assertEqual(find_target_gene(("ERMB", "TETM"), "tet(M)_erm(B)"), "ERMB")
+        self.assertEqual(find_target_gene(("TETM", "ERMB"), "tet(M)_erm(B)"), "TETM")
+
     @patch('bin.process_res_typer_results.update_presence_absence_target')
     def test_derive_presence_absence_targets(self, mock):
 
-        calls = [call("23S1", "23S1-1", 1135.571, ANY), call("23S3", "23S3-3", 1265.721, ANY)]
+        calls = [call("23S1", "23S1-1", MIN_DEPTH, 1135.571, ANY), call("23S3", "23S3-3", MIN_DEPTH, 1265.721, ANY)]
 
-        derive_presence_absence_targets(self.TEST_GBS_FULLGENES_RESULTS_FILE, GBS_Res_Targets)
+        derive_presence_absence_targets(self.TEST_GBS_FULLGENES_RESULTS_FILE, MIN_DEPTH, GBS_Res_Targets)
 
         mock.assert_has_calls(calls, any_order=False)
 
+    @patch('bin.process_res_typer_results.update_presence_absence_target')
+    def test_derive_presence_absence_targets_min_depth(self, mock):
+
+        derive_presence_absence_targets(self.TEST_GBS_FULLGENES_RESULTS_FILE, 1200, GBS_Res_Targets)
+
+        self.assertEqual(mock.call_args_list, [call("23S3", "23S3-3", 1200, 1265.721, ANY)])
+
     @patch('bin.process_res_typer_results.update_presence_absence_target_for_arg_res')
     def test_derive_presence_absence_targets_for_arg_res(self, mock):
         calls = [
-            call("tet(M)", "tet(M)_12", 132.04, ANY, ANY, ANY),
-            call("tet(M)", "tet(M)_4", 185.331, ANY, ANY, ANY),
-            call("tet(M)", "tet(M)_10", 120.412, ANY, ANY, ANY),
+            call("tet(M)", "tet(M)_12", MIN_DEPTH, 132.04, ANY, ANY, ANY),
+            call("tet(M)", "tet(M)_4", MIN_DEPTH, 185.331, ANY, ANY, ANY),
+            call("tet(M)", "tet(M)_10", MIN_DEPTH, 120.412, ANY, ANY, ANY),
         ]
 
-        derive_presence_absence_targets_for_arg_res([self.TEST_RESFINDER_FULLGENES_RESULTS_FILE], drugRes_Col, Res_Targets)
+        state = ResTyperState.new()
+        derive_presence_absence_targets_for_arg_res([self.TEST_RESFINDER_FULLGENES_RESULTS_FILE], MIN_DEPTH, state.drug_res_col, state.res_targets, state.gene_allele_dict)
 
         mock.assert_has_calls(calls, any_order=False)
 
@@ -789,8 +813,10 @@ class TestProcessResTyperResults(unittest.TestCase):
         self.assertEqual(actual, ['PARC','GYRA','23S1','23S3','RPOBGBS-1','RPOBGBS-2','RPOBGBS-3','RPOBGBS-4'])
 
     def test_clear_arg_res(self):
-        actual = clear_arg_res(GBS_Res_var)
-        self.assertEqual(GBS_Res_var, {
+        gbs_res_var = dict(GBS_Res_var)
+        gbs_res_var['GYRA_SNP'] = '*'
+        actual = clear_arg_res(gbs_res_var)
+        self.assertEqual(gbs_res_var, {
             '23S1_SNP': '',
             '23S3_SNP': '',
             'GYRA_SNP': '',
@@ -819,7 +845,8 @@ class TestProcessResTyperResults(unittest.TestCase):
         mock_get_gene_names_from_consensus.return_value = ['PARC','GYRA','23S1','23S3','RPOBGBS-1','RPOBGBS-2','RPOBGBS-3','RPOBGBS-4']
         mock_get_seq_diffs.return_value = ['Q17S']
 
-        get_variants(self.TEST_CONSENSUS_SEQ_FILE)
+        state = ResTyperState.new()
+        get_variants(self.TEST_CONSENSUS_SEQ_FILE, state.gbs_res_targets, state.gbs_res_var, state.drug_res_col)
 
         self.assertEqual(mock_get_seq_content.call_args_list, [call(self.TEST_CONSENSUS_SEQ_FILE)])
         self.assertEqual(mock_get_gene_names_from_consensus.call_args_list, [call(mock_get_seq_content.return_value)])
@@ -841,14 +868,14 @@ class TestProcessResTyperResults(unittest.TestCase):
 
         run(args)
 
-        self.assertEqual(mock_derive_presence_absence_targets.call_args_list, [call(args.srst2_gbs_fg_output, ANY)])
-        self.assertEqual(mock_derive_presence_absence_targets_for_arg_res.call_args_list, [call(args.srst2_other_fg_output, ANY, ANY)])
+        self.assertEqual(mock_derive_presence_absence_targets.call_args_list, [call(args.srst2_gbs_fg_output, 30.0, ANY)])
+        self.assertEqual(mock_derive_presence_absence_targets_for_arg_res.call_args_list, [call(args.srst2_other_fg_output, 30.0, ANY, ANY, ANY)])
         mock_create_output_contents.assert_has_calls([
-            call(GBS_Res_Targets),
+            call({**GBS_Res_Targets, **Res_Targets}),
             call(GBS_Res_var),
             call(drugRes_Col)
         ], any_order = False)
-        self.assertEqual(mock_get_variants.call_args_list, [call(args.srst2_gbs_cs_output)])
+        self.assertEqual(mock_get_variants.call_args_list, [call(args.srst2_gbs_cs_output, ANY, ANY, ANY)])
         mock_write_output.assert_has_calls([
             call(ANY, args.output + '_res_incidence.txt'),
             call(ANY, args.output + "_res_gbs_variants.txt"),
@@ -866,7 +893,12 @@ class TestProcessResTyperResults(unittest.TestCase):
                                             srst2_other_fg_output=['srst2_argannot_fullgenes','srst2_resfinder_fullgenes'],
                                             min_depth = 30.0,
                                             headers = 'headers',
-                                            output='output'))
+                                            output='output',
+                                            manifest=None,
+                                            processes=1,
+                                            cache_dir=None,
+                                            cache_max_size=1024,
+                                            db_version=''))
 
     @patch('bin.process_res_typer_results.get_arguments')
     @patch('bin.process_res_typer_results.run')
@@ -900,3 +932,92 @@ class TestProcessResTyperResults(unittest.TestCase):
         f = open(self.TEST_OUTPUT_PREFIX + '_res_alleles_accessions.txt', "r")
         actual = "".join(f.readlines())
         self.assertEqual(actual, "26189_8#5\ttetM\ttet(M)_12\n26189_8#5\ttetM\ttet(M)_4\n26189_8#5\ttetM\ttet(M)_10\n26189_8#5\taac(6')-aph(2'')\taac(6')-aph(2'')_1\n26189_8#5\tcat(pc194)\tcat(pC194)_1\n26189_8#5\taph(3'-III)\taph(3')-IIIa_1\n")
+
+    def test_read_manifest(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            manifest = os.path.join(tmp_dir, 'manifest.txt')
+            with open(manifest, 'w') as out:
+                out.write('out/sample1\tgbs1.txt\tcs1.fna\targ1.txt\tresfi1.txt\n')
+                out.write('\n')
+                out.write('out/sample2\tgbs2.txt\tcs2.fna\n')
+
+            actual = read_manifest(manifest)
+
+        self.assertEqual(actual, [
+            ('out/sample1', 'gbs1.txt', 'cs1.fna', ['arg1.txt', 'resfi1.txt']),
+            ('out/sample2', 'gbs2.txt', 'cs2.fna', None)
+        ])
+
+    def test_res_typer_state_new_is_independent(self):
+        state1 = ResTyperState.new()
+        state2 = ResTyperState.new()
+        state1.res_targets['ERMB'] = 'pos'
+        state1.gene_allele_dict['erm(B)_1'] = 'ERMB'
+
+        self.assertEqual(state2.res_targets['ERMB'], 'neg')
+        self.assertEqual(dict(state2.gene_allele_dict), {})
+        self.assertIsNot(state1.drug_res_col, drugRes_Col)
+
+    def test_templates_are_read_only(self):
+        for template in [drugRes_Col, GBS_Res_Targets, GBS_Res_var, Res_Targets]:
+            with self.assertRaises(TypeError):
+                template['ERMB'] = 'pos'
+
+    @patch('lib.file_utils.FileUtils.write_output')
+    def test_run_does_not_change_templates(self, mock_write_output):
+        args = get_arguments().parse_args(
+            ['--srst2_gbs_fullgenes', self.TEST_GBS_FULLGENES_RESULTS_FILE, '--srst2_gbs_consensus', self.TEST_CONSENSUS_SEQ_FILE,
+            '--srst2_other_fullgenes', self.TEST_RESFINDER_FULLGENES_RESULTS_FILE,
+            '--min_read_depth', '30.0', '--headers', self.TEST_HEADERS, '--output_prefix', self.TEST_OUTPUT_PREFIX])
+
+        run(args)
+
+        self.assertEqual(set(drugRes_Col.values()), {'neg'})
+        self.assertEqual(set(GBS_Res_Targets.values()), {'neg'})
+        self.assertEqual(set(Res_Targets.values()), {'neg'})
+        self.assertEqual(set(GBS_Res_var.values()), {''})
+
+    def test_main_with_manifest(self):
+        expected_alleles_variants = "AG\tEC\tFQ\tOTHER\tTET\naac(6')-aph(2'')[aac(6')-aph(2'')_1]:aph(3')-IIIa[aph(3')-IIIa_1]:aph(3')-other-Va[aph(3')-other-Va_2]:aadE-Cc[aadE-Cc_1]\t23S1:23S3\tneg\tcat(pC194)[cat(pC194)_1]\ttet(M)[tet(M)_12]:tet(M)[tet(M)_4]:tet(M)[tet(M)_10]\n"
+        expected_accessions = "26189_8#5\ttetM\ttet(M)_12\n26189_8#5\ttetM\ttet(M)_4\n26189_8#5\ttetM\ttet(M)_10\n26189_8#5\taac(6')-aph(2'')\taac(6')-aph(2'')_1\n26189_8#5\tcat(pc194)\tcat(pC194)_1\n26189_8#5\taph(3'-III)\taph(3')-IIIa_1\n"
+
+        for processes in ['1', '2']:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                manifest = os.path.join(tmp_dir, 'manifest.txt')
+                prefixes = [os.path.join(tmp_dir, str(n), self.TEST_LANE) for n in range(3)]
+                with open(manifest, 'w') as out:
+                    for prefix in prefixes:
+                        os.makedirs(os.path.dirname(prefix))
+                        out.write('\t'.join([prefix, self.TEST_GBS_FULLGENES_RESULTS_FILE, self.TEST_CONSENSUS_SEQ_FILE, self.TEST_RESFINDER_FULLGENES_RESULTS_FILE]) + '\n')
+
+                args = get_arguments().parse_args(
+                    ['--manifest', manifest, '--min_read_depth', '30.0', '--headers', self.TEST_HEADERS, '--processes', processes])
+                run(args)
+
+                # Every sample gets the same results, with nothing carried over from the previous sample
+                for prefix in prefixes:
+                    with open(prefix + '_res_alleles_variants.txt', 'r') as f:
+                        self.assertEqual(f.read(), expected_alleles_variants)
+                    with open(prefix + '_res_alleles_accessions.txt', 'r') as f:
+                        self.assertEqual(f.read(), expected_accessions)
+
+    def test_manifest_without_other_fullgenes_matches_single_sample(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            single_prefix = os.path.join(tmp_dir, 'single', self.TEST_LANE)
+            manifest_prefix = os.path.join(tmp_dir, 'manifest', self.TEST_LANE)
+            os.makedirs(os.path.dirname(single_prefix))
+            os.makedirs(os.path.dirname(manifest_prefix))
+            manifest = os.path.join(tmp_dir, 'manifest.txt')
+            with open(manifest, 'w') as out:
+                out.write('\t'.join([manifest_prefix, self.TEST_GBS_FULLGENES_RESULTS_FILE, self.TEST_CONSENSUS_SEQ_FILE]) + '\n')
+
+            # Run singly in a fresh interpreter, as the pipeline does
+            subprocess.run([sys.executable, 'bin/process_res_typer_results.py',
+                            '--srst2_gbs_fullgenes', self.TEST_GBS_FULLGENES_RESULTS_FILE, '--srst2_gbs_consensus', self.TEST_CONSENSUS_SEQ_FILE,
+                            '--min_read_depth', '30.0', '--headers', self.TEST_HEADERS, '--output_prefix', single_prefix],
+                           check=True, env=dict(os.environ, PYTHONPATH=os.getcwd()))
+            run(get_arguments().parse_args(['--manifest', manifest, '--min_read_depth', '30.0', '--headers', self.TEST_HEADERS]))
+
+            for suffix in ['_res_incidence.txt', '_res_gbs_variants.txt', '_res_alleles_variants.txt', '_res_alleles_accessions.txt']:
+                with open(single_prefix + suffix, 'rb') as single, open(manifest_prefix + suffix, 'rb') as batch:
+                    self.assertEqual(batch.read(), single.read(), suffix)
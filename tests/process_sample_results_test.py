@@ -0,0 +1,111 @@
+import argparse
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from bin.process_sample_results import get_arguments, run, main
+
+
+class TestProcessSampleResults(unittest.TestCase):
+    TEST_LANE = "26189_8#5"
+    TEST_SERO_FULLGENES_RESULTS_FILE = "tests/test_data/input/SERO_26237_7#5__fullgenes__GBS_seroT_Gene-DB_Final__results.txt"
+    TEST_GBS_FULLGENES_RESULTS_FILE = "tests/test_data/input/RES_" + TEST_LANE + "__fullgenes__GBS_Res_Gene-DB_Final__results.txt"
+    TEST_CONSENSUS_SEQ_FILE = "tests/test_data/input/" + TEST_LANE + "_consensus_seq.fna"
+    TEST_RESFINDER_FULLGENES_RESULTS_FILE = "tests/test_data/input/RESFI_" + TEST_LANE + "__fullgenes__ResFinder__results.txt"
+    TEST_SURFACE_FULLGENES_RESULTS_FILE = "tests/test_data/input/26189_8#338_SURFACE__fullgenes__GBS_Surface_Gene-DB_Final__results.txt"
+    TEST_HEADERS = "headers.json"
+
+    SAMPLE_OUTPUT_SUFFIXES = [
+        '_SeroType_Results.txt',
+        '_res_incidence.txt',
+        '_res_alleles_variants.txt',
+        '_res_gbs_variants.txt',
+        '_res_alleles_accessions.txt',
+        '_sero_res_incidence.txt',
+        '_id_alleles_variants.txt',
+        '_id_variants.txt',
+        '_surface_protein_incidence_sample.txt',
+        '_surface_protein_variants_sample.txt',
+        '_surface_protein_incidence.txt',
+        '_surface_protein_variants.txt'
+    ]
+
+    def get_args(self, output, sero_fullgenes=TEST_SERO_FULLGENES_RESULTS_FILE):
+        return get_arguments().parse_args([
+            '--id', self.TEST_LANE, '--headers', self.TEST_HEADERS, '--output_prefix', output,
+            '--sero_fullgenes', sero_fullgenes, '--sero_min_read_depth', '0',
+            '--res_gbs_fullgenes', self.TEST_GBS_FULLGENES_RESULTS_FILE, '--res_gbs_consensus', self.TEST_CONSENSUS_SEQ_FILE,
+            '--res_other_fullgenes', self.TEST_RESFINDER_FULLGENES_RESULTS_FILE, '--res_min_read_depth', '30',
+            '--surface_fullgenes', self.TEST_SURFACE_FULLGENES_RESULTS_FILE, '--surface_min_read_depth', '30'])
+
+    def test_get_arguments(self):
+        actual = get_arguments().parse_args(['--id', 'id', '-t', 'headers.json', '--sero_fullgenes', 'sero.txt'])
+
+        self.assertEqual(actual, argparse.Namespace(
+            id='id', headers='headers.json', output=None,
+            sero_fullgenes='sero.txt', sero_min_depth=0,
+            res_gbs_fullgenes=None, res_gbs_consensus=None, res_other_fullgenes=None, res_min_depth=30,
+            surface_fullgenes=None, surface_min_depth=30,
+            cache_dir=None, cache_max_size=1024, db_version=''))
+
+    @patch('bin.process_sample_results.run')
+    def test_main_requires_consensus_with_res_fullgenes(self, mock_run):
+        with patch('sys.argv', ['process_sample_results.py', '--id', 'id', '-t', 'headers.json', '--res_gbs_fullgenes', 'res.txt']):
+            with self.assertRaises(SystemExit):
+                main()
+
+        mock_run.assert_not_called()
+
+    def test_run(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, self.TEST_LANE)
+
+            self.assertEqual(run(self.get_args(output)), 0)
+
+            for suffix in self.SAMPLE_OUTPUT_SUFFIXES:
+                self.assertTrue(os.path.exists(output + suffix), suffix)
+
+            with open(output + '_res_alleles_variants.txt', 'r') as f:
+                self.assertEqual(f.read(), "AG\tEC\tFQ\tOTHER\tTET\naac(6')-aph(2'')[aac(6')-aph(2'')_1]:aph(3')-IIIa[aph(3')-IIIa_1]:aph(3')-other-Va[aph(3')-other-Va_2]:aadE-Cc[aadE-Cc_1]\t23S1:23S3\tneg\tcat(pC194)[cat(pC194)_1]\ttet(M)[tet(M)_12]:tet(M)[tet(M)_4]:tet(M)[tet(M)_10]\n")
+
+            # The combined tables start with the sample ID
+            for suffix in ['_sero_res_incidence.txt', '_id_alleles_variants.txt', '_id_variants.txt',
+                           '_surface_protein_incidence.txt', '_surface_protein_variants.txt']:
+                with open(output + suffix, 'r') as f:
+                    lines = f.read().splitlines()
+                self.assertEqual(lines[1].split('\t')[0], self.TEST_LANE, suffix)
+
+    def test_run_continues_after_failed_step(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, self.TEST_LANE)
+
+            self.assertEqual(run(self.get_args(output, os.path.join(tmp_dir, 'missing.txt'))), 1)
+
+            # Other typing steps still run
+            for suffix in ['_res_incidence.txt', '_surface_protein_incidence.txt', '_surface_protein_variants.txt']:
+                self.assertTrue(os.path.exists(output + suffix), suffix)
+
+            # The serotype results are not combined without the serotyping outputs
+            for suffix in ['_sero_res_incidence.txt', '_id_alleles_variants.txt', '_id_variants.txt']:
+                self.assertFalse(os.path.exists(output + suffix), suffix)
+
+    @patch('bin.combine_results.write_surface_typer_results', side_effect=ValueError('bad table'))
+    def test_run_fails_after_failed_combining_step(self, mock_write_surface_typer_results):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, self.TEST_LANE)
+
+            self.assertEqual(run(self.get_args(output)), 1)
+
+            mock_write_surface_typer_results.assert_called_once()
+            self.assertTrue(os.path.exists(output + '_sero_res_incidence.txt'))
+
+    def test_run_surface_only(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, self.TEST_LANE)
+            args = get_arguments().parse_args([
+                '--id', self.TEST_LANE, '--headers', self.TEST_HEADERS, '--output_prefix', output,
+                '--surface_fullgenes', self.TEST_SURFACE_FULLGENES_RESULTS_FILE])
+
+            self.assertEqual(run(args), 0)
+
+            self.assertEqual(sorted(os.listdir(tmp_dir)), sorted(self.TEST_LANE + suffix for suffix in self.SAMPLE_OUTPUT_SUFFIXES[-4:]))
@@ -4,6 +4,7 @@ import unittest
 import os
 
 from bin.process_serotyper_results import write_outfile, make_gene_list, get_arguments
+from lib.srst2_fullgenes import FullgenesRecord
 
 
 
@@ -15,7 +16,7 @@ class TestProcessResults(unittest.TestCase):
 
     def test_should_make_gene_list(self):
         actual = make_gene_list(self.TEST_SEROTYPE_FULLGENES, 10)
-        self.assertEqual(actual, [['GBS-SBG', 'GBS-SBG:III', '100.0', '267.595', '1snp', '', '0.581', '172', '0.011', '4', '4']])
+        self.assertEqual(actual, [FullgenesRecord('GBS-SBG', 'GBS-SBG:III', 100.0, 267.595, '1snp', 0.581, '267.595')])
 
     def test_write_outfile(self):
         gene_dict = make_gene_list(self.TEST_SEROTYPE_FULLGENES, 10)
@@ -35,17 +36,26 @@ class TestProcessResults(unittest.TestCase):
                             ['Matched_Allele\tMatch_Type\tSerotype\tAvgDepth\n','NT/Ia/III\tNT=imperfect/Ia=identical/III=imperfect\tIa/III\t2.306/137.929/11.098\n'])
         os.remove(self.TEST_OUTPUT)
 
+    def test_write_outfile_keeps_depth_as_written(self):
+        gene_list = [FullgenesRecord('GBS-SBG', 'GBS-SBG:Ia', 100.0, 37.0, '', 0.0, '37'),
+                     FullgenesRecord('GBS-SBG', 'GBS-SBG:III', 100.0, 12.5, '1snp', 0.5, '12.50')]
+        write_outfile(gene_list, self.TEST_OUTPUT)
+        with open(self.TEST_OUTPUT, 'r') as f:
+            actual = f.readlines()
+        self.assertEqual(actual[1], 'Ia/III\tIa=identical/III=imperfect\tIa/III\t37/12.50\n')
+        os.remove(self.TEST_OUTPUT)
+
     def test_arguments(self):
         actual = get_arguments().parse_args(['--srst2_output', 'srst2_output_name', '--sero_db', 'sero_db', '--output', 'outfile', '--min_read_depth', '30.0'])
         self.assertEqual(actual,
-                         argparse.Namespace(id='srst2_output_name', db='sero_db', output='outfile', depth=30.0))
+                         argparse.Namespace(id='srst2_output_name', db='sero_db', output='outfile', depth=30.0, cache_dir=None, cache_max_size=1024, db_version=''))
 
     def test_arguments_short_options(self):
         actual = get_arguments().parse_args(['-s', 'srst2_output_name', '-b', 'sero_db', '-o', 'outfile', '-d', '30.0'])
         self.assertEqual(actual,
-                         argparse.Namespace(id='srst2_output_name', db='sero_db', output='outfile', depth=30.0))
+                         argparse.Namespace(id='srst2_output_name', db='sero_db', output='outfile', depth=30.0, cache_dir=None, cache_max_size=1024, db_version=''))
 
     def test_arguments_without_depth_threshold(self):
         actual = get_arguments().parse_args(['-s', 'srst2_output_name', '-b', 'sero_db', '-o', 'outfile'])
         self.assertEqual(actual,
-                        argparse.Namespace(id='srst2_output_name', db='sero_db', output='outfile', depth=0))
+                        argparse.Namespace(id='srst2_output_name', db='sero_db', output='outfile', depth=0, cache_dir=None, cache_max_size=1024, db_version=''))
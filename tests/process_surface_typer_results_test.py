@@ -1,8 +1,10 @@
 import argparse
+import os
+import tempfile
 import unittest
 from unittest.mock import patch, call, ANY
 from bin.process_surface_typer_results import get_arguments, run,  \
-     derive_presence_absence, update_protein_presence_absence, featureCol, binFeatureCol, variantLookup
+     FeatureLookup, VARIANT_FEATURES, BIN_FEATURES, derive_presence_absence, update_protein_presence_absence, featureCol, binFeatureCol, variantLookup
 
 
 class TestProcessSurfaceTyperResults(unittest.TestCase):
@@ -104,6 +106,20 @@ class TestProcessSurfaceTyperResults(unittest.TestCase):
                             'ALPHA': 'neg',
                             'RIB':   'neg'})
 
+    def test_find_features(self):
+        self.assertEqual(VARIANT_FEATURES.find('PI2A1-1'), ('PI',))
+        self.assertEqual(BIN_FEATURES.find('ALP23-1'), ('ALP23',))
+        self.assertEqual(BIN_FEATURES.find('Rib_alpha'), ('ALPHA', 'RIB'))
+        self.assertEqual(BIN_FEATURES.find('OTHER-1'), ())
+
+    def test_feature_lookup_matches_every_feature(self):
+        lookup = FeatureLookup(binFeatureCol)
+        for allele in ['SRR1-150', 'ALP23-1', 'PI2A1-1', 'HVGA1', 'pi2b/srr2', 'Rib_alpha', 'OTHER-1']:
+            normalised_allele = allele.replace('-', '').replace('/', '').replace('_', '').upper()
+            expected = tuple(feature for feature in binFeatureCol if feature in normalised_allele)
+            self.assertEqual(lookup.find(allele), expected)
+            self.assertIn(allele, lookup.features_by_allele)
+
     def test_update_protein_presence_absence_HVGA(self):
         update_protein_presence_absence(
             'PI1', 'PI2A2', self.MIN_DEPTH, 100.0, self.features, self.bin_features, variantLookup)
@@ -167,13 +183,13 @@ class TestProcessSurfaceTyperResults(unittest.TestCase):
              '--min_read_depth', '30.0'])
         self.assertEqual(actual,
                          argparse.Namespace(
-                            fullgenes_file_id='srst2_output_name', db='surface_db', output='outfile', min_depth=30.0))
+                            fullgenes_file_id='srst2_output_name', db='surface_db', output='outfile', min_depth=30.0, cache_dir=None, cache_max_size=1024, db_version=''))
 
     def test_get_arguments_short_options(self):
         actual = get_arguments().parse_args(['-s', 'srst2_output_name', '-b', 'sero_db', '-o', 'outfile', '-d', '30.0'])
         self.assertEqual(actual,
                          argparse.Namespace(
-                             fullgenes_file_id='srst2_output_name', db='sero_db', output='outfile', min_depth=30.0))
+                             fullgenes_file_id='srst2_output_name', db='sero_db', output='outfile', min_depth=30.0, cache_dir=None, cache_max_size=1024, db_version=''))
 
     @patch('bin.process_surface_typer_results.derive_presence_absence')
     @patch('lib.file_utils.FileUtils.create_output_contents')
@@ -196,9 +212,31 @@ class TestProcessSurfaceTyperResults(unittest.TestCase):
 
         self.assertEqual(
             mock_derive_presence_absence.call_args_list,
-            [call('srst2_gbs_out__fullgenes__gbs_surface_db__results.txt', 40.0, ANY)])
+            [call('srst2_gbs_out__fullgenes__gbs_surface_db__results.txt', 40.0, ANY, ANY)])
         mock_create_output_contents.assert_has_calls([call(ANY), call(ANY)])
         mock_write_output.assert_has_calls([
             call(ANY, args.output + '_surface_protein_variants_sample.txt'),
             call(ANY, args.output + '_surface_protein_incidence_sample.txt')
         ], any_order=False)
+
+    @patch('bin.process_surface_typer_results.derive_presence_absence')
+    def test_run_with_cache(self, mock_derive_presence_absence):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, 'output')
+            args = get_arguments().parse_args(
+                ['--srst2_gbs_fullgenes', 'tests/test_data/input/' + self.TEST_LANE + '_SURFACE',
+                 '--surface_db', 'GBS_Surface_Gene-DB_Final.fasta',
+                 '--min_read_depth', '40.0', '--output_prefix', output,
+                 '--cache_dir', os.path.join(tmp_dir, 'cache'), '--db_version', '0.2.1'])
+
+            run(args)
+            os.remove(output + '_surface_protein_incidence_sample.txt')
+            run(args)
+
+            self.assertEqual(mock_derive_presence_absence.call_count, 1)
+            self.assertTrue(os.path.exists(output + '_surface_protein_incidence_sample.txt'))
+
+            # A different threshold is typed again
+            args.min_depth = 30.0
+            run(args)
+            self.assertEqual(mock_derive_presence_absence.call_count, 2)
@@ -0,0 +1,166 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from lib.result_cache import ResultCache, run_cached, get_code_version
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp_dir.name, 'cache')
+        self.input_file = self.write_file('input.txt', 'foo')
+        self.output_files = [os.path.join(self.tmp_dir.name, 'output1.txt'), os.path.join(self.tmp_dir.name, 'output2.txt')]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_file(self, name, content):
+        filename = os.path.join(self.tmp_dir.name, name)
+        with open(filename, 'w') as out:
+            out.write(content)
+        return filename
+
+    def read_file(self, filename):
+        with open(filename, 'r') as f:
+            return f.read()
+
+    def test_get_key(self):
+        key = ResultCache.get_key('typer', [self.input_file], {'min_depth': 30})
+
+        self.assertEqual(key, ResultCache.get_key('typer', [self.input_file], {'min_depth': 30}))
+        self.assertNotEqual(key, ResultCache.get_key('other_typer', [self.input_file], {'min_depth': 30}))
+        self.assertNotEqual(key, ResultCache.get_key('typer', [self.input_file], {'min_depth': 40}))
+        self.assertNotEqual(key, ResultCache.get_key('typer', [self.input_file, self.input_file], {'min_depth': 30}))
+
+        self.write_file('input.txt', 'bar')
+        self.assertNotEqual(key, ResultCache.get_key('typer', [self.input_file], {'min_depth': 30}))
+
+    def test_get_key_includes_code_version(self):
+        key = ResultCache.get_key('typer', [self.input_file], {'min_depth': 30})
+
+        with patch('lib.result_cache.get_code_version', return_value='other'):
+            self.assertNotEqual(key, ResultCache.get_key('typer', [self.input_file], {'min_depth': 30}))
+
+    def test_get_code_version(self):
+        pipeline_dir = os.path.join(self.tmp_dir.name, 'pipeline')
+        os.makedirs(os.path.join(pipeline_dir, 'bin'))
+        os.makedirs(os.path.join(pipeline_dir, 'lib'))
+        self.write_file('pipeline/bin/script.py', 'print(1)')
+        self.write_file('pipeline/bin/script.nf', 'process')
+        version = get_code_version.__wrapped__(pipeline_dir)
+
+        self.assertEqual(version, get_code_version.__wrapped__(pipeline_dir))
+        self.write_file('pipeline/bin/script.nf', 'other process')
+        self.assertEqual(version, get_code_version.__wrapped__(pipeline_dir))
+        self.write_file('pipeline/lib/module.py', 'x = 1')
+        self.assertNotEqual(version, get_code_version.__wrapped__(pipeline_dir))
+
+    def test_get_key_with_missing_input_file(self):
+        key = ResultCache.get_key('typer', [os.path.join(self.tmp_dir.name, 'missing.txt')], {})
+        self.assertNotEqual(key, ResultCache.get_key('typer', [self.input_file], {}))
+
+    def test_fetch_without_entry(self):
+        cache = ResultCache(self.cache_dir)
+        self.assertFalse(cache.fetch('key', self.output_files))
+
+    def test_store_and_fetch(self):
+        cache = ResultCache(self.cache_dir)
+        self.write_file('output1.txt', 'result')
+        cache.store('key', self.output_files)
+        os.remove(self.output_files[0])
+
+        self.assertTrue(cache.fetch('key', self.output_files))
+        self.assertEqual(self.read_file(self.output_files[0]), 'result')
+        # Outputs that were not written are not restored
+        self.assertFalse(os.path.exists(self.output_files[1]))
+
+    def test_store_replaces_stale_entry(self):
+        cache = ResultCache(self.cache_dir)
+        # Entry left without a manifest
+        os.makedirs(cache.get_entry('key'))
+        self.write_file('cache/key/0', 'stale')
+        self.write_file('output1.txt', 'result')
+
+        cache.store('key', self.output_files)
+        os.remove(self.output_files[0])
+
+        self.assertTrue(cache.fetch('key', self.output_files))
+        self.assertEqual(self.read_file(self.output_files[0]), 'result')
+        self.assertEqual([name for name in os.listdir(self.cache_dir) if name.startswith('.')], [])
+
+    def test_fetch_removes_outputs_not_stored(self):
+        cache = ResultCache(self.cache_dir)
+        self.write_file('output1.txt', 'result')
+        cache.store('key', self.output_files)
+        self.write_file('output2.txt', 'stale')
+
+        self.assertTrue(cache.fetch('key', self.output_files))
+        self.assertFalse(os.path.exists(self.output_files[1]))
+
+    def test_fetch_partly_evicted_entry(self):
+        cache = ResultCache(self.cache_dir)
+        self.write_file('output1.txt', 'result1')
+        self.write_file('output2.txt', 'result2')
+        cache.store('key', self.output_files)
+        os.remove(os.path.join(cache.get_entry('key'), '1'))
+
+        self.assertFalse(cache.fetch('key', self.output_files))
+
+    def test_fetch_entry_without_manifest(self):
+        cache = ResultCache(self.cache_dir)
+        os.makedirs(cache.get_entry('key'))
+
+        self.assertFalse(cache.fetch('key', self.output_files))
+
+    def test_evict_least_recently_used(self):
+        cache = ResultCache(self.cache_dir, max_size=10)
+        self.write_file('output1.txt', '12345')
+        cache.store('key1', self.output_files[:1])
+        cache.store('key2', self.output_files[:1])
+        os.utime(cache.get_entry('key1'), (time.time() - 20, time.time() - 20))
+        os.utime(cache.get_entry('key2'), (time.time() - 10, time.time() - 10))
+
+        # Using key1 makes key2 the least recently used entry
+        self.assertTrue(cache.fetch('key1', self.output_files[:1]))
+        cache.store('key3', self.output_files[:1])
+
+        self.assertTrue(os.path.isdir(cache.get_entry('key1')))
+        self.assertFalse(os.path.isdir(cache.get_entry('key2')))
+        self.assertTrue(os.path.isdir(cache.get_entry('key3')))
+
+    def test_run_cached(self):
+        cache = ResultCache(self.cache_dir)
+        run = Mock(side_effect=lambda: self.write_file('output1.txt', 'result'))
+
+        run_cached(cache, 'typer', [self.input_file], {'min_depth': 30}, self.output_files, run)
+        os.remove(self.output_files[0])
+        run_cached(cache, 'typer', [self.input_file], {'min_depth': 30}, self.output_files, run)
+
+        self.assertEqual(run.call_count, 1)
+        self.assertEqual(self.read_file(self.output_files[0]), 'result')
+
+        # A changed parameter is a cache miss
+        run_cached(cache, 'typer', [self.input_file], {'min_depth': 40}, self.output_files, run)
+        self.assertEqual(run.call_count, 2)
+
+    def test_run_cached_with_missing_input(self):
+        cache = ResultCache(self.cache_dir)
+        run = Mock()
+        missing_file = os.path.join(self.tmp_dir.name, 'missing.txt')
+
+        run_cached(cache, 'typer', [missing_file], {}, self.output_files, run)
+        run_cached(cache, 'typer', [missing_file], {}, self.output_files, run)
+
+        self.assertEqual(run.call_count, 2)
+
+    def test_run_cached_without_cache(self):
+        run = Mock()
+
+        run_cached(None, 'typer', [self.input_file], {}, self.output_files, run)
+        run_cached(None, 'typer', [self.input_file], {}, self.output_files, run)
+
+        self.assertEqual(run.call_count, 2)
@@ -0,0 +1,22 @@
+import unittest
+
+from lib.seq_data import SeqData
+
+
+class TestSeqData(unittest.TestCase):
+    TEST_SEQ_DATA = 'tests/test_data/input/test_blactam_contig_fragments.fasta'
+
+
+    def test_translate_content(self):
+        """
+        Test amino acid sequence translation
+        """
+        seq_data_to_analyse = SeqData(self.TEST_SEQ_DATA)
+        seq_data_to_analyse.translate_content(1)
+        seq_data = seq_data_to_analyse.get_data()
+
+        self.assertEqual(seq_data['GBS1A-1_.26077_6_118.11:39458-40418(+)'], 'DIYNSDTYIAYPNNELQIASTIMDATNGKVIAQLGGRHQNENISFGTNQSVLTDRDWGSTMKPISAYAPAIDSGVYNSTGQSLNDSVYYWPGTSTQLYDWDRQYMGWMSMQTAIQQSRNVPAVRALEAAGLDEAKSFLEKLGIYYPEMNYSNAISSNNSSSDAKYGASSEKMAAAYSAFANGGTYYKPQYVNKIEFSDGTNDTYAASGSRAMKETTAYMMTDMLKTVLTFGTGTKAAIPGVAQAGKTGTSNYTEDELAKIEATTGIYNSAVGTMAPDENFVGYTSKYTMAIWTGYKNRLTPLYGSQLDIATEVYRAMMSY')
+
+    def test_translate_content_invalid_frame(self):
+        with self.assertRaises(IndexError):
+            SeqData(self.TEST_SEQ_DATA).translate_content(7)
@@ -0,0 +1,36 @@
+import unittest
+from lib.six_frame_translation import CODON_TO_AA, codon2aa, translate_codons, extract_frame_aa, reverse_complement, \
+    translate_six_frames, six_frame_translate_records
+
+
+class TestSixFrameTranslation(unittest.TestCase):
+    """Unit test class for the six_frame_translation module"""
+
+    def test_translate_codons(self):
+        self.assertEqual("IHMVIHL", translate_codons("ATCCACATGGTGATTCATCTA"))
+        self.assertEqual("STW*FI", translate_codons("ATCCACATGGTGATTCATCTA", 1))
+        self.assertEqual("", translate_codons("AT"))
+
+    def test_translate_codons_with_degenerate_codons(self):
+        self.assertEqual("MAGPTVRSx", translate_codons("ATGGCNGGNCCNACNGTNCGNTCNNNN"))
+
+    def test_translate_codons_matches_codon2aa(self):
+        bases = ''.join(CODON_TO_AA.keys())
+        self.assertEqual(translate_codons(bases), ''.join([codon2aa(bases[i:i+3]) for i in range(0, len(bases), 3)]))
+
+    def test_extract_frame_aa_with_mixed_case(self):
+        self.assertEqual(extract_frame_aa("ATCCACatggtgATTCATCTA", 1), "IHMVIHL")
+        self.assertEqual(extract_frame_aa("ATCCACatggtgATTCATCTA", 4), "*MNHHVD")
+
+    def test_reverse_complement(self):
+        self.assertEqual(reverse_complement("ATCCACatggtgNRY"), "RYNcaccatGTGGAT")
+
+    def test_translate_six_frames(self):
+        sequence = "ATCCACatggtgATTCATCTA"
+        self.assertEqual(translate_six_frames(sequence), tuple(extract_frame_aa(sequence, frame) for frame in range(1, 7)))
+
+    def test_six_frame_translate_records(self):
+        actual = dict(six_frame_translate_records(iter([("seq1", "ATCCACATGGTGATTCATCTA"), ("seq2", "AT")])))
+
+        self.assertEqual(actual["seq1"], ("IHMVIHL", "STW*FI", "PHGDSS", "*MNHHVD", "R*ITMW", "DESPCG"))
+        self.assertEqual(actual["seq2"], ("",) * 6)
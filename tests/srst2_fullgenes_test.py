@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+from lib.srst2_fullgenes import FullgenesRecord, read_fullgenes
+
+
+class TestSrst2Fullgenes(unittest.TestCase):
+    TEST_RESFINDER_FULLGENES_RESULTS_FILE = "tests/test_data/input/RESFI_26189_8#5__fullgenes__ResFinder__results.txt"
+
+    def write_file(self, tmp_dir, content):
+        filename = os.path.join(tmp_dir, 'fullgenes.txt')
+        with open(filename, 'w') as out:
+            out.write(content)
+        return filename
+
+    def test_read_fullgenes(self):
+        actual = list(read_fullgenes(self.TEST_RESFINDER_FULLGENES_RESULTS_FILE))
+
+        self.assertEqual(len(actual), 8)
+        self.assertEqual(actual[0], FullgenesRecord("tet(M)", "tet(M)_12", 93.854, 132.04, "54snp118holes", 2.997, "132.04"))
+        self.assertEqual(actual[-1], FullgenesRecord("aadE-Cc", "aadE-Cc_1", 84.74, 120.412, "60snp293holes", 3.688, "120.412"))
+
+    def test_read_fullgenes_min_depth(self):
+        actual = [record.allele for record in read_fullgenes(self.TEST_RESFINDER_FULLGENES_RESULTS_FILE, 130)]
+
+        self.assertEqual(actual, ["tet(M)_12", "tet(M)_4"])
+
+    def test_read_fullgenes_column_order_from_header(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = self.write_file(tmp_dir, 'allele\tgene\tdepth\tdiffs\tcoverage\tdivergence\n' +
+                                       'A-1\tA\t10\t1snp\t99.0\t0.5\n\n')
+
+            actual = list(read_fullgenes(filename))
+
+        self.assertEqual(actual, [FullgenesRecord('A', 'A-1', 99.0, 10.0, '1snp', 0.5, '10')])
+
+    def test_read_fullgenes_empty_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = self.write_file(tmp_dir, '')
+
+            self.assertEqual(list(read_fullgenes(filename)), [])
+
+    def test_read_fullgenes_missing_columns(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = self.write_file(tmp_dir, 'gene\tallele\tdepth\nA\tA-1\t10.5\n')
+
+            with self.assertRaises(ValueError):
+                list(read_fullgenes(filename))
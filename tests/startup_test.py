@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code):
+    """Run code in a fresh interpreter, with the repository on the path as in the pipeline"""
+    env = dict(os.environ, PYTHONPATH=ROOT_DIR)
+    return subprocess.run([sys.executable, '-c', code], cwd=ROOT_DIR, env=env, check=True,
+                          stdout=subprocess.PIPE, universal_newlines=True).stdout
+
+
+def get_loaded_modules(module, modules):
+    """Get which of the given modules are loaded by importing a module"""
+    output = run_python('import sys, {}; print(" ".join(m for m in {!r} if m in sys.modules))'.format(module, modules))
+    return output.split()
+
+
+def get_startup_time(module, repeats=3):
+    """Get the best time of starting an interpreter and importing a module"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run_python('import {}'.format(module))
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+class TestStartup(unittest.TestCase):
+    # Per-sample scripts that must start without the heavy dependencies
+    SCRIPTS = [
+        'bin.build_pbp_blast_db',
+        'bin.get_alleles_from_srst2_mlst',
+        'bin.get_pbp_alleles',
+        'bin.get_pbp_genes_from_contigs',
+        'bin.get_targets_from_db',
+        'bin.get_targets_from_samfile',
+        'bin.prepare_db',
+        'bin.process_res_typer_results',
+        'bin.process_sample_results',
+        'bin.process_serotyper_results',
+        'bin.process_surface_typer_results'
+    ]
+    HEAVY_MODULES = ['pandas', 'numpy', 'Bio', 'pysam', 'pyarrow']
+
+    def test_scripts_do_not_import_heavy_modules(self):
+        for script in self.SCRIPTS:
+            self.assertEqual(get_loaded_modules(script, self.HEAVY_MODULES), [], script)
+
+    @unittest.skipUnless(os.environ.get('RUN_BENCHMARKS'), 'timing benchmark, set RUN_BENCHMARKS=1 to run')
+    def test_scripts_start_faster_than_pandas(self):
+        pandas_time = get_startup_time('pandas')
+        for script in self.SCRIPTS:
+            self.assertLess(get_startup_time(script), pandas_time, script)
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from bin import process_res_typer_results, process_surface_typer_results
+from bin.process_res_typer_results import ResTyperState, read_header_json
+from bin.process_surface_typer_results import SurfaceTyperState
+
+
+class TestTyperScaling(unittest.TestCase):
+    TEST_LANE = "26189_8#5"
+    TEST_GBS_FULLGENES_RESULTS_FILE = "tests/test_data/input/RES_" + TEST_LANE + "__fullgenes__GBS_Res_Gene-DB_Final__results.txt"
+    TEST_CONSENSUS_SEQ_FILE = "tests/test_data/input/" + TEST_LANE + "_consensus_seq.fna"
+    TEST_RESFINDER_FULLGENES_RESULTS_FILE = "tests/test_data/input/RESFI_" + TEST_LANE + "__fullgenes__ResFinder__results.txt"
+    TEST_SURFACE_FULLGENES_RESULTS_FILE = "tests/test_data/input/26189_8#338_SURFACE__fullgenes__GBS_Surface_Gene-DB_Final__results.txt"
+    TEST_HEADERS = "headers.json"
+
+    MIN_DEPTH = 30
+
+    def setUp(self):
+        self.header_dict = read_header_json(self.TEST_HEADERS)
+
+    def type_sample(self, output):
+        """Type one sample with its own resistance and surface typing state"""
+        process_res_typer_results.process_sample(
+            self.TEST_GBS_FULLGENES_RESULTS_FILE, self.TEST_CONSENSUS_SEQ_FILE, [self.TEST_RESFINDER_FULLGENES_RESULTS_FILE],
+            self.MIN_DEPTH, self.header_dict, output, ResTyperState.new())
+        process_surface_typer_results.process_fullgenes(
+            self.TEST_SURFACE_FULLGENES_RESULTS_FILE, self.MIN_DEPTH,
+            [output + "_surface_protein_variants_sample.txt", output + '_surface_protein_incidence_sample.txt'],
+            SurfaceTyperState.new())
+
+    def type_samples(self, out_dir, num_samples, executor=None):
+        outputs = [os.path.join(out_dir, str(n), self.TEST_LANE) for n in range(num_samples)]
+        for output in outputs:
+            os.makedirs(os.path.dirname(output), exist_ok=True)
+        if executor is None:
+            for output in outputs:
+                self.type_sample(output)
+        else:
+            list(executor.map(self.type_sample, outputs))
+        return outputs
+
+    def read_outputs(self, output):
+        contents = {}
+        out_dir = os.path.dirname(output)
+        for filename in sorted(os.listdir(out_dir)):
+            with open(os.path.join(out_dir, filename), 'r') as f:
+                contents[filename] = f.read()
+        return contents
+
+    def get_typing_time(self, num_samples, repeats=3):
+        """Get the best time of typing a number of samples"""
+        times = []
+        for _ in range(repeats):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                start = time.perf_counter()
+                self.type_samples(tmp_dir, num_samples)
+                times.append(time.perf_counter() - start)
+        return min(times)
+
+    def test_state_slots(self):
+        with self.assertRaises(AttributeError):
+            ResTyperState.new().other = {}
+        with self.assertRaises(AttributeError):
+            SurfaceTyperState.new().other = {}
+
+    def test_surface_typer_state_new_is_independent(self):
+        state1 = SurfaceTyperState.new()
+        state2 = SurfaceTyperState.new()
+        state1.feature_col['SRR'] = 'SRR1'
+        state1.bin_feature_col['SRR1'] = 'pos'
+
+        self.assertEqual(state2.feature_col['SRR'], 'neg')
+        self.assertEqual(state2.bin_feature_col['SRR1'], 'neg')
+        self.assertIsNot(state1.feature_col, process_surface_typer_results.featureCol)
+
+    def test_surface_templates_are_read_only(self):
+        for template in [process_surface_typer_results.featureCol, process_surface_typer_results.binFeatureCol]:
+            with self.assertRaises(TypeError):
+                template['SRR'] = 'pos'
+
+    def test_threaded_samples_match_single_sample(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            expected = self.read_outputs(self.type_samples(os.path.join(tmp_dir, 'serial'), 1)[0])
+            with ThreadPoolExecutor(4) as executor:
+                outputs = self.type_samples(os.path.join(tmp_dir, 'threads'), 12, executor)
+
+            self.assertEqual(len(expected), 6)
+            for output in outputs:
+                self.assertEqual(self.read_outputs(output), expected)
+
+    @unittest.skipUnless(os.environ.get('RUN_BENCHMARKS'), 'timing benchmark, set RUN_BENCHMARKS=1 to run')
+    def test_typing_time_scales_linearly(self):
+        # Nothing carried over between samples, so four times as many samples take about four times as long
+        small_time = self.get_typing_time(20)
+        large_time = self.get_typing_time(80)
+
+        self.assertLess(large_time, 6 * small_time)